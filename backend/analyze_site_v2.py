@@ -11,9 +11,12 @@ import time
 import json
 from config import BASE_URL, SEARCH_PARAMS, HEADERS
 
-def create_session():
+def create_session(status_forcelist=(429, 500, 502, 503, 504), raise_on_status=True):
     """
     Crée une session HTTP avec retry et cookies
+    status_forcelist : codes HTTP retentés automatiquement
+    raise_on_status : False pour recevoir la dernière réponse au lieu d'une erreur
+    quand les tentatives sont épuisées
     """
     session = requests.Session()
     
@@ -21,7 +24,8 @@ def create_session():
     retry_strategy = Retry(
         total=3,
         backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status_forcelist=list(status_forcelist),
+        raise_on_status=raise_on_status,
     )
     adapter = HTTPAdapter(max_retries=retry_strategy)
     session.mount("http://", adapter)
@@ -3,48 +3,24 @@ Analyse de HelloAsso avec Selenium
 Script pour débutant utilisant un navigateur automatisé
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import time
 import json
 from config import BASE_URL, SEARCH_PARAMS
+from browser_service import attach_driver, release_driver
 
 def setup_driver():
     """
-    Configure et lance le navigateur Chrome avec Selenium
+    Attache Selenium au navigateur Chrome partagé (browser_service.py)
     """
     print("🚀 Configuration du navigateur Chrome...")
     
-    # Options pour Chrome (pour optimiser et éviter la détection)
-    chrome_options = Options()
-    
-    # Désactive certaines fonctionnalités pour être plus discret
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    # Headers réalistes
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Désactive les notifications et popups
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--disable-popup-blocking")
-    
-    # Pour éviter les problèmes de certificats
-    chrome_options.add_argument("--ignore-certificate-errors")
-    chrome_options.add_argument("--allow-running-insecure-content")
-    
-    # Installation automatique du driver Chrome
-    service = Service(ChromeDriverManager().install())
-    
-    # Création du driver
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # Chrome est déjà lancé par le service (options discrètes, user agent réaliste,
+    # certificats ignorés) : on s'y attache au lieu d'en démarrer un nouveau
+    driver = attach_driver()
     
     # Supprime la bannière "Chrome est contrôlé par un logiciel automatisé"
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -198,7 +174,7 @@ def analyser_helloasso_selenium():
         # Fermeture du navigateur
         if driver:
             print("\n🔒 Fermeture du navigateur...")
-            driver.quit()
+            release_driver(driver)
 
 if __name__ == "__main__":
     print("🚀 Analyse HelloAsso avec Selenium")
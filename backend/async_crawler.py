@@ -0,0 +1,170 @@
+"""
+Moteur de crawl asynchrone (asyncio + aiohttp)
+Récupère les pages de liste et les pages d'associations en parallèle,
+avec une limite globale et une limite par hôte sur les connexions
+"""
+
+import time
+import asyncio
+import aiohttp
+from urllib.parse import urlparse
+from config import HEADERS, HTTP_TIMEOUT, ASYNC_MAX_CONCURRENCY, ASYNC_MAX_PER_HOST
+from http_fetcher import extract_bde_links_from_html, extract_bde_info_from_html, has_expected_markers
+from rate_limiter import get_rate_limiter
+
+LISTING_URL = "https://www.helloasso.com/e/recherche/associations"
+LISTING_PARAMS = "category_tags=bde"
+
+
+class AsyncCrawler:
+    """
+    Crawler asynchrone pour les pages de liste et de détail des BDE
+
+    Toutes les requêtes partagent une seule session aiohttp dont les connexions
+    keep-alive sont réutilisées. Un sémaphore global (max_concurrency) et un
+    sémaphore par hôte (max_per_host) limitent les requêtes en cours : le
+    timeout ne compte ainsi que le temps de la requête, pas l'attente.
+    Chaque requête passe aussi par le limiteur de débit partagé.
+    """
+
+    def __init__(self, listing_url=LISTING_URL, listing_params=LISTING_PARAMS,
+                 max_concurrency=ASYNC_MAX_CONCURRENCY, max_per_host=ASYNC_MAX_PER_HOST,
+                 timeout=HTTP_TIMEOUT, rate_limiter=None, archive=None, seen_urls=None):
+        self.listing_url = listing_url
+        self.listing_params = listing_params
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.archive = archive  # Archive des pages téléchargées (PageArchive), optionnelle
+        self.seen_urls = seen_urls  # Associations déjà scrapées (SeenUrlStore), optionnel
+
+        # Statistiques du dernier crawl
+        self.pages_fetched = 0
+        self.elapsed = 0.0
+
+        # Sémaphores (créés dans la boucle asyncio au début du crawl)
+        self._global_limit = None
+        self._host_limits = {}
+
+    def get_page_url(self, page_number):
+        """
+        Génère l'URL d'une page de liste (même format que BDEScraperAllPages)
+        """
+        return f"{self.listing_url}?page={page_number}&{self.listing_params}"
+
+    def create_session(self):
+        """
+        Session aiohttp partagée avec pool de connexions keep-alive
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_per_host,
+            keepalive_timeout=30
+        )
+        headers = {k: v for k, v in HEADERS.items() if k != 'Accept-Encoding'}
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    def host_limit(self, url):
+        """
+        Sémaphore associé à l'hôte de l'URL
+        """
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    async def fetch(self, session, url):
+        """
+        Télécharge une page, renvoie son HTML ou None en cas d'échec
+        """
+        try:
+            async with self._global_limit, self.host_limit(url):
+                await self.rate_limiter.acquire_async()
+                start = time.monotonic()
+                async with session.get(url) as response:
+                    self.pages_fetched += 1
+                    page_html = await response.text()
+                    self.rate_limiter.record_response(status_code=response.status, elapsed=time.monotonic() - start)
+                    if self.archive:
+                        # Compression et écriture hors de la boucle asyncio
+                        await asyncio.get_running_loop().run_in_executor(
+                            None, self.archive.add, url, response.status, dict(response.headers), page_html
+                        )
+                    if response.status != 200:
+                        return None
+                    return page_html
+        except Exception as e:
+            self.rate_limiter.record_response(status_code=503)
+            print(f"   ⚠️ Erreur HTTP pour {url} : {e!r}")
+            return None
+
+    async def fetch_listing_page(self, session, page_number):
+        """
+        Renvoie les liens d'associations d'une page de liste
+        """
+        url = self.get_page_url(page_number)
+        page_html = await self.fetch(session, url)
+        if not page_html:
+            return []
+        return extract_bde_links_from_html(page_html, url)
+
+    async def fetch_bde_details(self, session, bde_url):
+        """
+        Renvoie le bde_info d'une association, ou None si la page
+        n'est pas exploitable sans navigateur
+        """
+        page_html = await self.fetch(session, bde_url)
+        if not page_html or not has_expected_markers(page_html):
+            return None
+        try:
+            return extract_bde_info_from_html(page_html, bde_url)
+        except Exception as e:
+            print(f"   ⚠️ Erreur de parsing pour {bde_url} : {str(e)}")
+            return None
+
+    async def crawl(self, start_page, end_page):
+        """
+        Crawl complet : toutes les pages de liste, puis toutes les associations
+
+        Renvoie (links_by_page, results) où results contient, dans l'ordre
+        des pages puis des liens, des tuples (bde_url, bde_info ou None)
+        Chaque association n'y est qu'une fois (et pas du tout si seen_urls
+        indique qu'elle a déjà été scrapée récemment)
+        """
+        self.pages_fetched = 0
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = {}
+        start_time = time.perf_counter()
+
+        async with self.create_session() as session:
+            pages = list(range(start_page, end_page + 1))
+            listings = await asyncio.gather(*(self.fetch_listing_page(session, page) for page in pages))
+            links_by_page = dict(zip(pages, listings))
+
+            # Une association listée sur plusieurs pages n'est récupérée qu'une fois
+            all_links = list(dict.fromkeys(url for page in pages for url in links_by_page[page]))
+            if self.seen_urls:
+                all_links = self.seen_urls.filter_new(all_links)
+            details = await asyncio.gather(*(self.fetch_bde_details(session, url) for url in all_links))
+
+        self.elapsed = time.perf_counter() - start_time
+        return links_by_page, list(zip(all_links, details))
+
+    def run(self, start_page, end_page):
+        """
+        Point d'entrée synchrone (pour les scripts existants)
+        """
+        return asyncio.run(self.crawl(start_page, end_page))
+
+    def pages_per_second(self):
+        """
+        Débit du dernier crawl
+        """
+        if self.elapsed <= 0:
+            return 0.0
+        return self.pages_fetched / self.elapsed
@@ -0,0 +1,109 @@
+"""
+📈 BENCHMARK DU CRAWLER ASYNCHRONE
+Lance un faux site HelloAsso en local et mesure le débit (pages/s)
+du crawler pour différents niveaux de concurrence
+(le limiteur de débit est désactivé : on mesure le moteur, pas la politesse)
+"""
+
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from async_crawler import AsyncCrawler
+from rate_limiter import TokenBucketRateLimiter
+
+NB_PAGES = 5                 # Pages de liste simulées
+BDE_PER_PAGE = 30            # Associations par page de liste
+SERVER_LATENCY = 0.05        # Latence simulée du serveur (en secondes)
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+class FakeHelloAssoHandler(BaseHTTPRequestHandler):
+    """
+    Imite les pages de liste et les pages d'associations de HelloAsso
+    """
+    protocol_version = "HTTP/1.1"  # Nécessaire pour le keep-alive
+
+    def do_GET(self):
+        time.sleep(SERVER_LATENCY)
+        parsed = urlparse(self.path)
+
+        if parsed.path == "/e/recherche/associations":
+            page = int(parse_qs(parsed.query).get('page', ['0'])[0])
+            links = "".join(
+                f'<li><a href="/associations/bde-{page}-{i}">BDE {page}-{i}</a></li>'
+                for i in range(BDE_PER_PAGE)
+            ) if page < NB_PAGES else ""
+            body = f"<html><body><ul>{links}</ul></body></html>"
+        elif parsed.path.startswith("/associations/"):
+            slug = parsed.path.rsplit('/', 1)[-1]
+            body = (
+                f'<html><head><title>{slug} | HelloAsso</title></head><body>'
+                f'<h1>{slug.upper()}</h1>'
+                f'<p class="Data">12 rue de la Paix</p>'
+                f'<p class="Data Data-City"><span>75002</span><span>Paris</span></p>'
+                f'<p>{slug}@example.org</p>'
+                f'</body></html>'
+            )
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Pas de log pour chaque requête
+
+
+def start_fake_server():
+    """
+    Démarre le faux serveur sur un port libre, renvoie (serveur, url de base)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeHelloAssoHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+def run_benchmark():
+    """
+    Mesure le débit du crawler pour chaque niveau de concurrence
+    """
+    print("📈 BENCHMARK DU CRAWLER ASYNCHRONE")
+    print("=" * 50)
+    print(f"📄 {NB_PAGES} pages de liste × {BDE_PER_PAGE} BDE, latence simulée {SERVER_LATENCY*1000:.0f} ms")
+
+    server, base_url = start_fake_server()
+    expected = NB_PAGES * BDE_PER_PAGE
+
+    try:
+        for concurrency in CONCURRENCY_LEVELS:
+            crawler = AsyncCrawler(
+                listing_url=f"{base_url}/e/recherche/associations",
+                max_concurrency=concurrency,
+                max_per_host=concurrency,
+                rate_limiter=TokenBucketRateLimiter(rate=10000, burst=10000, max_rate=10000)
+            )
+            links_by_page, results = crawler.run(0, NB_PAGES - 1)
+            extracted = sum(1 for _, bde_info in results if bde_info)
+
+            status = "✅" if extracted == expected else f"❌ ({extracted}/{expected})"
+            print(f"   concurrence {concurrency:>3} : {crawler.pages_per_second():7.1f} pages/s "
+                  f"({crawler.pages_fetched} pages en {crawler.elapsed:.2f}s) {status}")
+    finally:
+        server.shutdown()
+
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,102 @@
+"""
+⏱️ BENCHMARK DU NETTOYAGE DES DONNÉES
+Compare, sur le fichier complet du scraping recopié SCALE fois, l'ancien
+nettoyage (Series.apply de clean_address_field et clean_website_field) et le
+nettoyage par colonne de data_cleaner.py (règles compilées, chaque valeur
+distincte nettoyée une fois), et vérifie que le CSV produit est identique.
+Chaque copie reçoit le numéro de ligne en fin d'adresse et de site : toutes
+les valeurs restent distinctes et le gain mesuré est celui des règles, pas
+celui du dédoublonnage. Le gain est aussi mesuré sur le fichier d'origine
+(1x), puis sur les copies identiques (doublons, cas d'un fichier re-scrapé).
+
+Usage :
+    python3 benchmark_data_cleaner.py [fichier.csv] [--scale 100]
+"""
+
+import io
+import time
+import argparse
+import pandas as pd
+from data_cleaner import (
+    clean_address_field, clean_website_field, clean_address_value, clean_website_value, clean_column
+)
+
+INPUT_FILE = "data/bde_scraping_all_pages_20250609_151849.csv"
+SCALE = 100
+
+
+def clean_with_apply(df):
+    df = df.copy()
+    df['adresse'] = df['adresse'].apply(clean_address_field)
+    df['site_internet'] = df['site_internet'].apply(clean_website_field)
+    return df
+
+
+def clean_with_columns(df):
+    df = df.copy()
+    df['adresse'] = clean_column(df['adresse'], clean_address_value)
+    df['site_internet'] = clean_column(df['site_internet'], clean_website_value)
+    return df
+
+
+def measure(clean, df):
+    """
+    Durée du nettoyage en secondes, et CSV obtenu
+    """
+    start = time.perf_counter()
+    cleaned = clean(df)
+    elapsed = time.perf_counter() - start
+    output = io.StringIO()
+    cleaned.to_csv(output, index=False)
+    return elapsed, output.getvalue()
+
+
+def distinct_copies(df, scale):
+    """
+    scale copies du fichier, le numéro de ligne ajouté aux adresses et sites non vides
+    """
+    scaled = pd.concat([df] * scale, ignore_index=True)
+    suffix = pd.Series(scaled.index.astype(str), index=scaled.index)
+    for column in ('adresse', 'site_internet'):
+        filled = scaled[column].notna()
+        scaled.loc[filled, column] = scaled.loc[filled, column].astype(str) + ' ' + suffix[filled]
+    return scaled
+
+
+def compare(df, label):
+    old_seconds, old_csv = measure(clean_with_apply, df)
+    new_seconds, new_csv = measure(clean_with_columns, df)
+    print(f"\n📊 {label} : {len(df)} lignes, {df['adresse'].nunique()} adresses distinctes")
+    print(f"🐢 Series.apply        : {old_seconds:.2f} s ({len(df) / old_seconds:.0f} lignes/s)")
+    print(f"🚀 Nettoyage par colonne : {new_seconds:.2f} s ({len(df) / new_seconds:.0f} lignes/s, x{old_seconds / new_seconds:.1f})")
+    if old_csv == new_csv:
+        print("✅ CSV identiques")
+    else:
+        print("❌ CSV différents")
+    return old_csv == new_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du nettoyage des données")
+    parser.add_argument("input_file", nargs="?", default=INPUT_FILE)
+    parser.add_argument("--scale", type=int, default=SCALE, help="nombre de copies du fichier")
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_csv(args.input_file)
+    except Exception as e:
+        print(f"❌ Fichier illisible : {e}")
+        return
+
+    print("⏱️ NETTOYAGE DES DONNÉES")
+    print("=" * 50)
+    compare(df, "Fichier d'origine (1x)")
+    # Relu depuis un CSV, comme par clean_csv_data : chaque cellule est une chaîne distincte
+    scaled_csv = distinct_copies(df, args.scale).to_csv(index=False)
+    compare(pd.read_csv(io.StringIO(scaled_csv)), f"Fichier recopié {args.scale}x, valeurs distinctes")
+    duplicated_csv = pd.concat([df] * args.scale, ignore_index=True).to_csv(index=False)
+    compare(pd.read_csv(io.StringIO(duplicated_csv)), f"Fichier recopié {args.scale}x, copies identiques")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+⏱️ MICRO-BENCHMARK DE L'EXTRACTION PAR REGEX
+Compare, sur une page enregistrée, l'ancienne extraction (un re.findall sur
+toute la page par motif), le parcours unique de field_extraction.py sur le
+HTML brut (mêmes champs attendus) et l'extraction limitée aux blocs de chaque
+champ, sans style, script ni svg (moins d'octets lus, plus de CSS dans les champs)
+"""
+
+import re
+import sys
+import time
+from field_extraction import (
+    EMAIL_PATTERN, EMAIL_BLACKLIST, PHONE_PATTERNS, ADDRESS_PATTERNS, PERSON_NAME_PATTERNS,
+    FIELD_PATTERNS, scan_fields, parse_page, page_regions, page_text, extract_page_fields
+)
+
+PAGE_FILE = "data/selenium_page_source.html"
+REPEAT = 20
+
+
+def findall_fields(page_html):
+    """
+    Ancienne extraction : findall complet pour chaque motif, on garde le premier résultat
+    """
+    fields = {}
+    for email in re.findall(EMAIL_PATTERN, page_html):
+        if not any(x in email.lower() for x in EMAIL_BLACKLIST):
+            fields['email'] = email
+            break
+
+    for pattern in PHONE_PATTERNS:
+        phone_matches = re.findall(pattern, page_html)
+        if phone_matches:
+            fields['telephone'] = phone_matches[0].strip()
+            break
+
+    for pattern in ADDRESS_PATTERNS:
+        addresses = re.findall(pattern, page_html, re.IGNORECASE)
+        if addresses:
+            fields['adresse'] = addresses[0].strip()
+            break
+
+    for pattern in PERSON_NAME_PATTERNS:
+        name_matches = re.findall(pattern, page_html)
+        if name_matches:
+            fields['personne'] = name_matches[0].strip()
+            break
+    return fields
+
+
+def region_fields(page_html):
+    """
+    Extraction par blocs : analyse lxml puis motifs sur le texte des blocs et de la page
+    """
+    return extract_page_fields(parse_page(page_html))
+
+
+def scanned_bytes(page_html):
+    """
+    Taille des textes parcourus par l'extraction par blocs (blocs et texte visible)
+    """
+    tree = parse_page(page_html)
+    regions = page_regions(tree, FIELD_PATTERNS)
+    return sum(len(text) for texts in regions.values() for text in texts) + len(page_text(tree))
+
+
+def measure(extract, page_html):
+    """
+    Durée moyenne d'une extraction en millisecondes
+    """
+    extract(page_html)  # Premier appel hors mesure (compilation des motifs)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fields = extract(page_html)
+    return (time.perf_counter() - start) / REPEAT * 1000, fields
+
+
+def main():
+    page_file = sys.argv[1] if len(sys.argv) > 1 else PAGE_FILE
+    try:
+        with open(page_file, encoding='utf-8') as f:
+            page_html = f.read()
+    except OSError as e:
+        print(f"❌ Page introuvable : {str(e)}")
+        return
+
+    print("⏱️ EXTRACTION PAR REGEX")
+    print("=" * 50)
+    print(f"📄 {page_file} : {len(page_html) // 1024} Ko, {REPEAT} extractions")
+
+    old_ms, old_fields = measure(findall_fields, page_html)
+    new_ms, new_fields = measure(scan_fields, page_html)
+    region_ms, region_result = measure(region_fields, page_html)
+
+    print(f"\n🐢 re.findall par motif : {old_ms:.1f} ms par page ({len(page_html) // 1024} Ko lus)")
+    print(f"🚀 Parcours unique      : {new_ms:.1f} ms par page (x{old_ms / new_ms:.1f})")
+    print(f"🎯 Blocs de la page     : {region_ms:.1f} ms par page (x{old_ms / region_ms:.1f}, "
+          f"{scanned_bytes(page_html) // 1024} Ko lus, analyse lxml comprise)")
+
+    if old_fields == new_fields:
+        print("✅ Parcours unique : champs identiques à re.findall")
+    else:
+        print(f"❌ Parcours unique : champs différents : {old_fields} != {new_fields}")
+
+    print("\n📋 Champs trouvés (HTML brut -> blocs de la page) :")
+    for key in FIELD_PATTERNS:
+        print(f"   {key} : {old_fields.get(key, '')[:50]!r} -> {region_result.get(key, '')[:50]!r}")
+
+
+if __name__ == "__main__":
+    main()
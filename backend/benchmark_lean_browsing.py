@@ -0,0 +1,92 @@
+"""
+📦 COMPARAISON NAVIGATION COMPLÈTE / NAVIGATION LÉGÈRE
+Charge quelques pages d'associations avec un Chrome normal puis avec
+un Chrome "léger" et compare les octets transférés et le temps de chargement
+"""
+
+import csv
+import glob
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from lean_browsing import apply_lean_options, enable_request_blocking, measure_page_weight, format_page_weight, PageWeightStats
+from page_readiness import wait_for_association_page
+from rate_limiter import throttled_get
+
+NB_PAGES = 5  # Nombre de pages d'associations à comparer
+
+
+def create_driver(lean):
+    """
+    Chrome headless, avec ou sans navigation légère
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+
+    if lean:
+        apply_lean_options(chrome_options)
+
+    driver = webdriver.Chrome(options=chrome_options)
+    if lean:
+        enable_request_blocking(driver)
+    return driver
+
+
+def load_sample_urls():
+    """
+    Prend les premières URLs d'associations du dernier fichier de scraping
+    """
+    csv_files = glob.glob("data/bde_scraping_*.csv")
+    if not csv_files:
+        return []
+
+    with open(max(csv_files), encoding='utf-8') as f:
+        urls = [row['url_source'] for row in csv.DictReader(f) if row.get('url_source')]
+    return urls[:NB_PAGES]
+
+
+def measure(urls, lean):
+    """
+    Charge chaque URL et cumule les mesures
+    """
+    stats = PageWeightStats()
+    driver = create_driver(lean)
+    try:
+        for url in urls:
+            throttled_get(driver, url)
+            wait_for_association_page(driver)
+            weight = measure_page_weight(driver)
+            stats.add(weight)
+            print(f"   {format_page_weight(weight)} - {url}")
+    finally:
+        driver.quit()
+    return stats
+
+
+def main():
+    print("📦 COMPARAISON NAVIGATION COMPLÈTE / LÉGÈRE")
+    print("=" * 50)
+
+    urls = load_sample_urls()
+    if not urls:
+        print("❌ Aucun fichier de scraping trouvé dans le dossier data/")
+        return
+
+    print("\n🐘 Navigation complète")
+    full = measure(urls, lean=False)
+
+    print("\n🪶 Navigation légère")
+    lean = measure(urls, lean=True)
+
+    print("\n📊 RÉSULTATS")
+    print(f"   Complète : {full.summary()}")
+    print(f"   Légère   : {lean.summary()}")
+    if full.transferred_bytes and full.load_ms:
+        print(f"   Gain     : {100 * (1 - lean.transferred_bytes / full.transferred_bytes):.0f}% d'octets, "
+              f"{100 * (1 - lean.load_ms / full.load_ms):.0f}% de temps de chargement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Extraction en un seul aller-retour WebDriver
+Des scripts JavaScript injectés avec execute_script() lisent la page dans le
+navigateur et renvoient tout d'un coup (au lieu de plusieurs page_source et
+d'un get_attribute() par lien) : les champs d'un BDE sur sa page, et les
+liens d'associations sur une page de liste
+Les champs présents dans l'état embarqué de la page (__NUXT_DATA__, JSON-LD)
+sont préférés aux regex, comme pour l'extraction HTTP
+"""
+
+from http_fetcher import empty_bde_info, SOCIAL_DOMAINS
+from field_extraction import IGNORED_TAGS, FIELD_REGIONS, REGION_PARTS, wanted_fields, apply_fields, fields_from_regions
+from lean_browsing import PAGE_WEIGHT_FUNCTION_JS
+from hydration_extractor import state_fields_from_payloads
+from validator_store import CONTENT_REGION_SELECTOR, hash_text
+
+# Mêmes sélecteurs que l'ancienne extraction Selenium, dans le même ordre
+NAME_SELECTORS = ["h1", ".title", ".name", ".association-name", "title"]
+
+# Les champs regex sont cherchés côté Python (field_extraction.py) dans les textes
+# renvoyés : blocs de chaque champ (mêmes XPath que lxml) et texte visible de la page
+EXTRACT_BDE_INFO_JS = PAGE_WEIGHT_FUNCTION_JS + """
+const cfg = arguments[0];
+const ignored = new Set(cfg.ignored_tags.map(tag => tag.toUpperCase()));
+const result = {
+    nom_ecole: '', nom_personne: '', prenom_personne: '', adresse: '',
+    site_internet: '', telephone: '', email: ''
+};
+
+// Nœuds texte d'un élément, sans ceux de style, script, svg...
+function textNodes(root) {
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+        acceptNode(node) {
+            for (let el = node.parentElement; el && el !== root.parentElement; el = el.parentElement) {
+                if (ignored.has(el.tagName.toUpperCase())) return NodeFilter.FILTER_REJECT;
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+    const texts = [];
+    while (walker.nextNode()) {
+        const text = walker.currentNode.nodeValue.trim();
+        if (text) texts.push(text);
+    }
+    return texts;
+}
+
+// Nom de l'école/BDE
+for (const selector of cfg.name_selectors) {
+    const element = document.querySelector(selector);
+    if (!element) continue;
+    const name = (element.innerText || element.textContent || '').trim();
+    if (name && name !== 'HelloAsso') { result.nom_ecole = name; break; }
+}
+
+// Textes des blocs de chaque champ (bloc contact, Data-City, liens mailto:/tel:)
+const regions = {};
+for (const [field, xpaths] of Object.entries(cfg.field_regions)) {
+    regions[field] = [];
+    for (const xpath of xpaths) {
+        const nodes = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const parts = cfg.region_parts[xpath];
+        for (let i = 0; i < nodes.snapshotLength; i++) {
+            const node = nodes.snapshotItem(i);
+            if (node.nodeType === Node.ATTRIBUTE_NODE) { regions[field].push(node.value); continue; }
+            let roots = [node];
+            if (parts) {
+                const children = document.evaluate(parts, node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                roots = Array.from({length: children.snapshotLength}, (_, j) => children.snapshotItem(j));
+            }
+            regions[field].push(roots.map(root => textNodes(root).join(' ').split(/\\s+/).join(' ').trim()).join(' '));
+        }
+    }
+}
+
+// Liens externes : candidats pour le site internet
+const links = Array.from(document.querySelectorAll("a[href^='http']"), a => a.href);
+for (const href of links) {
+    if (!href.includes('helloasso.com') && !cfg.social_domains.some(d => href.includes(d))) {
+        result.site_internet = href;
+        break;
+    }
+}
+
+// État embarqué de la page (analysé côté Python)
+const nuxtData = document.getElementById('__NUXT_DATA__');
+const state = {
+    nuxt: nuxtData ? nuxtData.textContent : null,
+    json_ld: Array.from(document.querySelectorAll('script[type="application/ld+json"]'), s => s.textContent)
+};
+
+// Zone utile de la page, pour le hash du recrawl conditionnel (validator_store.content_hash)
+const contentRegion = document.querySelector(cfg.content_region) || document.body;
+
+return {
+    fields: result,
+    regions: regions,
+    page_text: textNodes(document.body).join('\\n'),
+    content_text: textNodes(contentRegion).join(' '),
+    state: state,
+    links: links,
+    weight: pageWeight(),
+    page_source: cfg.include_source ? document.documentElement.outerHTML : null
+};
+"""
+
+EXTRACTOR_CONFIG = {
+    'name_selectors': NAME_SELECTORS,
+    'ignored_tags': IGNORED_TAGS,
+    'field_regions': FIELD_REGIONS,
+    'region_parts': REGION_PARTS,
+    'social_domains': SOCIAL_DOMAINS,
+    'content_region': CONTENT_REGION_SELECTOR,
+}
+
+
+def extract_bde_info_in_browser(driver, bde_url, include_source=False):
+    """
+    Extrait le bde_info de la page courante avec un seul execute_script()
+
+    Renvoie un dict avec :
+    - bde_info : les champs du BDE (même format que extract_bde_details)
+    - links : les liens externes candidats
+    - weight : poids et temps de chargement de la page
+    - page_source : le HTML de la page, seulement si include_source=True (archivage)
+    - content_hash : hash de la zone utile, le même que validator_store.content_hash
+    """
+    data = driver.execute_script(EXTRACT_BDE_INFO_JS, dict(EXTRACTOR_CONFIG, include_source=include_source))
+
+    bde_info = empty_bde_info(bde_url)
+    state = data.get('state') or {}
+    bde_info.update(state_fields_from_payloads(state.get('nuxt'), state.get('json_ld'), bde_url))
+
+    # Nom et site lus par le script pour les champs absents de l'état
+    for key, value in (data.get('fields') or {}).items():
+        if key in bde_info and value and not bde_info[key]:
+            bde_info[key] = value
+
+    # Regex en repli, dans les blocs de chaque champ puis le texte visible
+    wanted = wanted_fields(bde_info)
+    if wanted:
+        apply_fields(bde_info, fields_from_regions(data.get('regions') or {}, data.get('page_text'), wanted))
+
+    return {
+        'bde_info': bde_info,
+        'links': data.get('links') or [],
+        'weight': data.get('weight'),
+        'page_source': data.get('page_source'),
+        'content_hash': hash_text(data.get('content_text') or ''),
+    }
+
+
+# Sélecteurs des cartes d'associations sur les pages de liste
+LISTING_LINK_SELECTORS = [
+    "a[href*='/associations/']",
+    ".association-card a",
+    ".card a[href*='associations']",
+    "a[href*='bde']",
+    ".result-item a",
+    ".search-result a"
+]
+
+# Les URLs sont ramenées à https://.../associations/<slug> (sans requête,
+# fragment, slash final ni sous-page), puis dédoublonnées dans l'ordre de la page
+HARVEST_LISTING_LINKS_JS = """
+const cfg = arguments[0];
+const seen = new Map();
+
+// Nombre d'éléments que l'ancienne méthode (un find_elements par sélecteur) aurait parcourus
+let legacyElements = 0;
+for (const selector of cfg.selectors) {
+    legacyElements += document.querySelectorAll(selector).length;
+}
+
+for (const element of document.querySelectorAll(cfg.selectors.join(','))) {
+    const href = element.href;
+    if (!href || !href.includes('/associations/')) continue;
+
+    const url = new URL(href, location.href);
+    const slug = url.pathname.match(/\\/associations\\/([^\\/]+)/);
+    if (!slug) continue;
+
+    // Une même carte peut avoir plusieurs liens (logo, titre...) : on garde le texte le plus long
+    const canonical = url.origin + '/associations/' + slug[1].toLowerCase();
+    const text = (element.innerText || element.textContent || '').trim();
+    if (!seen.has(canonical) || text.length > seen.get(canonical).length) {
+        seen.set(canonical, text);
+    }
+}
+
+return {
+    links: Array.from(seen, ([url, text]) => ({url: url, text: text})),
+    legacy_elements: legacyElements,
+    page_source: cfg.include_source ? document.documentElement.outerHTML : null
+};
+"""
+
+
+def harvest_listing_links(driver, selectors=LISTING_LINK_SELECTORS, calls_per_element=1, include_source=False):
+    """
+    Récupère en un seul execute_script() les liens d'associations de la page de liste
+
+    Renvoie (links, saved_calls) :
+    - links : liste de {'url': ..., 'text': ...} dédoublonnée et canonique
+    - saved_calls : nombre d'appels WebDriver évités par rapport à l'ancienne
+      méthode (un find_elements par sélecteur + calls_per_element appels par élément)
+    Avec include_source=True, renvoie (links, saved_calls, page_source) : le HTML
+    de la page est lu dans le même appel (archivage)
+    """
+    data = driver.execute_script(HARVEST_LISTING_LINKS_JS, {'selectors': selectors, 'include_source': include_source})
+
+    legacy_calls = len(selectors) + data.get('legacy_elements', 0) * calls_per_element
+    saved_calls = max(0, legacy_calls - 1)
+    if include_source:
+        return data.get('links') or [], saved_calls, data.get('page_source')
+    return data.get('links') or [], saved_calls
@@ -0,0 +1,287 @@
+"""
+🌐 NAVIGATEUR PARTAGÉ ENTRE LES SCRIPTS
+Garde un Chrome (port DevTools) et un chromedriver lancés en arrière-plan :
+les scripts s'y attachent avec attach_driver() en quelques millisecondes au
+lieu de télécharger le driver et de démarrer Chrome à chaque fois.
+Chaque session travaille dans son propre onglet : plusieurs scripts (ou
+workers) peuvent utiliser le service en même temps sans se gêner.
+Le profil (cache HTTP, cookies) est conservé dans BROWSER_PROFILE_DIR et
+Chrome démarre sur la page de recherche, déjà en cache pour le premier script.
+Un Chrome ou un chromedriver arrêté est relancé automatiquement.
+
+Usage :
+    python3 browser_service.py start     # lance le service en arrière-plan
+    python3 browser_service.py status
+    python3 browser_service.py stop
+    python3 browser_service.py serve     # premier plan, relance ce qui s'arrête
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import subprocess
+import urllib.request
+from datetime import datetime
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from config import (BASE_URL, SEARCH_PARAMS, BROWSER_SERVICE_HOST, BROWSER_DEBUG_PORT, BROWSER_DRIVER_PORT,
+                    BROWSER_PROFILE_DIR, BROWSER_SERVICE_STATE, BROWSER_SERVICE_HEADLESS, CHROME_BINARY)
+
+CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+CHROME_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--window-size=1920,1080",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-notifications",
+    "--disable-popup-blocking",
+    "--ignore-certificate-errors",
+    "--disable-blink-features=AutomationControlled",
+    "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+]
+
+START_TIMEOUT = 20        # Secondes pour que Chrome et chromedriver répondent
+WATCH_INTERVAL = 5        # Secondes entre deux vérifications en mode serve
+
+
+def load_state():
+    try:
+        with open(BROWSER_SERVICE_STATE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(BROWSER_SERVICE_STATE) or '.', exist_ok=True)
+    with open(BROWSER_SERVICE_STATE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def is_responding(url):
+    """
+    True si le point d'accès HTTP local répond
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def chrome_is_up():
+    return is_responding(f"http://{BROWSER_SERVICE_HOST}:{BROWSER_DEBUG_PORT}/json/version")
+
+
+def driver_is_up():
+    return is_responding(f"http://{BROWSER_SERVICE_HOST}:{BROWSER_DRIVER_PORT}/status")
+
+
+def find_chrome():
+    """
+    Chemin de Chrome : CHROME_BINARY, sinon le premier navigateur trouvé
+    """
+    if CHROME_BINARY:
+        return CHROME_BINARY
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    raise RuntimeError("Chrome introuvable (renseigner CHROME_BINARY dans config.py)")
+
+
+def cached_driver_path(state):
+    """
+    Chemin de chromedriver, téléchargé une seule fois puis mémorisé dans l'état du service
+    """
+    path = state.get('driver_path')
+    if path and os.path.isfile(path):
+        return path
+    path = shutil.which("chromedriver")
+    if not path:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    state['driver_path'] = path
+    return path
+
+
+def spawn(command):
+    """
+    Lance un processus détaché : il survit au script qui l'a démarré
+    """
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True).pid
+
+
+def wait_until(check, timeout=START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def stop_process(pid):
+    if not pid:
+        return
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def start_chrome(state):
+    stop_process(state.get('chrome_pid'))
+    os.makedirs(BROWSER_PROFILE_DIR, exist_ok=True)
+    command = [find_chrome(),
+               f"--remote-debugging-port={BROWSER_DEBUG_PORT}",
+               f"--user-data-dir={os.path.abspath(BROWSER_PROFILE_DIR)}"] + CHROME_ARGS
+    if BROWSER_SERVICE_HEADLESS:
+        command.append("--headless=new")
+    # Première page chargée au démarrage : le profil est chaud pour le premier script
+    command.append(f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}")
+    state['chrome_pid'] = spawn(command)
+    if not wait_until(chrome_is_up):
+        raise RuntimeError(f"Chrome ne répond pas sur le port {BROWSER_DEBUG_PORT}")
+    print(f"✅ Chrome démarré (pid {state['chrome_pid']}, port {BROWSER_DEBUG_PORT})")
+
+
+def start_driver(state):
+    stop_process(state.get('driver_pid'))
+    state['driver_pid'] = spawn([cached_driver_path(state), f"--port={BROWSER_DRIVER_PORT}"])
+    if not wait_until(driver_is_up):
+        raise RuntimeError(f"chromedriver ne répond pas sur le port {BROWSER_DRIVER_PORT}")
+    print(f"✅ chromedriver démarré (pid {state['driver_pid']}, port {BROWSER_DRIVER_PORT})")
+
+
+def ensure_service():
+    """
+    Vérifie Chrome et chromedriver et relance celui qui ne répond plus
+    """
+    if chrome_is_up() and driver_is_up():
+        return
+    state = load_state()
+    if not chrome_is_up():
+        print("🔄 Démarrage du navigateur partagé...")
+        start_chrome(state)
+    if not driver_is_up():
+        start_driver(state)
+    state['started_at'] = datetime.now().isoformat(timespec='seconds')
+    save_state(state)
+
+
+def attach_driver(page_load_strategy=None):
+    """
+    Renvoie un driver Selenium attaché au navigateur partagé
+    (le service est démarré ou relancé si besoin)
+    Les options de lancement de Chrome sont celles du service (CHROME_ARGS) :
+    seule la stratégie de chargement ('eager'...) est propre à la session
+    La session ouvre son propre onglet, à fermer avec release_driver()
+    """
+    ensure_service()
+    options = Options()
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    options.debugger_address = f"{BROWSER_SERVICE_HOST}:{BROWSER_DEBUG_PORT}"
+    connection = ChromiumRemoteConnection(f"http://{BROWSER_SERVICE_HOST}:{BROWSER_DRIVER_PORT}",
+                                          vendor_prefix="goog", browser_name="chrome", ignore_proxy=True)
+    driver = webdriver.Remote(command_executor=connection, options=options)
+    # Sans onglet à soi, deux scripts attachés en même temps naviguent dans le même
+    driver.switch_to.new_window('tab')
+    return driver
+
+
+def release_driver(driver):
+    """
+    Ferme l'onglet de la session puis la session, pas le navigateur partagé
+    """
+    try:
+        driver.close()
+    finally:
+        driver.quit()
+
+
+def launch_driver(headless=False):
+    """
+    Démarre un Chrome à part, hors du service (visible par défaut, pour le debug)
+    Il ne partage ni onglet ni profil avec le navigateur partagé ; driver.quit() le ferme
+    """
+    state = load_state()
+    options = Options()
+    options.binary_location = find_chrome()
+    for arg in CHROME_ARGS:
+        options.add_argument(arg)
+    if headless:
+        options.add_argument("--headless=new")
+    driver = webdriver.Chrome(service=Service(cached_driver_path(state)), options=options)
+    save_state(state)
+    return driver
+
+
+def stop_service():
+    state = load_state()
+    for key in ('serve_pid', 'driver_pid', 'chrome_pid'):
+        pid = state.pop(key, None)
+        if pid != os.getpid():  # serve() s'arrête de lui-même
+            stop_process(pid)
+    save_state(state)
+    print("🛑 Navigateur partagé arrêté")
+
+
+def serve():
+    """
+    Garde le service en vie au premier plan, relance Chrome ou chromedriver s'ils s'arrêtent
+    """
+    state = load_state()
+    state['serve_pid'] = os.getpid()
+    save_state(state)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            try:
+                ensure_service()
+            except Exception as e:
+                print(f"❌ Relance impossible : {str(e)}")
+            time.sleep(WATCH_INTERVAL)
+    finally:
+        stop_service()
+
+
+def print_status():
+    state = load_state()
+    print(f"🌐 Chrome : {'✅' if chrome_is_up() else '❌'} (port {BROWSER_DEBUG_PORT}, pid {state.get('chrome_pid')})")
+    print(f"🚗 chromedriver : {'✅' if driver_is_up() else '❌'} (port {BROWSER_DRIVER_PORT}, {state.get('driver_path')})")
+    print(f"📁 Profil : {BROWSER_PROFILE_DIR}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Navigateur Chrome partagé entre les scripts")
+    parser.add_argument("command", choices=["start", "stop", "status", "serve"])
+    args = parser.parse_args()
+
+    if args.command == "start":
+        ensure_service()
+        spawn([sys.executable, os.path.abspath(__file__), "serve"])
+        print("🚀 Navigateur partagé prêt (surveillance en arrière-plan)")
+    elif args.command == "stop":
+        stop_service()
+    elif args.command == "status":
+        print_status()
+    else:
+        serve()
+
+
+if __name__ == "__main__":
+    main()
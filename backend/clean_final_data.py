@@ -3,6 +3,7 @@ Script pour nettoyer le fichier final avec les 879 BDE
 """
 
 from data_cleaner import clean_csv_data, display_sample_data
+from entity_resolution import resolve_csv, display_clusters
 from datetime import datetime
 
 def main():
@@ -22,6 +23,12 @@ def main():
     if clean_csv_data(input_file, output_file):
         print("\n🎉 NETTOYAGE TERMINÉ AVEC SUCCÈS !")
         display_sample_data(output_file, 10)
+
+        # Regroupe les fiches d'un même BDE (cluster_id + fiches canoniques)
+        # Le fichier nettoyé vient d'être créé : cluster_id y est ajouté directement
+        entities_file = resolve_csv(output_file, overwrite=True)
+        if entities_file:
+            display_clusters(entities_file)
         
         # Statistiques finales
         import pandas as pd
@@ -32,6 +39,8 @@ def main():
         print(f"\n📊 STATISTIQUES FINALES")
         print("=" * 50)
         print(f"📈 Total BDE : {len(df)}")
+        if 'cluster_id' in df.columns:
+            print(f"🧩 BDE distincts : {df['cluster_id'].nunique()}")
         print(f"📧 Emails récupérés : {emails_count} ({emails_count/len(df)*100:.1f}%)")
         print(f"🌐 Sites web récupérés : {sites_count} ({sites_count/len(df)*100:.1f}%)")
         print(f"📁 Fichier final : {output_file}")
@@ -24,8 +24,91 @@ HEADERS = {
     "Cache-Control": "max-age=0"
 }
 
-# Délais entre les requêtes (en secondes) - important pour être poli !
-DELAY_BETWEEN_REQUESTS = 2
+# Limiteur de débit partagé (requêtes par seconde) - important pour être poli !
+# Le débit démarre à REQUESTS_PER_SECOND puis s'adapte : il baisse de moitié
+# si le serveur répond 429/503 ou lentement, et remonte doucement sinon
+REQUESTS_PER_SECOND = 0.5
+RATE_LIMIT_BURST = 2            # Requêtes autorisées d'affilée sans attendre
+MIN_REQUESTS_PER_SECOND = 0.1
+MAX_REQUESTS_PER_SECOND = 4
+RATE_INCREASE_STEP = 0.05       # Augmentation après chaque réponse saine
+RATE_DECREASE_FACTOR = 0.5      # Division du débit en cas de ralentissement
+SLOW_RESPONSE_SECONDS = 5       # Réponse HTTP considérée comme lente
+SLOW_PAGE_LOAD_SECONDS = 10     # Chargement Selenium considéré comme lent
+
+# Temps maximum d'attente d'un élément de la page (titre, cartes...) en secondes
+READY_TIMEOUT = 15
+
+# Navigation légère : pas d'images, polices, médias ni scripts tiers,
+# et driver.get() rend la main dès que le DOM est prêt
+LEAN_BROWSING = True
+
+# Nombre de navigateurs Chrome lancés en parallèle pour les pages de détail
+# (tous les navigateurs passent par le même limiteur de débit : le pool ne
+# multiplie pas les requêtes par seconde envoyées au site)
+DRIVER_POOL_SIZE = 4
+
+# Taille de la file de liens entre les pages de liste et les pages de détail
+# (le parcours des pages de liste attend si la file est pleine)
+PIPELINE_QUEUE_SIZE = 50
+
+# Navigateur partagé (browser_service.py) : Chrome et chromedriver restent lancés
+# entre deux scripts, qui s'y attachent en quelques millisecondes
+BROWSER_SERVICE_HOST = "127.0.0.1"
+BROWSER_DEBUG_PORT = 9222    # Port DevTools de Chrome (--remote-debugging-port)
+BROWSER_DRIVER_PORT = 9515   # Port de chromedriver
+BROWSER_PROFILE_DIR = "data/browser_profile"  # Profil conservé (cache, cookies)
+BROWSER_SERVICE_STATE = "data/browser_service.json"
+BROWSER_SERVICE_HEADLESS = True
+CHROME_BINARY = None  # Chemin de Chrome (None : détection automatique)
+
+# Journal SQLite du crawl (pages et BDE traités), utilisé par --resume
+FRONTIER_DB = "data/crawl_frontier.sqlite3"
+
+# Limite de la découverte automatique du nombre de pages de liste
+# (recherche exponentielle puis dichotomique sur "la page contient des associations")
+MAX_DISCOVERY_PAGE = 500
+
+# Crawl distribué (distributed_crawl.py) : base SQLite partagée par les workers
+# (sur plusieurs machines : fichier sur un stockage partagé qui gère les verrous)
+DISTRIBUTED_DB = "data/distributed_crawl.sqlite3"
+LEASE_SECONDS = 120      # Durée d'un bail avant réattribution à un autre worker
+LEASE_BATCH_SIZE = 10    # Tâches réservées en une fois par un worker
+MAX_TASK_ATTEMPTS = 3    # Au-delà, la tâche est marquée en échec
+
+# Fichier de résultats écrit au fil de l'eau : "csv" ou "jsonl"
+SINK_FORMAT = "csv"
+SINK_BATCH_SIZE = 20      # Écriture sur le disque (fsync) tous les N BDE...
+SINK_FLUSH_SECONDS = 10   # ...ou au plus tard toutes les N secondes
+
+# Recrawl conditionnel : les pages inchangées depuis le dernier run
+# (304, ou même hash de contenu) ne sont pas ré-extraites
+CONDITIONAL_RECRAWL = True
+VALIDATOR_DB = "data/validators.sqlite3"
+# Version de l'extraction des champs, enregistrée avec chaque bde_info : à
+# incrémenter quand l'extraction change, les pages inchangées sont alors ré-extraites
+EXTRACTOR_VERSION = 1
+
+# Associations déjà scrapées (tous les scrapers, d'un run à l'autre) : avec --skip-seen,
+# ignorées pendant SEEN_URL_MAX_AGE_DAYS jours, puis re-scrapées (0 : toujours re-scraper)
+# Sans --skip-seen, seuls les doublons du run sont ignorés
+SEEN_URLS_DB = "data/seen_urls.sqlite3"
+SEEN_URL_MAX_AGE_DAYS = 30
+
+# Archive compressée (zstd) des pages téléchargées, pour ré-extraire sans re-crawler
+# (nécessite pip install zstandard)
+ARCHIVE_PAGES = False
+ARCHIVE_DIR = "data/archive"
+ARCHIVE_SEGMENT_BYTES = 256 * 1024 * 1024  # Taille max d'un fichier segment
+ARCHIVE_COMPRESSION_LEVEL = 3
+
+# Extraction par simple requête HTTP (Selenium seulement si la page n'est pas exploitable)
+USE_HTTP_BACKEND = True
+HTTP_TIMEOUT = 10
+
+# Crawl asynchrone : nombre maximum de requêtes simultanées (global et par hôte)
+ASYNC_MAX_CONCURRENCY = 8
+ASYNC_MAX_PER_HOST = 4
 
 # Nom du fichier de sortie
 OUTPUT_FILENAME = "bde_scraping_results"
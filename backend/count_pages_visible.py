@@ -1,27 +1,20 @@
 """
 Script pour compter les pages avec navigateur visible
+(Chrome à part, hors du navigateur partagé qui est invisible par défaut)
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 from config import BASE_URL, SEARCH_PARAMS
+from browser_service import launch_driver
 
 def count_pages_visible():
     """
     Compte les pages avec navigateur visible pour debug
     """
     print("🚀 Configuration du navigateur visible...")
-    chrome_options = Options()
-    # Pas de headless pour voir ce qui se passe
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # Chrome visible démarré pour ce script (chromedriver déjà téléchargé par browser_service.py)
+    driver = launch_driver(headless=False)
     
     try:
         url = f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}"
@@ -0,0 +1,279 @@
+"""
+Coordinateur du crawl distribué (SQLite partagé)
+Les pages de liste puis les associations découvertes sont des tâches que
+les workers réservent par lots avec un bail (lease) : un worker qui
+s'arrête sans rendre ses tâches les perd à l'expiration du bail, et un
+autre worker les reprend. Chaque résultat est validé immédiatement.
+
+La base peut être partagée par plusieurs processus (même machine) ou
+plusieurs machines (fichier sur un stockage partagé qui gère les verrous) :
+pas de mode WAL, et les réservations se font dans une transaction
+BEGIN IMMEDIATE pour qu'une tâche ne soit donnée qu'à un seul worker
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+from config import DISTRIBUTED_DB, LEASE_SECONDS, LEASE_BATCH_SIZE, MAX_TASK_ATTEMPTS
+
+LISTING = 'listing'
+ASSOCIATION = 'association'
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    data TEXT,
+    error TEXT,
+    updated_at TEXT,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks (kind, page, position);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    host TEXT,
+    tasks_done INTEGER NOT NULL DEFAULT 0,
+    last_seen REAL
+);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def default_worker_id():
+    """
+    Identifiant d'un worker : machine et processus
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CrawlCoordinator:
+    """
+    File de tâches avec baux, partagée par les workers de toutes les machines
+    Une tâche : (id, kind, key, page, position), key = numéro de page ou URL
+    """
+
+    def __init__(self, db_path=DISTRIBUTED_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Transactions explicites (BEGIN IMMEDIATE), attente si un autre worker écrit
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def _write(self, statements):
+        """
+        Exécute une fonction d'écriture dans une transaction qui verrouille la base
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reset(self):
+        """
+        Vide la file (nouveau crawl)
+        """
+        def statements(conn):
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM workers")
+        self._write(statements)
+
+    def add_listing_pages(self, pages):
+        """
+        Ajoute les pages de liste à traiter (les pages déjà connues sont ignorées)
+        """
+        now = _now()
+        self._write(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO tasks (kind, key, page, position, status, updated_at) VALUES (?, ?, ?, 0, ?, ?)",
+            [(LISTING, str(page), page, PENDING, now) for page in pages]
+        ))
+
+    def claim(self, worker, limit=LEASE_BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+        """
+        Réserve jusqu'à limit tâches pour le worker : en attente, ou dont le bail a expiré
+        Les pages de liste passent d'abord (elles alimentent la file), puis les
+        associations dans l'ordre des pages
+        """
+        now = time.time()
+
+        def statements(conn):
+            # Tâches reprises trop souvent après expiration : échec définitif
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, error = 'bail expiré trop de fois', updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, _now(), LEASED, now, MAX_TASK_ATTEMPTS)
+            )
+            tasks = conn.execute(
+                "SELECT id, kind, key, page, position FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY kind != ?, page, position LIMIT ?",
+                (PENDING, LEASED, now, LISTING, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                [(LEASED, worker, now + lease_seconds, _now(), task[0]) for task in tasks]
+            )
+            conn.execute(
+                "INSERT INTO workers (worker, host, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT (worker) DO UPDATE SET last_seen = excluded.last_seen",
+                (worker, socket.gethostname(), now)
+            )
+            return tasks
+
+        return self._write(statements)
+
+    def renew(self, worker, task_ids, lease_seconds=LEASE_SECONDS):
+        """
+        Prolonge les baux encore détenus par le worker (tâches pas encore traitées du lot)
+        """
+        if not task_ids:
+            return
+        now = time.time()
+
+        def statements(conn):
+            conn.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND status = ?",
+                [(now + lease_seconds, task_id, worker, LEASED) for task_id in task_ids]
+            )
+            conn.execute("UPDATE workers SET last_seen = ? WHERE worker = ?", (now, worker))
+        self._write(statements)
+
+    def complete_listing(self, task_id, worker, page, links):
+        """
+        Termine une page de liste et ajoute ses associations à la file
+        (une association déjà connue par une autre page n'est pas ajoutée deux fois)
+        """
+        now = _now()
+
+        def statements(conn):
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, key, page, position, status, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(ASSOCIATION, url, page, position, PENDING, now) for position, url in enumerate(links)]
+            )
+            self._mark_done(conn, task_id, worker, {'nb_links': len(links)})
+        self._write(statements)
+
+    def complete_association(self, task_id, worker, bde_info):
+        self._write(lambda conn: self._mark_done(conn, task_id, worker, bde_info))
+
+    def _mark_done(self, conn, task_id, worker, data):
+        # Un worker en retard (bail expiré puis réattribué) peut encore livrer son résultat
+        conn.execute(
+            "UPDATE tasks SET status = ?, worker = ?, data = ?, error = NULL, updated_at = ? WHERE id = ? AND status != ?",
+            (DONE, worker, json.dumps(data, ensure_ascii=False), _now(), task_id, DONE)
+        )
+        conn.execute("UPDATE workers SET tasks_done = tasks_done + 1, last_seen = ? WHERE worker = ?",
+                     (time.time(), worker))
+
+    def fail(self, task_id, worker, error):
+        """
+        Rend une tâche en échec : elle repart en attente tant qu'il reste des tentatives
+        """
+        self._write(lambda conn: conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (MAX_TASK_ATTEMPTS, FAILED, PENDING, str(error), _now(), task_id, worker, LEASED)
+        ))
+
+    def release(self, worker):
+        """
+        Rend les tâches réservées par un worker qui s'arrête proprement
+        """
+        self._write(lambda conn: conn.execute(
+            "UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL, attempts = MAX(attempts - 1, 0), "
+            "updated_at = ? WHERE worker = ? AND status = ?",
+            (PENDING, _now(), worker, LEASED)
+        ))
+
+    def remaining(self):
+        """
+        Nombre de tâches pas encore terminées (en attente ou réservées)
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def iter_results(self, batch_size=500):
+        """
+        Données des associations terminées, dans l'ordre des pages
+        Renvoie des couples (url, bde_info), lus par lots
+        """
+        # Un bail réattribué peut livrer deux fois la même page : plusieurs associations
+        # ont alors le même (page, position), l'id les départage dans le curseur
+        last = (-1, -1, -1)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT page, position, id, key, data FROM tasks WHERE kind = ? AND status = ? "
+                    "AND (page, position, id) > (?, ?, ?) ORDER BY page, position, id LIMIT ?",
+                    (ASSOCIATION, DONE, *last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for page, position, task_id, url, data in rows:
+                yield url, json.loads(data)
+            last = rows[-1][:3]
+
+    def stats(self):
+        """
+        Compte les tâches par type et par statut
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status").fetchall()
+        stats = {LISTING: {}, ASSOCIATION: {}}
+        for kind, status, count in rows:
+            stats[kind][status] = count
+        return stats
+
+    def active_workers(self, within_seconds=LEASE_SECONDS):
+        """
+        Workers vus récemment : liste de (worker, machine, tâches terminées)
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT worker, host, tasks_done FROM workers WHERE last_seen >= ? ORDER BY worker",
+                (time.time() - within_seconds,)
+            ).fetchall()
+
+    def summary(self):
+        """
+        Texte court pour les logs
+        """
+        stats = self.stats()
+        parts = []
+        for kind, label in ((LISTING, "pages"), (ASSOCIATION, "associations")):
+            counts = stats[kind]
+            parts.append(f"{label} {counts.get(DONE, 0)} terminées / {counts.get(LEASED, 0)} en cours / "
+                         f"{counts.get(PENDING, 0)} en attente / {counts.get(FAILED, 0)} en échec")
+        return ", ".join(parts)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
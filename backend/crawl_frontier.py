@@ -0,0 +1,185 @@
+"""
+Frontière de crawl persistante (SQLite)
+Enregistre au fil de l'eau les pages de liste et les associations à traiter
+(pending / done / failed) ainsi que les données extraites : un run interrompu
+peut reprendre là où il s'est arrêté sans refaire ce qui est déjà terminé
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from config import FRONTIER_DB
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listing_pages (
+    page INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    nb_links INTEGER,
+    error TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS associations (
+    url TEXT PRIMARY KEY,
+    page INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT,
+    error TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_associations_order ON associations (page, position);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class CrawlFrontier:
+    """
+    Journal SQLite du crawl, partagé par les threads du scraper
+    Chaque écriture est validée immédiatement (commit) : un arrêt brutal
+    ne perd au plus que la page en cours d'extraction
+    """
+
+    def __init__(self, db_path=FRONTIER_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def reset(self, pages):
+        """
+        Nouveau run : vide le journal et ajoute les pages de liste à traiter
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM associations")
+            self._conn.execute("DELETE FROM listing_pages")
+            self._conn.executemany(
+                "INSERT INTO listing_pages (page, status, updated_at) VALUES (?, ?, ?)",
+                [(page, PENDING, _now()) for page in pages]
+            )
+
+    def pending_pages(self):
+        """
+        Pages de liste pas encore terminées (en attente ou en échec)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page FROM listing_pages WHERE status != ? ORDER BY page", (DONE,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def record_listing(self, page, links):
+        """
+        Enregistre les liens d'une page de liste et la marque comme terminée
+        Renvoie les liens qui restent à extraire (déjà terminés exclus)
+        """
+        if not links:
+            self.mark_page_failed(page, "aucun lien trouvé")
+            return []
+
+        now = _now()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO associations (url, page, position, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(url, page, position, PENDING, now) for position, url in enumerate(links)]
+            )
+            self._conn.execute(
+                "UPDATE listing_pages SET status = ?, nb_links = ?, error = NULL, updated_at = ? WHERE page = ?",
+                (DONE, len(links), now, page)
+            )
+            # Liens à traiter : ceux de cette page pas encore terminés (une association
+            # déjà listée par une autre page y est traitée, pas ici une seconde fois)
+            todo = {row[0] for row in self._conn.execute(
+                "SELECT url FROM associations WHERE page = ? AND status != ?", (page, DONE)
+            )}
+        return [url for url in links if url in todo]
+
+    def mark_page_done(self, page, nb_links=0):
+        """
+        Page de liste terminée sans association à traiter (toutes déjà scrapées)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE listing_pages SET status = ?, nb_links = ?, error = NULL, updated_at = ? WHERE page = ?",
+                (DONE, nb_links, _now(), page)
+            )
+
+    def mark_page_failed(self, page, error):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE listing_pages SET status = ?, error = ?, updated_at = ? WHERE page = ?",
+                (FAILED, str(error), _now(), page)
+            )
+
+    def pending_associations(self):
+        """
+        Associations connues mais pas encore extraites, dans l'ordre des pages :
+        liste de (page, position, url)
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT page, position, url FROM associations WHERE status != ? ORDER BY page, position", (DONE,)
+            ).fetchall()
+
+    def record_association(self, url, bde_info, error=None):
+        """
+        Enregistre le résultat d'une association (échec si bde_info est vide)
+        """
+        if bde_info:
+            status, data = DONE, json.dumps(bde_info, ensure_ascii=False)
+        else:
+            status, data = FAILED, None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE associations SET status = ?, data = ?, error = ?, updated_at = ? WHERE url = ?",
+                (status, data, error, _now(), url)
+            )
+
+    def iter_results(self, batch_size=500):
+        """
+        Données des associations terminées, dans l'ordre des pages
+        (lues par lots pour ne pas tout charger en mémoire)
+        """
+        last = (-1, -1)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT page, position, data FROM associations WHERE status = ? AND (page, position) > (?, ?) "
+                    "ORDER BY page, position LIMIT ?", (DONE, last[0], last[1], batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for page, position, data in rows:
+                yield json.loads(data)
+            last = rows[-1][:2]
+
+    def stats(self):
+        """
+        Compte les pages et associations par statut
+        """
+        with self._lock:
+            pages = dict(self._conn.execute("SELECT status, COUNT(*) FROM listing_pages GROUP BY status").fetchall())
+            associations = dict(self._conn.execute("SELECT status, COUNT(*) FROM associations GROUP BY status").fetchall())
+        return {'pages': pages, 'associations': associations}
+
+    def summary(self):
+        """
+        Texte court pour les logs
+        """
+        stats = self.stats()
+        pages, associations = stats['pages'], stats['associations']
+        return (f"pages {pages.get(DONE, 0)} terminées / {pages.get(PENDING, 0)} en attente / {pages.get(FAILED, 0)} en échec, "
+                f"BDE {associations.get(DONE, 0)} terminés / {associations.get(PENDING, 0)} en attente / {associations.get(FAILED, 0)} en échec")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,141 @@
+"""
+Pipeline producteur / consommateurs pour le crawl
+Un thread parcourt les pages de liste et remplit une file bornée de liens,
+pendant que les consommateurs extraient les pages d'associations :
+la page de liste suivante est chargée sans attendre la fin de la précédente
+"""
+
+import queue
+import threading
+from collections import deque
+from config import PIPELINE_QUEUE_SIZE
+
+# Signal de fin envoyé à chaque consommateur
+_END = object()
+
+
+class ListingDetailPipeline:
+    """
+    Étage 1 (producteur) : fetch_listing(page) -> liste d'URLs d'associations
+    Étage 2 (consommateurs) : process_detail(url) -> bde_info ou None
+
+    La file est bornée (queue_size) : si les consommateurs sont en retard,
+    le producteur attend (backpressure) au lieu d'accumuler les liens.
+    Les résultats sont transmis à on_result(url, bde_info) dans l'ordre des
+    pages puis des liens : seuls les résultats arrivés en avance sont gardés
+    en mémoire, le temps que les précédents soient terminés.
+    Une erreur sur une page de liste ne concerne que cette page : elle est
+    passée à on_listing_error(page, erreur) et le parcours continue.
+    """
+
+    def __init__(self, fetch_listing, process_detail, num_consumers, queue_size=PIPELINE_QUEUE_SIZE,
+                 on_listing_error=None):
+        self.fetch_listing = fetch_listing
+        self.process_detail = process_detail
+        self.num_consumers = max(1, num_consumers)
+        self.queue_size = queue_size
+        self.on_listing_error = on_listing_error
+
+        # Statistiques du dernier run
+        self.listed_pages = 0
+        self.listed_links = 0
+        self.failed_pages = 0
+        self.processed = 0
+
+    def _enqueue(self, links_queue, item):
+        """
+        Réserve la place du lien dans l'ordre de sortie puis le met dans la file
+        """
+        with self._order_lock:
+            self._order.append(item[:2])
+        links_queue.put(item)  # Bloque si la file est pleine
+        self.listed_links += 1
+
+    def _produce(self, pages, seed_items, links_queue):
+        """
+        Met d'abord les liens déjà connus dans la file, puis parcourt les pages de liste
+        """
+        try:
+            for item in seed_items:
+                self._enqueue(links_queue, tuple(item))
+
+            for page in pages:
+                try:
+                    links = self.fetch_listing(page)
+                except Exception as e:
+                    print(f"❌ Erreur sur la page de liste {page} : {str(e)}")
+                    self.failed_pages += 1
+                    if self.on_listing_error:
+                        self.on_listing_error(page, e)
+                    continue
+                self.listed_pages += 1
+                if not links:
+                    print(f"❌ Aucun BDE trouvé sur la page {page}")
+                    continue
+                for index, url in enumerate(links):
+                    self._enqueue(links_queue, (page, index, url))
+        except Exception as e:
+            print(f"❌ Erreur du producteur (pages de liste) : {str(e)}")
+        finally:
+            # Chaque consommateur reçoit un signal de fin, même en cas d'erreur
+            for _ in range(self.num_consumers):
+                links_queue.put(_END)
+
+    def _consume(self, links_queue, on_result):
+        """
+        Extrait les associations de la file jusqu'au signal de fin
+        """
+        while True:
+            item = links_queue.get()
+            if item is _END:
+                break
+
+            page, index, url = item
+            try:
+                bde_info = self.process_detail(url)
+            except Exception as e:
+                print(f"   ❌ Erreur lors de l'extraction de {url} : {str(e)}")
+                bde_info = None
+
+            with self._order_lock:
+                self._pending[(page, index)] = (url, bde_info)
+                # Transmet tous les résultats consécutifs disponibles, dans l'ordre
+                while self._order and self._order[0] in self._pending:
+                    done_url, done_info = self._pending.pop(self._order.popleft())
+                    self.processed += 1
+                    if on_result:
+                        on_result(done_url, done_info)
+
+    def run(self, pages, seed_items=(), on_result=None):
+        """
+        Lance le pipeline et attend que les deux étages soient vidés
+        seed_items : (page, index, url) déjà connus à traiter en premier (reprise)
+        on_result : appelé avec (url, bde_info) dans l'ordre des pages puis des liens
+        Renvoie le nombre de liens traités
+        """
+        self.listed_pages = 0
+        self.listed_links = 0
+        self.failed_pages = 0
+        self.processed = 0
+
+        self._order = deque()
+        self._pending = {}
+        self._order_lock = threading.Lock()
+
+        links_queue = queue.Queue(maxsize=self.queue_size)
+
+        producer = threading.Thread(target=self._produce, args=(pages, seed_items, links_queue), daemon=True)
+        consumers = [
+            threading.Thread(target=self._consume, args=(links_queue, on_result), daemon=True)
+            for _ in range(self.num_consumers)
+        ]
+
+        producer.start()
+        for consumer in consumers:
+            consumer.start()
+
+        producer.join()
+        for consumer in consumers:
+            consumer.join()
+
+        return self.processed
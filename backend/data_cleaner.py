@@ -5,8 +5,26 @@ Nettoie le fichier CSV pour enlever le CSS et garder seulement les données util
 
 import pandas as pd
 import re
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+CHUNK_SIZE = 1000  # Lignes par bloc en mode streaming (environ 2,5 Mo de HTML brut)
+PROGRESS_EVERY = 10  # Blocs entre deux lignes d'avancement
+COLUMNS_ORDER = ['nom_ecole', 'email', 'telephone', 'site_internet', 'adresse', 'nom_personne', 'prenom_personne', 'url_source']
+
+# Règles de nettoyage des adresses, compilées une fois, dans l'ordre de clean_address_field :
+# (motif, remplacement, dernier caractère de toute correspondance ou None)
+# Le texte après le dernier ">" (ou ";") ne peut pas correspondre : il n'est pas parcouru
+ADDRESS_RULES = [
+    (re.compile(r'<[^>]+>'), '', '>'),               # Balises HTML
+    (re.compile(r'[a-zA-Z-]+:[^;]+;'), '', ';'),     # Propriétés CSS
+    (re.compile(r'https?://[^\s]+'), '', None),      # URL
+    (re.compile(r'[{}%\[\]@#]+'), '', None),         # Caractères spéciaux
+]
+WEBSITE_URL_RE = re.compile(r'https?://[^\s,;)]+[a-zA-Z0-9/]')
+
 def clean_address_field(address_text):
     """
     Nettoie le champ adresse en supprimant le CSS et les styles
@@ -55,30 +73,143 @@ def clean_website_field(website_text):
     
     return ""
 
-def clean_csv_data(input_file, output_file):
+def apply_rule(text, pattern, replacement, last_char):
+    """
+    pattern.sub limité au texte qui peut contenir une correspondance
+    """
+    if last_char is None:
+        return pattern.sub(replacement, text)
+    end = text.rfind(last_char) + 1
+    if not end:
+        return text
+    return pattern.sub(replacement, text[:end]) + text[end:]
+
+def clean_address_value(address_text):
+    """
+    Même résultat que clean_address_field, avec les règles compilées
+    (valeur non vide)
+    """
+    address_text = str(address_text)
+    if address_text.startswith("100%;font-style") or "@font-face" in address_text:
+        return ""
+    for pattern, replacement, last_char in ADDRESS_RULES:
+        address_text = apply_rule(address_text, pattern, replacement, last_char)
+    # Espaces multiples remplacés par un seul, et bords retirés (comme \s+ puis strip)
+    return ' '.join(address_text.split())
+
+def clean_website_value(website_text):
+    """
+    Même résultat que clean_website_field (valeur non vide) : seule la première URL compte
+    """
+    match = WEBSITE_URL_RE.search(str(website_text))
+    if match:
+        clean_url = match.group(0).rstrip('.,;)')
+        if 'helloasso.com' not in clean_url and 'api.api-engagement' not in clean_url:
+            return clean_url
+    return ""
+
+def clean_column(series, clean_value):
+    """
+    Nettoie une colonne entière : chaque valeur distincte n'est nettoyée
+    qu'une fois (les blocs HTML répétés d'une page à l'autre sont fréquents),
+    les cellules vides donnent ""
+    """
+    cleaned = {}
+    for value in series.tolist():
+        if value not in cleaned:
+            cleaned[value] = "" if pd.isna(value) or value == "" else clean_value(value)
+    return pd.Series([cleaned[value] for value in series.tolist()], index=series.index, dtype=object)
+
+def clean_dataframe(df):
+    """
+    Nettoie un tableau de résultats (fichier entier ou bloc) : adresses et
+    sites web nettoyés, lignes sans école retirées, colonnes réordonnées
+    """
+    df['adresse'] = clean_column(df['adresse'], clean_address_value)
+    df['site_internet'] = clean_column(df['site_internet'], clean_website_value)
+    
+    # Supprime les lignes où l'école est vide
+    df = df[df['nom_ecole'].notna() & (df['nom_ecole'] != "")]
+    
+    # Réorganise les colonnes dans un ordre plus logique
+    return df[COLUMNS_ORDER]
+
+def clean_chunk(chunk):
+    """
+    Nettoie un bloc (exécuté dans un processus du pool) : (lignes lues, bloc nettoyé)
+    """
+    return len(chunk), clean_dataframe(chunk)
+
+def cleaned_chunks(chunks, processes=1):
+    """
+    Blocs nettoyés, dans l'ordre du fichier
+    processes > 1 : nettoyés en parallèle, au plus deux blocs par processus
+    en cours à la fois (la mémoire reste bornée même si l'écriture est lente)
+    """
+    if processes <= 1:
+        for chunk in chunks:
+            yield clean_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clean_chunk, chunk))
+            if len(pending) >= processes * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def clean_csv_stream(input_file, output_file, chunksize=CHUNK_SIZE, processes=1):
+    """
+    Nettoyage en streaming : le fichier est lu par blocs de chunksize lignes,
+    chaque bloc nettoyé est ajouté au fichier de sortie. La mémoire utilisée
+    dépend de la taille des blocs, pas de celle du fichier.
+    Les cellules sont lues comme texte : pas de types devinés bloc par bloc
+    (un bloc avec un téléphone vide passerait en nombres à virgule), et les
+    téléphones gardent leur 0 initial
+    Renvoie (lignes lues, BDE écrits)
+    """
+    rows_read = rows_written = 0
+    chunks = pd.read_csv(input_file, chunksize=chunksize, dtype=str)
+    with open(output_file, 'w', encoding='utf-8', newline='') as output:
+        header = True
+        for index, (chunk_rows, cleaned) in enumerate(cleaned_chunks(chunks, processes), 1):
+            cleaned.to_csv(output, index=False, header=header)
+            header = False
+            rows_read += chunk_rows
+            rows_written += len(cleaned)
+            if index % PROGRESS_EVERY == 0:
+                print(f"   📦 {index} blocs : {rows_read} lignes lues, {rows_written} BDE écrits")
+        if header:
+            pd.DataFrame(columns=COLUMNS_ORDER).to_csv(output, index=False)  # Fichier sans lignes
+    return rows_read, rows_written
+
+def clean_csv_data(input_file, output_file, chunksize=None, processes=1):
     """
     Fonction principale pour nettoyer le fichier CSV
+    chunksize : mode streaming par blocs de chunksize lignes (défaut : tout le
+    fichier en mémoire), processes : processus de nettoyage (streaming)
     """
     print(f"🧹 Nettoyage du fichier : {input_file}")
     
     try:
-        # Lit le fichier CSV
-        df = pd.read_csv(input_file)
-        print(f"📊 {len(df)} lignes trouvées")
+        if chunksize or processes > 1:
+            chunksize = chunksize or CHUNK_SIZE
+            print(f"🔧 Nettoyage par blocs de {chunksize} lignes ({processes} processus)...")
+            rows_read, rows_written = clean_csv_stream(input_file, output_file, chunksize, processes)
+            print(f"📊 {rows_read} lignes trouvées")
+            print(f"✅ Fichier nettoyé sauvegardé : {output_file}")
+            print(f"📊 {rows_written} BDE dans le fichier final")
+            return True
         
-        # Nettoie chaque colonne
-        print("🔧 Nettoyage des adresses...")
-        df['adresse'] = df['adresse'].apply(clean_address_field)
-        
-        print("🔧 Nettoyage des sites web...")
-        df['site_internet'] = df['site_internet'].apply(clean_website_field)
-        
-        # Supprime les lignes où l'école est vide
-        df = df[df['nom_ecole'].notna() & (df['nom_ecole'] != "")]
+        # Lit le fichier CSV, cellules en texte comme en streaming (téléphones avec leur 0 initial)
+        df = pd.read_csv(input_file, dtype=str)
+        print(f"📊 {len(df)} lignes trouvées")
         
-        # Réorganise les colonnes dans un ordre plus logique
-        columns_order = ['nom_ecole', 'email', 'telephone', 'site_internet', 'adresse', 'nom_personne', 'prenom_personne', 'url_source']
-        df = df[columns_order]
+        # Nettoie les adresses et les sites web
+        print("🔧 Nettoyage des adresses et des sites web...")
+        df = clean_dataframe(df)
         
         # Sauvegarde le fichier nettoyé
         df.to_csv(output_file, index=False, encoding='utf-8')
@@ -112,9 +243,16 @@ def display_sample_data(file_path, num_rows=5):
         print(f"❌ Erreur lors de l'affichage : {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nettoyage des données scrapées")
+    parser.add_argument("input_file", nargs="?", help="défaut : dernier data/bde_scraping_results_*.csv")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help=f"lecture par blocs de N lignes, mémoire bornée (ex. {CHUNK_SIZE})")
+    parser.add_argument("--processes", type=int, default=1, help="processus de nettoyage (mode par blocs)")
+    args = parser.parse_args()
+
     # Trouve le fichier CSV le plus récent
     import glob
-    csv_files = glob.glob("data/bde_scraping_results_*.csv")
+    csv_files = [args.input_file] if args.input_file else glob.glob("data/bde_scraping_results_*.csv")
     if csv_files:
         latest_file = max(csv_files)
         
@@ -123,8 +261,12 @@ if __name__ == "__main__":
         clean_file = f"data/bde_clean_data_{timestamp}.csv"
         
         # Nettoie les données
-        if clean_csv_data(latest_file, clean_file):
+        if clean_csv_data(latest_file, clean_file, args.chunk_size, args.processes):
             display_sample_data(clean_file)
+
+            # Regroupe les doublons du fichier nettoyé (créé par ce run : cluster_id y est ajouté)
+            from entity_resolution import resolve_csv
+            resolve_csv(clean_file, overwrite=True)
         
     else:
-        print("❌ Aucun fichier de scraping trouvé dans le dossier data/") 
\ No newline at end of file
+        print("❌ Aucun fichier de scraping trouvé dans le dossier data/")
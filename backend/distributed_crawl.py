@@ -0,0 +1,265 @@
+"""
+🌍 CRAWL DISTRIBUÉ SUR PLUSIEURS MACHINES
+Un coordinateur (base SQLite partagée, crawl_coordinator.py) découpe les
+pages de liste puis les associations découvertes en tâches ; des workers
+lancés sur n'importe quelle machine réservent des lots de tâches avec un
+bail, extraient les données (HTTP, Selenium en repli avec --selenium) et
+renvoient les résultats. Le bail d'un worker arrêté expire et ses tâches
+sont reprises par un autre. La fusion écrit un seul fichier dédoublonné.
+Le débit de politesse (REQUESTS_PER_SECOND) est partagé : chaque worker
+n'en garde que 1/n, n étant le nombre de workers actifs dans la base.
+
+Usage (une seule machine, quatre workers) :
+    python3 distributed_crawl.py init                  # nombre de pages découvert automatiquement
+    python3 distributed_crawl.py worker --processes 4
+    python3 distributed_crawl.py status
+    python3 distributed_crawl.py merge --format jsonl
+Sur plusieurs machines : même commande worker avec --db vers le fichier partagé.
+"""
+
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from config import DISTRIBUTED_DB, SINK_FORMAT, LEASE_BATCH_SIZE
+from crawl_coordinator import CrawlCoordinator, default_worker_id, LISTING
+from http_fetcher import HttpFetcher, extract_bde_links_from_html
+from rate_limiter import TokenBucketRateLimiter
+from page_discovery import discover_last_page, http_listing_probe, listing_page_url
+from record_sink import RecordSink
+from url_store import canonical_association_url
+
+OUTPUT_FILENAME = "bde_distributed"
+DEFAULT_LAST_PAGE = 29  # Repli si la découverte du nombre de pages échoue
+IDLE_SECONDS = 2        # Attente quand toutes les tâches restantes sont réservées par d'autres
+
+
+class CrawlWorker:
+    """
+    Worker : réserve des tâches auprès du coordinateur, les traite et rend les résultats
+    """
+
+    def __init__(self, coordinator, worker_id=None, batch_size=LEASE_BATCH_SIZE, use_selenium=False, processes=1):
+        self.coordinator = coordinator
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size
+        self.use_selenium = use_selenium
+        # Limiteur propre au processus : avant de connaître les autres workers,
+        # on part du nombre de processus lancés sur cette machine
+        self.rate_limiter = TokenBucketRateLimiter()
+        self.rate_limiter.set_share(1 / processes)
+        self.http_fetcher = HttpFetcher(rate_limiter=self.rate_limiter)
+        self.driver = None
+        self.processed = 0
+
+    def extract_association(self, bde_url):
+        """
+        bde_info d'une association par HTTP, avec le navigateur partagé en repli
+        (chaque processus worker navigue dans son propre onglet)
+        """
+        bde_info = self.http_fetcher.fetch_bde_details(bde_url)
+        if bde_info or not self.use_selenium:
+            return bde_info
+
+        from browser_service import attach_driver
+        from browser_extractor import extract_bde_info_in_browser
+        from page_readiness import wait_for_association_page
+        from rate_limiter import throttled_get
+
+        if self.driver is None:
+            self.driver = attach_driver(page_load_strategy='eager')
+        throttled_get(self.driver, bde_url, self.http_fetcher.rate_limiter)
+        wait_for_association_page(self.driver)
+        return extract_bde_info_in_browser(self.driver, bde_url)['bde_info']
+
+    def share_rate(self):
+        """
+        Partage le débit configuré entre les workers actifs, toutes machines
+        confondues : chaque processus a son propre limiteur, seule la base
+        commune les connaît tous
+        """
+        workers = max(1, len(self.coordinator.active_workers()))
+        if 1 / workers != self.rate_limiter.share:
+            self.rate_limiter.set_share(1 / workers)
+            print(f"🚦 [{self.worker_id}] {workers} workers actifs : "
+                  f"{self.rate_limiter.rate:.2f} requêtes/s pour ce worker")
+
+    def process(self, task):
+        """
+        Traite une tâche et rend son résultat au coordinateur
+        """
+        task_id, kind, key, page, position = task
+        if kind == LISTING:
+            url = listing_page_url(page)
+            page_html = self.http_fetcher.fetch(url)
+            links = extract_bde_links_from_html(page_html, url) if page_html else []
+            if not links:
+                self.coordinator.fail(task_id, self.worker_id, "aucun lien trouvé")
+                return
+            self.coordinator.complete_listing(task_id, self.worker_id, page, links)
+            print(f"📄 [{self.worker_id}] Page {page} : {len(links)} associations ajoutées à la file")
+        else:
+            bde_info = self.extract_association(key)
+            if not bde_info:
+                self.coordinator.fail(task_id, self.worker_id, "page incomplète")
+                return
+            self.coordinator.complete_association(task_id, self.worker_id, bde_info)
+            print(f"   ✅ [{self.worker_id}] {bde_info.get('nom_ecole') or 'Nom non trouvé'}")
+        self.processed += 1
+
+    def run(self):
+        """
+        Boucle du worker : s'arrête quand il ne reste plus aucune tâche à faire
+        """
+        print(f"👷 Worker {self.worker_id} démarré")
+        try:
+            while True:
+                tasks = self.coordinator.claim(self.worker_id, limit=self.batch_size)
+                self.share_rate()
+                if not tasks:
+                    if not self.coordinator.remaining():
+                        break
+                    # Tâches réservées par d'autres workers : on attend la fin ou l'expiration de leurs baux
+                    time.sleep(IDLE_SECONDS)
+                    continue
+
+                for index, task in enumerate(tasks):
+                    try:
+                        self.process(task)
+                    except Exception as e:
+                        print(f"   ❌ [{self.worker_id}] Erreur pour {task[2]} : {str(e)}")
+                        self.coordinator.fail(task[0], self.worker_id, str(e))
+                    # Le reste du lot est toujours à nous
+                    self.coordinator.renew(self.worker_id, [t[0] for t in tasks[index + 1:]])
+        except KeyboardInterrupt:
+            print(f"⏹️ Worker {self.worker_id} interrompu, tâches rendues au coordinateur")
+        finally:
+            # Rendre les tâches non traitées sans attendre l'expiration du bail
+            self.coordinator.release(self.worker_id)
+            if self.driver:
+                from browser_service import release_driver
+                release_driver(self.driver)
+        print(f"🏁 Worker {self.worker_id} terminé : {self.processed} tâches traitées")
+        return self.processed
+
+
+def run_worker(db_path, batch_size=LEASE_BATCH_SIZE, use_selenium=False, processes=1):
+    """
+    Point d'entrée d'un processus worker (une connexion SQLite par processus)
+    """
+    coordinator = CrawlCoordinator(db_path)
+    try:
+        return CrawlWorker(coordinator, batch_size=batch_size, use_selenium=use_selenium, processes=processes).run()
+    finally:
+        coordinator.close()
+
+
+def init_crawl(coordinator, start_page=0, end_page=None, reset=False):
+    """
+    Ajoute les pages de liste à la file (end_page=None : découverte automatique)
+    """
+    if reset:
+        coordinator.reset()
+    if end_page is None:
+        print("🔎 Découverte du nombre de pages de liste...")
+        end_page, _ = discover_last_page(http_listing_probe(HttpFetcher()), start_page)
+        if end_page is None:
+            end_page = max(start_page, DEFAULT_LAST_PAGE)
+            print(f"⚠️ Nombre de pages inconnu, repli sur les pages {start_page} à {end_page}")
+    coordinator.add_listing_pages(range(start_page, end_page + 1))
+    print(f"📋 Pages {start_page} à {end_page} ajoutées à la file : {coordinator.summary()}")
+
+
+def dedup_key(bde_url):
+    """
+    Clé de dédoublonnage : URL canonique de l'association (sans paramètres,
+    fragment, "/" final ni sous-page)
+    """
+    return canonical_association_url(bde_url) or bde_url.rstrip('/').lower()
+
+
+def merge_results(coordinator, output=None, output_format=SINK_FORMAT):
+    """
+    Écrit les résultats de tous les workers dans un seul fichier, dans l'ordre des pages, sans doublons
+    """
+    if not output:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = f"data/{OUTPUT_FILENAME}_{timestamp}.{output_format}"
+
+    seen = set()
+    duplicates = 0
+    with RecordSink(output) as sink:
+        for bde_url, bde_info in coordinator.iter_results():
+            key = dedup_key(bde_info.get('url_source') or bde_url)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            sink.write(bde_info)
+
+    print(f"🔗 {sink.count} BDE fusionnés, {duplicates} doublons ignorés")
+    if sink.count:
+        print(f"💾 Résultats : {output}")
+        return output
+    print("❌ Aucune donnée à sauvegarder")
+    return None
+
+
+def print_status(coordinator):
+    print(f"📒 {coordinator.summary()}")
+    workers = coordinator.active_workers()
+    print(f"👷 {len(workers)} workers actifs")
+    for worker, host, tasks_done in workers:
+        print(f"   {worker} ({host}) : {tasks_done} tâches terminées")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl distribué des BDE HelloAsso")
+    parser.add_argument("--db", default=DISTRIBUTED_DB, help="base SQLite partagée du coordinateur")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = commands.add_parser("init", help="ajoute les pages de liste à la file")
+    init_parser.add_argument("--start-page", type=int, default=0)
+    init_parser.add_argument("--end-page", type=int, default=None, help="défaut : découverte automatique")
+    init_parser.add_argument("--reset", action="store_true", help="vide la file avant (nouveau crawl)")
+
+    worker_parser = commands.add_parser("worker", help="traite des tâches jusqu'à ce que la file soit vide")
+    worker_parser.add_argument("--processes", type=int, default=1, help="nombre de workers sur cette machine")
+    worker_parser.add_argument("--batch-size", type=int, default=LEASE_BATCH_SIZE, help="tâches réservées par bail")
+    worker_parser.add_argument("--selenium", action="store_true", help="repli Selenium (navigateur partagé)")
+
+    commands.add_parser("status", help="avancement et workers actifs")
+
+    merge_parser = commands.add_parser("merge", help="fusionne les résultats en un fichier dédoublonné")
+    merge_parser.add_argument("--format", choices=["csv", "jsonl"], default=SINK_FORMAT)
+    merge_parser.add_argument("--output", help="fichier de sortie (défaut : data/bde_distributed_<date>.<format>)")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        if args.processes == 1:
+            run_worker(args.db, args.batch_size, args.selenium)
+            return
+        workers = [multiprocessing.Process(target=run_worker,
+                                           args=(args.db, args.batch_size, args.selenium, args.processes))
+                   for _ in range(args.processes)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return
+
+    coordinator = CrawlCoordinator(args.db)
+    try:
+        if args.command == "init":
+            init_crawl(coordinator, args.start_page, args.end_page, args.reset)
+        elif args.command == "status":
+            print_status(coordinator)
+        else:
+            merge_results(coordinator, args.output, args.format)
+    finally:
+        coordinator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Pool de navigateurs Chrome pour le scraping en parallèle
+Chaque worker possède son propre driver ; la politesse est assurée par
+le limiteur de débit partagé (rate_limiter.py) utilisé pour chaque requête
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from config import DRIVER_POOL_SIZE
+
+
+class DriverPool:
+    """
+    Pool borné de navigateurs Chrome headless
+
+    Les tâches sont distribuées aux navigateurs libres, et les résultats
+    sont renvoyés dans l'ordre des éléments fournis (comme map()).
+    """
+
+    def __init__(self, driver_factory, size=DRIVER_POOL_SIZE):
+        """
+        driver_factory : fonction sans argument qui crée un driver configuré
+        size : nombre de navigateurs lancés en parallèle
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, int(size))
+        self.drivers = []
+        self._available = queue.Queue()
+        self._executor = None
+
+    def start(self):
+        """
+        Lance tous les navigateurs du pool (en parallèle pour gagner du temps)
+        """
+        print(f"🔧 Lancement de {self.size} navigateurs...")
+
+        with ThreadPoolExecutor(max_workers=self.size) as launcher:
+            futures = [launcher.submit(self.driver_factory) for _ in range(self.size)]
+
+        for future in futures:
+            try:
+                driver = future.result()
+                self.drivers.append(driver)
+                self._available.put(driver)
+            except Exception as e:
+                print(f"⚠️ Impossible de lancer un navigateur : {str(e)}")
+
+        if not self.drivers:
+            raise RuntimeError("Aucun navigateur n'a pu être lancé")
+
+        self._executor = ThreadPoolExecutor(max_workers=len(self.drivers))
+        print(f"✅ Pool de {len(self.drivers)} navigateurs prêt")
+        return self
+
+    def run(self, func, item):
+        """
+        Exécute func(item, driver) sur le premier navigateur libre
+        (attend qu'un navigateur se libère si besoin)
+        """
+        driver = self._available.get()
+        try:
+            return func(item, driver)
+        finally:
+            self._available.put(driver)
+
+    def map(self, func, items):
+        """
+        Applique func(item, driver) à chaque élément en parallèle
+        Les résultats sont renvoyés dans l'ordre des éléments
+        """
+        if self._executor is None:
+            self.start()
+        return self._executor.map(lambda item: self.run(func, item), items)
+
+    def close(self):
+        """
+        Ferme tous les navigateurs du pool
+        """
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers = []
+        self._available = queue.Queue()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,346 @@
+"""
+Regroupement des fiches qui décrivent le même BDE (résolution d'entités)
+Le fichier nettoyé contient des BDE presque identiques : même nom écrit
+autrement, même email, sous-associations d'une même école...
+Plutôt que de comparer toutes les paires (n² comparaisons), on ne compare
+que les fiches qui partagent une clé de blocage : code postal, domaine de
+l'email (hors messageries grand public), mot du nom normalisé, ou un seau
+LSH des signatures MinHash du nom (noms proches => même seau avec une forte
+probabilité). Les paires retenues sont reliées par union-find : chaque
+fiche reçoit un cluster_id et chaque cluster une fiche canonique fusionnée.
+
+Usage :
+    python3 entity_resolution.py [fichier_nettoyé.csv] [--in-place]
+"""
+
+import os
+import re
+import glob
+import argparse
+import zlib
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from url_store import canonical_association_url
+
+# Mots qui ne distinguent pas deux associations
+NAME_STOPWORDS = {
+    'bde', 'bds', 'bda', 'bureau', 'des', 'du', 'de', 'd', 'la', 'le', 'les', 'l', 'et', 'en', 'a', 'au', 'aux',
+    'association', 'asso', 'ass', 'etudiants', 'etudiant', 'etudiantes', 'etudiante', 'eleves', 'e', 's',
+}
+# Domaines d'email partagés par des milliers d'associations sans rapport
+WEBMAIL_DOMAINS = {
+    'gmail.com', 'outlook.fr', 'outlook.com', 'hotmail.com', 'hotmail.fr', 'live.fr', 'yahoo.fr', 'yahoo.com',
+    'icloud.com', 'orange.fr', 'free.fr', 'sfr.fr', 'laposte.net', 'wanadoo.fr', 'protonmail.com', 'proton.me',
+}
+POSTAL_CODE_RE = re.compile(r'(?<!\d)\d{5}(?!\d)')
+
+SHINGLE_SIZE = 3          # Trigrammes de caractères du nom
+NUM_PERM = 64             # Taille des signatures MinHash
+LSH_BANDS = 16            # 16 bandes de 4 valeurs : seuil de collision vers 0.5 de Jaccard
+MAX_BLOCK_SIZE = 50       # Clé plus fréquente : pas assez discriminante, ignorée
+NAME_THRESHOLD = 0.8      # Noms seuls : presque identiques
+RELATED_NAME_THRESHOLD = 0.5  # Noms proches + même domaine d'email d'école
+
+_rng = np.random.RandomState(42)  # Permutations fixes : mêmes clusters d'un run à l'autre
+_PRIME = np.uint64((1 << 61) - 1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+def text_value(value):
+    """
+    Texte d'une cellule ('' pour les cellules vides)
+    """
+    return '' if pd.isna(value) else str(value).strip()
+
+
+def normalize_name(name):
+    """
+    Nom en minuscules, sans accents, ponctuation ni mots génériques ("BDE", "de"...)
+    """
+    name = unicodedata.normalize('NFKD', text_value(name).lower())
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    tokens = re.findall(r'[a-z0-9]+', name)
+    meaningful = [token for token in tokens if token not in NAME_STOPWORDS]
+    return ' '.join(meaningful or tokens)  # Nom fait uniquement de mots génériques : gardé tel quel
+
+
+def name_shingles(normalized):
+    """
+    Trigrammes de caractères du nom normalisé, hachés (crc32 : stable d'un run à l'autre)
+    """
+    padded = f' {normalized} '
+    if len(padded) <= SHINGLE_SIZE:
+        return {zlib.crc32(padded.encode())}
+    return {zlib.crc32(padded[i:i + SHINGLE_SIZE].encode()) for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(shingles):
+    """
+    Signature MinHash : minimum de chaque permutation (a*x + b) mod p sur les trigrammes
+    """
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    return ((np.outer(_PERM_A, values) + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    common = len(first & second)
+    return common / (len(first) + len(second) - common)
+
+
+def email_parts(email):
+    """
+    (email en minuscules, domaine hors messageries grand public)
+    """
+    email = text_value(email).lower()
+    if '@' not in email:
+        return '', ''
+    domain = email.rsplit('@', 1)[1]
+    return email, '' if domain in WEBMAIL_DOMAINS else domain
+
+
+def postal_code(address):
+    match = POSTAL_CODE_RE.search(text_value(address))
+    return match.group(0) if match else ''
+
+
+class UnionFind:
+    """
+    Ensembles disjoints avec compression de chemin et union par taille
+    """
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return True
+
+
+def record_features(df):
+    """
+    Caractéristiques de chaque fiche utilisées pour le blocage et la comparaison
+    """
+    features = []
+    for row in df.itertuples(index=False):
+        normalized = normalize_name(getattr(row, 'nom_ecole', ''))
+        email, domain = email_parts(getattr(row, 'email', ''))
+        shingles = name_shingles(normalized)
+        features.append({
+            'name': normalized,
+            'tokens': set(normalized.split()),
+            'shingles': shingles,
+            'signature': minhash_signature(shingles),
+            'email': email,
+            'domain': domain,
+            'postal_code': postal_code(getattr(row, 'adresse', '')),
+            'source': canonical_association_url(text_value(getattr(row, 'url_source', ''))) or '',
+        })
+    return features
+
+
+def blocking_keys(feature):
+    """
+    Clés de blocage d'une fiche : seules les fiches d'une même clé sont comparées
+    """
+    keys = []
+    if feature['postal_code']:
+        keys.append(('cp', feature['postal_code']))
+    if feature['domain']:
+        keys.append(('domaine', feature['domain']))
+    if feature['email']:
+        keys.append(('email', feature['email']))
+    if feature['source']:
+        keys.append(('url', feature['source']))
+    keys.extend(('mot', token) for token in feature['tokens'] if len(token) >= 3)
+
+    # LSH : une clé par bande de la signature MinHash
+    rows = NUM_PERM // LSH_BANDS
+    signature = feature['signature']
+    keys.extend(('lsh', band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS))
+    return keys
+
+
+def candidate_pairs(features):
+    """
+    Paires de fiches partageant au moins une clé de blocage (blocs trop grands ignorés)
+    """
+    blocks = defaultdict(list)
+    for index, feature in enumerate(features):
+        for key in blocking_keys(feature):
+            blocks[key].append(index)
+
+    pairs = set()
+    skipped = 0
+    for key, members in blocks.items():
+        if len(members) > MAX_BLOCK_SIZE:
+            # Les clés exactes (email, page source) restent sûres : on relie au premier membre
+            if key[0] in ('email', 'url'):
+                pairs.update((members[0], other) for other in members[1:])
+            else:
+                skipped += 1
+            continue
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pairs.add((first, second))
+    return pairs, skipped
+
+
+def is_duplicate(first, second):
+    """
+    Deux fiches décrivent-elles le même BDE ?
+    """
+    if first['source'] and first['source'] == second['source']:
+        return True
+    if first['email'] and first['email'] == second['email']:
+        return True
+
+    similarity = jaccard(first['shingles'], second['shingles'])
+    other_city = first['postal_code'] and second['postal_code'] and first['postal_code'] != second['postal_code']
+    if similarity >= NAME_THRESHOLD and not other_city:
+        return True
+    # Même domaine d'école (hors messageries) : sous-associations d'une même école
+    same_domain = first['domain'] and first['domain'] == second['domain']
+    return similarity >= RELATED_NAME_THRESHOLD and bool(same_domain) and not other_city
+
+
+def canonical_record(columns, rows):
+    """
+    Fiche fusionnée d'un cluster (rows : valeurs des fiches, déjà en texte) :
+    valeur non vide la plus fréquente de chaque colonne (la première rencontrée
+    en cas d'égalité)
+    """
+    record = {}
+    for position, column in enumerate(columns):
+        counts = Counter(row[position] for row in rows if row[position])
+        record[column] = counts.most_common(1)[0][0] if counts else ''
+    record['nb_fiches'] = len(rows)
+    if 'url_source' in columns:
+        position = columns.index('url_source')
+        record['urls_sources'] = ' '.join(dict.fromkeys(row[position] for row in rows if row[position]))
+    return record
+
+
+def resolve_entities(df):
+    """
+    Ajoute un cluster_id à chaque fiche et renvoie (fiches, fiches canoniques par cluster)
+    Les clusters sont numérotés dans l'ordre de leur première fiche
+    """
+    features = record_features(df)
+    pairs, skipped = candidate_pairs(features)
+
+    clusters = UnionFind(len(features))
+    for first, second in pairs:
+        if clusters.find(first) == clusters.find(second):
+            continue  # Déjà reliées par d'autres paires
+        if is_duplicate(features[first], features[second]):
+            clusters.union(first, second)
+
+    cluster_ids = {}
+    ids = [cluster_ids.setdefault(clusters.find(index), len(cluster_ids)) for index in range(len(features))]
+
+    columns = list(df.columns)
+    members = defaultdict(list)
+    for cluster_id, row in zip(ids, df.itertuples(index=False)):
+        members[cluster_id].append([text_value(value) for value in row])
+    entities = pd.DataFrame(
+        [{'cluster_id': cluster_id, **canonical_record(columns, rows)} for cluster_id, rows in sorted(members.items())]
+    )
+
+    df = df.copy()
+    df['cluster_id'] = ids
+    if skipped:
+        print(f"⚠️ {skipped} clés de blocage trop fréquentes ignorées (plus de {MAX_BLOCK_SIZE} fiches)")
+    print(f"🔗 {len(pairs)} paires comparées au lieu de {len(df) * (len(df) - 1) // 2}")
+    return df, entities
+
+
+def resolve_csv(input_file, output_file=None, entities_file=None, overwrite=False):
+    """
+    Écrit les fiches avec leur cluster_id dans output_file (<fichier>_clusters.csv
+    par défaut, le fichier nettoyé lui-même seulement avec overwrite=True) et
+    les fiches canoniques dans entities_file (data/bde_entites_<date>.csv)
+    Toutes les colonnes sont lues en texte : un téléphone garde son 0 initial
+    """
+    print(f"🧩 Regroupement des doublons : {input_file}")
+    if not output_file:
+        root, ext = os.path.splitext(input_file)
+        output_file = input_file if overwrite else f"{root}_clusters{ext}"
+    if not entities_file:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        entities_file = f"data/bde_entites_{timestamp}.csv"
+
+    try:
+        df = pd.read_csv(input_file, dtype=str, keep_default_na=False)
+        df, entities = resolve_entities(df.drop(columns=['cluster_id'], errors='ignore'))
+        df.to_csv(output_file, index=False, encoding='utf-8')
+        entities.to_csv(entities_file, index=False, encoding='utf-8')
+
+        duplicates = len(df) - len(entities)
+        print(f"✅ {len(df)} fiches, {len(entities)} BDE distincts ({duplicates} doublons regroupés)")
+        print(f"💾 Fiches avec cluster_id : {output_file}")
+        print(f"💾 Fiches canoniques : {entities_file}")
+        return entities_file
+    except Exception as e:
+        print(f"❌ Erreur lors du regroupement : {e}")
+        return None
+
+
+def display_clusters(entities_file, num_clusters=5):
+    """
+    Affiche les plus gros clusters
+    """
+    try:
+        entities = pd.read_csv(entities_file)
+        biggest = entities[entities['nb_fiches'] > 1].sort_values('nb_fiches', ascending=False).head(num_clusters)
+        if biggest.empty:
+            return
+        print(f"\n📋 Plus gros regroupements :")
+        print("=" * 80)
+        for _, row in biggest.iterrows():
+            print(f"🏫 {row['nom_ecole']} ({row['nb_fiches']} fiches)")
+            for url in text_value(row['urls_sources']).split():
+                print(f"   {url}")
+    except Exception as e:
+        print(f"❌ Erreur lors de l'affichage : {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regroupement des fiches d'un même BDE")
+    parser.add_argument("input_file", nargs="?", default=None,
+                        help="fichier nettoyé (défaut : le plus récent data/bde_clean_data_*.csv)")
+    parser.add_argument("--in-place", action="store_true",
+                        help="ajoute cluster_id au fichier nettoyé lui-même au lieu d'écrire <fichier>_clusters.csv")
+    args = parser.parse_args()
+
+    if args.input_file:
+        clean_file = args.input_file
+    else:
+        clean_files = [f for f in glob.glob("data/bde_clean_data_*.csv") if not f.endswith("_clusters.csv")]
+        clean_file = max(clean_files) if clean_files else None
+
+    if clean_file:
+        entities_file = resolve_csv(clean_file, overwrite=args.in_place)
+        if entities_file:
+            display_clusters(entities_file)
+    else:
+        print("❌ Aucun fichier nettoyé trouvé dans le dossier data/")
@@ -0,0 +1,312 @@
+"""
+Extraction par regex des champs d'un BDE (email, téléphone, adresse, responsable)
+Motifs compilés une seule fois, partagés par le backend HTTP et le script
+injecté dans le navigateur (browser_extractor.py).
+
+Le texte est parcouru une seule fois : une alternative de déclencheurs
+littéraux ("@", "+33", "rue", "président"...) donne les positions candidates,
+où l'on vérifie les motifs complets. Un champ est terminé dès que son motif
+prioritaire trouve une valeur acceptable (filtre des emails techniques
+appliqué au passage), et le parcours s'arrête quand il ne reste plus aucun
+champ à chercher.
+Résultat identique à un re.findall(...)[0] par motif, dans l'ordre des listes.
+
+Sur une page, les motifs ne parcourent pas le HTML brut : la page est
+analysée une fois avec lxml, sans les balises style, script et svg (le CSS
+donnait des "adresses" @font-face et des "téléphones" 0714285705em), et
+chaque champ est d'abord cherché dans ses blocs (bloc contact, paragraphe
+Data-City, liens mailto:/tel:), puis dans le texte visible de la page.
+"""
+
+import re
+from functools import lru_cache
+from lxml import etree
+from lxml import html as lxml_html
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+EMAIL_BLACKLIST = ['noreply', 'no-reply', 'support', 'admin', 'webmaster', 'info@helloasso', 'contact@helloasso']
+
+PHONE_PATTERNS = [
+    r'(?:(?:\+33|0)[1-9](?:[0-9]{8}))',
+    r'(?:0[1-9](?:\s?\d{2}){4})',
+    r'(?:\+33\s?[1-9](?:\s?\d{2}){4})'
+]
+
+STREET_KEYWORDS = ['rue', 'avenue', 'boulevard', 'place', 'impasse', 'allée']
+ADDRESS_PATTERNS = [
+    r'\d+[,\s]+(?:rue|avenue|boulevard|place|impasse|allée)[^,\n]+(?:\d{5})[^,\n]*',
+    r'(?:rue|avenue|boulevard|place|impasse|allée)[^,\n]+(?:\d{5})[^,\n]*'
+]
+
+PERSON_NAME_PATTERNS = [
+    r'(?:Président|Présidente|Contact|Responsable)[\s:]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
+    r'([A-Z][a-z]+\s+[A-Z][a-z]+)(?:\s*[-–]\s*(?:Président|Présidente|Contact))'
+]
+
+# Champ -> motifs par ordre de priorité, et options de compilation
+FIELD_PATTERNS = {
+    'email': ([EMAIL_PATTERN], 0),
+    'telephone': (PHONE_PATTERNS, 0),
+    'adresse': (ADDRESS_PATTERNS, re.IGNORECASE),
+    'personne': (PERSON_NAME_PATTERNS, 0),
+}
+
+COMPILED_PATTERNS = {
+    field: [re.compile(pattern, flags) for pattern in patterns]
+    for field, (patterns, flags) in FIELD_PATTERNS.items()
+}
+
+# Déclencheurs de chaque motif, en minuscules (cherchés dans le texte en minuscules) :
+# le motif ne peut correspondre qu'autour d'un de ses déclencheurs
+PATTERN_TRIGGERS = {
+    ('email', 0): ['@'],                          # l'adresse commence avant le @
+    ('telephone', 0): [r'\+33', '0[1-9]'],
+    ('telephone', 1): ['0[1-9]'],
+    ('telephone', 2): [r'\+33'],
+    ('adresse', 0): STREET_KEYWORDS,              # le numéro est avant le mot-clé
+    ('adresse', 1): STREET_KEYWORDS,
+    ('personne', 0): ['président', 'contact', 'responsable'],
+    ('personne', 1): ['président', 'contact'],    # le nom est avant la fonction
+}
+
+EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+EMAIL_START_RE = re.compile(r'\b[A-Za-z0-9._%+-]')
+PERSON_NAME_WINDOW = 200  # Caractères examinés avant "Président" pour le nom qui le précède
+
+
+def is_acceptable_email(email):
+    """
+    Écarte les emails techniques (noreply, support, HelloAsso...)
+    """
+    email = email.lower()
+    return not any(x in email for x in EMAIL_BLACKLIST)
+
+
+def match_value(field, match):
+    """
+    Valeur retenue pour un motif (groupe du nom pour le responsable), None si refusée
+    """
+    if field == 'email':
+        value = match.group(0)
+        return value if is_acceptable_email(value) else None
+    return match.group(1 if match.re.groups else 0).strip()
+
+
+@lru_cache(maxsize=64)
+def trigger_scanner(keys, flags=0):
+    """
+    Alternative compilée des déclencheurs des motifs (champ, rang) encore utiles
+    Toutes les branches commencent par un caractère fixe : re saute directement
+    aux positions possibles au lieu d'essayer chaque motif partout
+    """
+    triggers = []
+    for key in keys:
+        triggers.extend(trigger for trigger in PATTERN_TRIGGERS[key] if trigger not in triggers)
+    return re.compile('|'.join(triggers), flags)
+
+
+def email_start(text, at, lower_bound):
+    """
+    Début de l'email dont le @ est à la position at (partie locale et limite de mot)
+    """
+    start = at
+    while start > lower_bound and text[start - 1] in EMAIL_LOCAL_CHARS:
+        start -= 1
+    first = EMAIL_START_RE.search(text, start, at)
+    return first.start() if first else None
+
+
+def street_number_start(text, keyword, lower_bound):
+    """
+    Début du numéro (\\d+[,\\s]+) qui précède le mot-clé de la voie
+    """
+    start = keyword
+    while start > lower_bound and (text[start - 1] == ',' or text[start - 1].isspace()):
+        start -= 1
+    if start == keyword:
+        return None
+    digits_end = start
+    while start > lower_bound and text[start - 1].isdecimal():
+        start -= 1
+    return start if start < digits_end else None
+
+
+def find_at(text, key, position, lower_bound):
+    """
+    Correspondance du motif key autour du déclencheur trouvé à position
+    lower_bound : fin de la correspondance précédente du même motif (pas de chevauchement)
+    """
+    field, index = key
+    pattern = COMPILED_PATTERNS[field][index]
+    if key == ('email', 0):
+        if text[position] != '@':
+            return None
+        start = email_start(text, position, lower_bound)
+    elif key == ('adresse', 0):
+        start = street_number_start(text, position, lower_bound)
+    elif key == ('personne', 1):
+        match = pattern.search(text, max(lower_bound, position - PERSON_NAME_WINDOW), position + len('président'))
+        return match if match and match.end() > position else None
+    else:
+        start = position if position >= lower_bound else None
+    return pattern.match(text, start) if start is not None else None
+
+
+def scan_fields(text, fields=None):
+    """
+    Première valeur acceptable de chaque champ demandé, en un seul parcours du texte
+    fields : sous-ensemble de FIELD_PATTERNS (tous par défaut)
+    Renvoie {champ: valeur}, les champs sans valeur étant absents
+    """
+    fields = [field for field in FIELD_PATTERNS if fields is None or field in fields]
+    # Pour chaque champ : rang du meilleur motif trouvé, et valeur
+    best = {field: (len(COMPILED_PATTERNS[field]), None) for field in fields}
+    # Fin de la dernière correspondance de chaque motif (correspondances sans chevauchement, comme findall)
+    resume_at = {}
+
+    # Déclencheurs en minuscules : "Rue", "RUE" et "rue" sont trouvés par le même littéral
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        scanned, flags = lowered, 0
+    else:
+        scanned, flags = text, re.IGNORECASE  # Caractère dont la minuscule change de longueur
+
+    position = 0
+    while True:
+        keys = tuple((field, index) for field in fields for index in range(best[field][0]))
+        if not keys:
+            break  # Tous les champs ont leur motif prioritaire
+        trigger = trigger_scanner(keys, flags).search(scanned, position)
+        if not trigger:
+            break
+        position = trigger.start()
+
+        for key in keys:
+            field, index = key
+            if index >= best[field][0]:
+                continue
+            match = find_at(text, key, position, resume_at.get(key, 0))
+            if not match:
+                continue
+            resume_at[key] = match.end()
+            value = match_value(field, match)
+            if value is not None:
+                best[field] = (index, value)
+
+        position += 1
+
+    return {field: value for field, (_, value) in best.items() if value is not None}
+
+
+# Balises dont le contenu n'est pas du texte de la page
+IGNORED_TAGS = ['style', 'script', 'svg', 'noscript', 'template']
+
+# Blocs de la page où chercher chaque champ (XPath, aussi évalués dans le navigateur)
+CONTACT_XPATH = "//*[contains(concat(' ', normalize-space(@class), ' '), ' Info ')]"
+DATA_XPATH = "p[contains(concat(' ', normalize-space(@class), ' '), ' Data ')]"
+CITY_BLOCK_XPATH = "//*[p[contains(concat(' ', normalize-space(@class), ' '), ' Data-City ')]]"
+# Blocs dont seul le texte de certains enfants compte (XPath relatif au bloc) :
+# rue et ville des paragraphes Data, sans le reste du conteneur
+REGION_PARTS = {CITY_BLOCK_XPATH: DATA_XPATH}
+FIELD_REGIONS = {
+    'email': [CONTACT_XPATH, "//a[starts-with(@href, 'mailto:')]/@href"],
+    'telephone': [CONTACT_XPATH, "//a[starts-with(@href, 'tel:')]/@href"],
+    'adresse': [CONTACT_XPATH, CITY_BLOCK_XPATH],
+    'personne': [CONTACT_XPATH],
+}
+
+
+def parse_page(page_html):
+    """
+    Arbre lxml de la page, sans les balises style, script et svg
+    """
+    tree = lxml_html.fromstring(page_html)
+    etree.strip_elements(tree, *IGNORED_TAGS, with_tail=False)
+    return tree
+
+
+def node_text(node, parts=None):
+    """
+    Texte d'un bloc sur une ligne (ou valeur d'un attribut href)
+    parts : XPath relatif des enfants dont on garde le texte (tout le bloc par défaut)
+    """
+    if isinstance(node, str):
+        return node
+    if parts:
+        return ' '.join(node_text(part) for part in node.xpath(parts))
+    return ' '.join(' '.join(node.itertext()).split())
+
+
+def page_text(tree):
+    """
+    Texte visible de la page, un nœud texte par ligne : une adresse ne
+    déborde pas d'un bloc à l'autre (les motifs s'arrêtent aux retours à la ligne)
+    """
+    body = tree.find('body')
+    root = body if body is not None else tree
+    return '\n'.join(text.strip() for text in root.itertext() if text.strip())
+
+
+def page_regions(tree, fields):
+    """
+    Textes des blocs de chaque champ : {champ: [textes]}
+    """
+    texts = {}
+    regions = {}
+    for field in fields:
+        regions[field] = []
+        for xpath in FIELD_REGIONS[field]:
+            if xpath not in texts:
+                texts[xpath] = [node_text(node, REGION_PARTS.get(xpath)) for node in tree.xpath(xpath)]
+            regions[field].extend(texts[xpath])
+    return regions
+
+
+def fields_from_regions(regions, text, fields):
+    """
+    Champs trouvés dans les blocs de chaque champ, puis dans le texte de la page
+    pour ceux qui n'y sont pas. regions : {champ: [textes]}, text : texte visible
+    """
+    found = {}
+    for field in fields:
+        if regions.get(field):
+            found.update(scan_fields('\n'.join(regions[field]), [field]))
+    remaining = [field for field in fields if field not in found]
+    if remaining and text:
+        found.update(scan_fields(text, remaining))
+    return found
+
+
+def wanted_fields(bde_info):
+    """
+    Champs regex encore à chercher pour un bde_info (personne = nom et prénom du responsable)
+    """
+    missing = {key for key, value in bde_info.items() if not value}
+    return [field for field in FIELD_PATTERNS
+            if field in missing or (field == 'personne' and missing & {'nom_personne', 'prenom_personne'})]
+
+
+def apply_fields(bde_info, found):
+    """
+    Reporte les champs trouvés dans le bde_info (le responsable en prénom et nom)
+    """
+    for key in ('email', 'telephone', 'adresse'):
+        if key in found:
+            bde_info[key] = found[key]
+    name_parts = found.get('personne', '').split()
+    if len(name_parts) >= 2:
+        bde_info['prenom_personne'] = name_parts[0]
+        bde_info['nom_personne'] = ' '.join(name_parts[1:])
+    return bde_info
+
+
+def extract_page_fields(tree, fields=None):
+    """
+    Champs de la page (arbre de parse_page), chacun cherché dans ses blocs d'abord
+    """
+    fields = [field for field in FIELD_PATTERNS if fields is None or field in fields]
+    found = fields_from_regions(page_regions(tree, fields), None, fields)
+    remaining = [field for field in fields if field not in found]
+    if remaining:
+        found.update(scan_fields(page_text(tree), remaining))  # Texte de la page seulement si besoin
+    return found
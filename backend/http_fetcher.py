@@ -0,0 +1,222 @@
+"""
+Backend d'extraction HTTP (sans navigateur) pour les pages de BDE
+Les pages HelloAsso sont rendues côté serveur : une simple requête suffit
+dans la plupart des cas, Selenium n'est utilisé qu'en repli
+"""
+
+import time
+import threading
+from lxml import html as lxml_html
+from analyze_site_v2 import create_session
+from config import HTTP_TIMEOUT
+from rate_limiter import get_rate_limiter, THROTTLE_STATUS_CODES
+from validator_store import content_hash
+from url_store import canonical_association_url
+from hydration_extractor import extract_state_fields, SOCIAL_DOMAINS
+from field_extraction import parse_page, extract_page_fields, wanted_fields, apply_fields
+
+# Au moins un de ces marqueurs doit être présent pour considérer
+# que la page de l'association a bien été rendue par le serveur
+DETAIL_PAGE_MARKERS = ['Data-City', '__NUXT_DATA__']
+
+# Erreurs serveur retentées par la session (sans 429 ni 503, laissés au limiteur de débit)
+SESSION_RETRY_STATUS_CODES = (500, 502, 504)
+THROTTLE_RETRIES = 2  # Nouvelles tentatives après un 429/503, une fois le débit réduit
+
+# Équivalents XPath des sélecteurs CSS utilisés avec Selenium
+NAME_XPATHS = [
+    "//h1",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' title ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' name ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' association-name ')]",
+    "//title"
+]
+
+
+def empty_bde_info(bde_url):
+    """
+    Structure de base des informations d'un BDE
+    """
+    return {
+        'nom_ecole': '',
+        'nom_personne': '',
+        'prenom_personne': '',
+        'adresse': '',
+        'site_internet': '',
+        'telephone': '',
+        'email': '',
+        'url_source': bde_url
+    }
+
+
+def has_expected_markers(page_html):
+    """
+    Vérifie que le HTML reçu contient bien la fiche de l'association
+    """
+    return '<h1' in page_html and any(marker in page_html for marker in DETAIL_PAGE_MARKERS)
+
+
+def extract_bde_info_from_html(page_html, bde_url):
+    """
+    Extrait les informations d'un BDE depuis le HTML de sa page
+    Les champs sont lus dans l'état embarqué de la page (__NUXT_DATA__,
+    JSON-LD) ; les regex ne servent qu'aux champs absents de cet état
+    """
+    bde_info = empty_bde_info(bde_url)
+    bde_info.update(extract_state_fields(page_html, bde_url))
+
+    missing = {key for key, value in bde_info.items() if not value}
+    if missing:
+        extract_missing_fields(bde_info, page_html, missing)
+    return bde_info
+
+
+def extract_missing_fields(bde_info, page_html, missing):
+    """
+    Repli : extraction par regex sur le HTML des champs manquants
+    Même logique que extract_bde_details côté Selenium
+    La page est analysée une fois, sans style, script ni svg
+    """
+    tree = parse_page(page_html)
+
+    # Nom de l'école/BDE
+    if 'nom_ecole' in missing:
+        for xpath in NAME_XPATHS:
+            elements = tree.xpath(xpath)
+            if elements:
+                name = elements[0].text_content().strip()
+                if name and name != "HelloAsso":
+                    bde_info['nom_ecole'] = name
+                    break
+
+    # Site internet (premier lien externe qui n'est pas un réseau social)
+    if 'site_internet' in missing:
+        for href in tree.xpath("//a[starts-with(@href, 'http')]/@href"):
+            if 'helloasso.com' not in href and not any(domain in href for domain in SOCIAL_DOMAINS):
+                bde_info['site_internet'] = href
+                break
+
+    # Email, téléphone, adresse et responsable, chacun dans ses blocs de la page
+    wanted = wanted_fields(bde_info)
+    if wanted:
+        apply_fields(bde_info, extract_page_fields(tree, wanted))
+
+    return bde_info
+
+
+def extract_bde_links_from_html(page_html, page_url):
+    """
+    Extrait les liens d'associations d'une page de résultats
+    Les liens sont ramenés à l'URL canonique de l'association et dédoublonnés
+    dans l'ordre de la page
+    """
+    tree = lxml_html.fromstring(page_html)
+    links = []
+    for href in tree.xpath("//a[contains(@href, '/associations/')]/@href"):
+        url = canonical_association_url(href, page_url)
+        if url:
+            links.append(url)
+    return list(dict.fromkeys(links))
+
+
+class HttpFetcher:
+    """
+    Récupère les pages avec requests (session avec retry) au lieu d'un navigateur
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT, rate_limiter=None, validator_store=None, archive=None):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Recrawl conditionnel (ETag / Last-Modified / hash) si un ValidatorStore est fourni
+        self.validator_store = validator_store
+        # Archive des pages téléchargées (PageArchive), optionnelle
+        self.archive = archive
+        # Une session par thread (les workers du pool travaillent en parallèle)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self._local, 'session'):
+            # 429 et 503 ne sont pas retentés par la session : ils remontent au
+            # limiteur de débit, qui ralentit (les retries les lui cachaient)
+            self._local.session = create_session(status_forcelist=SESSION_RETRY_STATUS_CODES, raise_on_status=False)
+        return self._local.session
+
+    def fetch_response(self, url, headers=None):
+        """
+        Télécharge une page et renvoie la réponse, ou None en cas d'échec
+        """
+        for attempt in range(THROTTLE_RETRIES + 1):
+            self.rate_limiter.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except Exception as e:
+                # Timeout, erreurs serveur malgré les retries... on ralentit
+                self.rate_limiter.record_response(status_code=503, elapsed=time.monotonic() - start)
+                print(f"   ⚠️ Erreur HTTP pour {url} : {str(e)}")
+                return None
+
+            self.rate_limiter.record_response(status_code=response.status_code, elapsed=time.monotonic() - start)
+            # 429/503 : le limiteur vient de ralentir, on retente au nouveau débit
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                break
+        # Un 304 n'a pas de contenu : la page reste lisible dans l'archive d'un run précédent
+        if self.archive and response.status_code != 304:
+            self.archive.add(url, response.status_code, response.headers, response.text)
+        return response
+
+    def fetch(self, url):
+        """
+        Télécharge une page et renvoie son HTML, ou None en cas d'échec
+        """
+        response = self.fetch_response(url)
+        if response is None or response.status_code != 200:
+            return None
+        return response.text
+
+    def fetch_bde_details(self, bde_url):
+        """
+        Extrait les détails d'un BDE par HTTP
+        Renvoie None si la page ne contient pas les marqueurs attendus
+        (il faut alors passer par Selenium)
+        Avec un validator_store, une page inchangée depuis le dernier crawl
+        (304, ou même hash de contenu) n'est pas ré-extraite : le bde_info
+        précédent est repris tel quel
+        """
+        store = self.validator_store
+        previous = store.get(bde_url) if store else None
+
+        response = self.fetch_response(bde_url, store.conditional_headers(previous) if previous else None)
+        if response is None:
+            return None
+
+        # 304 Not Modified : rien n'a changé depuis le dernier crawl
+        if response.status_code == 304 and previous:
+            store.mark_unchanged()
+            return previous['record']
+
+        page_html = response.text
+        if response.status_code != 200 or not has_expected_markers(page_html):
+            return None
+
+        try:
+            if not store:
+                return extract_bde_info_from_html(page_html, bde_url)
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            digest = content_hash(page_html)
+
+            # Page re-téléchargée mais contenu identique
+            record = store.unchanged_record(bde_url, digest, previous)
+            if record:
+                store.update_validators(bde_url, etag, last_modified)
+                return record
+
+            bde_info = extract_bde_info_from_html(page_html, bde_url)
+            store.save(bde_url, bde_info, digest, etag, last_modified)
+            return bde_info
+        except Exception as e:
+            print(f"   ⚠️ Erreur de parsing pour {bde_url} : {str(e)}")
+            return None
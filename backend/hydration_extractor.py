@@ -0,0 +1,288 @@
+"""
+Extraction des champs d'une association depuis l'état embarqué dans la page
+Les pages HelloAsso (Nuxt) sont rendues côté serveur à partir de données
+structurées, recopiées dans la page pour l'hydratation : le bloc JSON
+__NUXT_DATA__ (format "devalue") et, quand il existe, le JSON-LD schema.org.
+On y lit directement le nom, l'adresse, le code postal, la ville, le site et
+le contact, sans balisage Vue à nettoyer ; les regex ne servent qu'en repli
+pour les champs absents de l'état.
+"""
+
+import re
+import json
+from urllib.parse import urlsplit
+
+NUXT_DATA_RE = re.compile(r'<script[^>]*\bid="__NUXT_DATA__"[^>]*>(.*?)</script>', re.S)
+JSON_LD_RE = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+
+# Valeurs spéciales de devalue (index négatifs)
+DEVALUE_CONSTANTS = {
+    -1: None,            # undefined
+    -2: None,            # trou dans un tableau
+    -3: float('nan'),
+    -4: float('inf'),
+    -5: float('-inf'),
+    -6: -0.0,
+}
+
+# Noms des champs selon la source (état Nuxt, résultats Algolia, schema.org)
+NAME_KEYS = ['name', 'organizationName', 'legalName']
+STREET_KEYS = ['address', 'place_address', 'streetAddress', 'street', 'addressLine1']
+ZIP_KEYS = ['zipCode', 'zipcode', 'place_zipcode', 'postalCode', 'postal_code']
+CITY_KEYS = ['city', 'place_city', 'addressLocality']
+WEBSITE_KEYS = ['website', 'webSite', 'websiteUrl', 'site', 'url', 'sameAs']
+EMAIL_KEYS = ['email', 'contactEmail', 'contact_email']
+PHONE_KEYS = ['phone', 'phoneNumber', 'telephone', 'contactPhone']
+FIRST_NAME_KEYS = ['firstName', 'firstname', 'contactFirstName']
+LAST_NAME_KEYS = ['lastName', 'lastname', 'contactLastName']
+SLUG_KEYS = ['url', 'organizationSlug', 'organization_slug', 'slug']
+ADDRESS_KEYS = set(STREET_KEYS + ZIP_KEYS + CITY_KEYS)
+ORGANIZATION_KEYS = set(NAME_KEYS + STREET_KEYS + ZIP_KEYS + CITY_KEYS + WEBSITE_KEYS + EMAIL_KEYS
+                        + PHONE_KEYS + SLUG_KEYS + ['contact'])
+
+JSON_LD_ORGANIZATION_TYPES = {'Organization', 'NGO', 'EducationalOrganization', 'LocalBusiness', 'Corporation'}
+SOCIAL_DOMAINS = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com']
+
+
+def devalue_hydrator(values):
+    """
+    Fonction index -> objet reconstruit pour un tableau devalue (tableau plat
+    de valeurs, les objets et tableaux référençant les autres valeurs par leur
+    index). Les enveloppes Nuxt (Reactive, Ref...) sont remplacées par leur
+    contenu ; chaque index n'est reconstruit qu'une fois
+    """
+    hydrated = {}
+
+    def hydrate(index):
+        if index < 0:
+            return DEVALUE_CONSTANTS.get(index)
+        if index in hydrated:
+            return hydrated[index]
+
+        value = values[index]
+        if isinstance(value, dict):
+            obj = hydrated[index] = {}
+            for key, child in value.items():
+                obj[key] = hydrate(child)
+            return obj
+        if not isinstance(value, list):
+            hydrated[index] = value
+            return value
+
+        if value and isinstance(value[0], str):
+            # Type particulier : ["Date", iso], ["Set", ...], ["Map", k, v, ...], ["Reactive", i]...
+            kind = value[0]
+            hydrated[index] = None  # Référence circulaire pendant la reconstruction
+            if kind in ('Date', 'BigInt', 'RegExp'):
+                result = value[1]
+            elif kind == 'Set':
+                result = [hydrate(i) for i in value[1:]]
+            elif kind == 'Map':
+                result = {hydrate(k): hydrate(v) for k, v in zip(value[1::2], value[2::2])}
+            elif kind == 'null':
+                result = {k: hydrate(v) for k, v in zip(value[1::2], value[2::2])}
+            elif len(value) == 2:
+                result = hydrate(value[1])
+            else:
+                result = None
+            hydrated[index] = result
+            return result
+
+        items = hydrated[index] = []
+        items.extend(hydrate(i) for i in value)
+        return items
+
+    return hydrate
+
+
+def find_devalue_organization(values, bde_url):
+    """
+    Comme find_organization, directement sur le tableau devalue : seuls les
+    objets qui ont un nom et une adresse sont reconstruits, pas tout l'état
+    (la page d'une association en contient des milliers de valeurs)
+    """
+    slug = association_slug(bde_url)
+    hydrate = devalue_hydrator(values)
+    candidates = []
+    for value in values:
+        if not (isinstance(value, dict) and not value.keys().isdisjoint(NAME_KEYS)
+                and not value.keys().isdisjoint(ADDRESS_KEYS)):
+            continue
+        # Seules les clés lues par organization_fields sont reconstruites
+        obj = {key: hydrate(child) for key, child in value.items() if key in ORGANIZATION_KEYS}
+        if is_organization(obj):
+            if slug and matches_slug(obj, slug):
+                return obj
+            candidates.append(obj)
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def nuxt_organization(payload, bde_url):
+    """
+    Objet de l'association dans le texte de __NUXT_DATA__, ou None
+    """
+    try:
+        values = json.loads(payload)
+        if not isinstance(values, list):
+            return None
+        return find_devalue_organization(values, bde_url)
+    except (ValueError, IndexError, TypeError, RecursionError):
+        return None
+
+
+def json_ld_blocks(page_html):
+    return [match.group(1) for match in JSON_LD_RE.finditer(page_html)]
+
+
+def json_ld_organizations(blocks):
+    """
+    Objets schema.org de type organisation des blocs JSON-LD
+    """
+    organizations = []
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            if isinstance(item, dict) and '@graph' in item:
+                items.extend(item['@graph'])
+                continue
+            if not isinstance(item, dict):
+                continue
+            types = item.get('@type')
+            types = set(types) if isinstance(types, list) else {types}
+            if types & JSON_LD_ORGANIZATION_TYPES:
+                organizations.append(item)
+    return organizations
+
+
+def first_value(obj, keys):
+    """
+    Première valeur non vide parmi les clés (texte nettoyé des espaces)
+    """
+    for key in keys:
+        value = obj.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if isinstance(value, str) and value.strip():
+            return ' '.join(value.split())
+    return ''
+
+
+def association_slug(bde_url):
+    match = re.search(r'/associations/([^/?#]+)', bde_url)
+    return match.group(1).lower() if match else ''
+
+
+def is_organization(obj):
+    return (isinstance(obj, dict) and first_value(obj, NAME_KEYS)
+            and not obj.keys().isdisjoint(ADDRESS_KEYS))
+
+
+def matches_slug(obj, slug):
+    for key in SLUG_KEYS:
+        value = obj.get(key)
+        if isinstance(value, str) and value.lower().rstrip('/').rsplit('/', 1)[-1] == slug:
+            return True
+    return False
+
+
+def find_organization(state, bde_url):
+    """
+    Objet de l'association dans l'état : celui qui correspond à l'URL de la
+    page, ou le seul objet organisation s'il n'y en a qu'un
+    """
+    slug = association_slug(bde_url)
+    candidates = []
+    seen = set()
+    stack = [state]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, dict):
+            if is_organization(obj):
+                if slug and matches_slug(obj, slug):
+                    return obj
+                candidates.append(obj)
+            stack.extend(value for value in obj.values() if isinstance(value, (dict, list)))
+        elif isinstance(obj, list):
+            stack.extend(value for value in obj if isinstance(value, (dict, list)))
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def external_website(obj):
+    """
+    Site de l'association : première URL qui n'est ni HelloAsso ni un réseau social
+    """
+    for key in WEBSITE_KEYS:
+        values = obj.get(key)
+        for value in values if isinstance(values, list) else [values]:
+            if not isinstance(value, str) or not value.startswith('http'):
+                continue
+            host = urlsplit(value).netloc.lower()
+            if 'helloasso.com' not in host and not any(domain in host for domain in SOCIAL_DOMAINS):
+                return value
+    return ''
+
+
+def organization_fields(org):
+    """
+    Champs du bde_info lus dans un objet organisation (clés vides absentes)
+    """
+    address = org
+    for key in STREET_KEYS:
+        if isinstance(org.get(key), dict):  # schema.org : PostalAddress
+            address = org[key]
+            break
+
+    street = first_value(address, STREET_KEYS)
+    postal_code = first_value(address, ZIP_KEYS) or first_value(org, ZIP_KEYS)
+    city = first_value(address, CITY_KEYS) or first_value(org, CITY_KEYS)
+    if street == city:
+        street = ''  # Les résultats de recherche mettent la ville dans place_address
+    locality = ' '.join(part for part in (postal_code, city) if part)
+
+    contact = org.get('contact') if isinstance(org.get('contact'), dict) else {}
+    fields = {
+        'nom_ecole': first_value(org, NAME_KEYS),
+        'adresse': ', '.join(part for part in (street, locality) if part),
+        'site_internet': external_website(org),
+        'email': first_value(org, EMAIL_KEYS) or first_value(contact, EMAIL_KEYS),
+        'telephone': first_value(org, PHONE_KEYS) or first_value(contact, PHONE_KEYS),
+        'prenom_personne': first_value(contact, FIRST_NAME_KEYS),
+        'nom_personne': first_value(contact, LAST_NAME_KEYS),
+    }
+    return {key: value for key, value in fields.items() if value}
+
+
+def state_fields_from_payloads(nuxt_payload, json_ld, bde_url):
+    """
+    Champs de l'association à partir du texte de __NUXT_DATA__ et des blocs JSON-LD
+    (forme utilisée aussi par le navigateur, qui renvoie seulement ces textes)
+    """
+    fields = {}
+    org = nuxt_organization(nuxt_payload, bde_url) if nuxt_payload else None
+    if org:
+        fields.update(organization_fields(org))
+
+    # Le JSON-LD complète les champs absents de l'état Nuxt
+    organizations = json_ld_organizations(json_ld or [])
+    org = find_organization(organizations, bde_url) if organizations else None
+    if not org and len(organizations) == 1:
+        org = organizations[0]
+    if org:
+        for key, value in organization_fields(org).items():
+            fields.setdefault(key, value)
+    return fields
+
+
+def extract_state_fields(page_html, bde_url):
+    """
+    Champs de l'association lus dans l'état embarqué de la page ({} s'il n'y en a pas)
+    """
+    match = NUXT_DATA_RE.search(page_html)
+    return state_fields_from_payloads(match.group(1) if match else None, json_ld_blocks(page_html), bde_url)
@@ -0,0 +1,123 @@
+"""
+Navigation "légère" pour Chrome headless
+Bloque les images, médias, polices et scripts tiers via le Chrome DevTools
+Protocol, et rend la main dès que le DOM est prêt (stratégie "eager")
+"""
+
+import threading
+
+# Motifs d'URL bloqués (syntaxe Network.setBlockedURLs : * = joker)
+BLOCKED_URL_PATTERNS = [
+    # Images
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*cdn.helloasso.com/img/*",
+    # Polices
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    # Médias
+    "*.mp4*", "*.webm*", "*.mp3*", "*.ogg*",
+    # Scripts tiers (statistiques, publicité, consentement)
+    "*clarity.ms*",
+    "*analytics.tiktok.com*",
+    "*bat.bing.com*",
+    "*googletagmanager.com*",
+    "*google-analytics.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*cdn.segment.com*",
+    "*api.segment.io*",
+    "*snap.licdn.com*",
+    "*axept.io*",
+]
+
+# Fonction JS qui mesure le poids et le temps de chargement de la page courante
+# (transferSize vaut 0 pour les ressources tierces sans Timing-Allow-Origin)
+PAGE_WEIGHT_FUNCTION_JS = """
+function pageWeight() {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const resources = performance.getEntriesByType('resource');
+    let transferred = nav ? nav.transferSize : 0;
+    for (const r of resources) { transferred += r.transferSize || 0; }
+    return {
+        transferred_bytes: transferred,
+        resources: resources.length,
+        dom_content_loaded_ms: nav ? Math.round(nav.domContentLoadedEventEnd) : null,
+        load_ms: nav ? Math.round(nav.loadEventEnd || nav.domContentLoadedEventEnd) : null
+    };
+}
+"""
+
+PAGE_WEIGHT_JS = PAGE_WEIGHT_FUNCTION_JS + "return pageWeight();"
+
+
+def apply_lean_options(chrome_options):
+    """
+    Configure les options Chrome pour une navigation légère
+    """
+    # driver.get() rend la main au DOMContentLoaded, sans attendre images et scripts
+    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2
+    })
+    return chrome_options
+
+
+def enable_request_blocking(driver, patterns=BLOCKED_URL_PATTERNS):
+    """
+    Active le blocage des requêtes inutiles via le DevTools Protocol
+    """
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': False})
+    except Exception as e:
+        print(f"⚠️ Blocage des requêtes indisponible : {str(e)}")
+    return driver
+
+
+def measure_page_weight(driver):
+    """
+    Renvoie les octets transférés et le temps de chargement de la page courante
+    """
+    try:
+        return driver.execute_script(PAGE_WEIGHT_JS)
+    except Exception:
+        return None
+
+
+class PageWeightStats:
+    """
+    Cumule les mesures de poids/temps pour afficher une moyenne en fin de run
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.transferred_bytes = 0
+        self.load_ms = 0
+        self._lock = threading.Lock()  # Les workers du pool mesurent en parallèle
+
+    def add(self, weight):
+        if not weight:
+            return
+        with self._lock:
+            self.pages += 1
+            self.transferred_bytes += weight.get('transferred_bytes') or 0
+            self.load_ms += weight.get('load_ms') or 0
+
+    def summary(self):
+        if not self.pages:
+            return "aucune page mesurée"
+        return (f"{self.pages} pages, {self.transferred_bytes / self.pages / 1024:.0f} Ko "
+                f"et {self.load_ms / self.pages:.0f} ms en moyenne par page")
+
+
+def format_page_weight(weight):
+    """
+    Texte court pour les logs : "📦 123 Ko, 850 ms"
+    """
+    if not weight:
+        return "📦 mesure indisponible"
+    text = f"📦 {weight['transferred_bytes'] / 1024:.0f} Ko"
+    if weight.get('load_ms') is not None:
+        text += f", {weight['load_ms']} ms"
+    return text
@@ -4,10 +4,28 @@ Script pour suivre l'avancement du scraping complet
 """
 
 import os
+import csv
 import time
 import pandas as pd
 from datetime import datetime
 
+def count_records(filepath):
+    """
+    Compte les BDE déjà écrits (le fichier est complété au fil du scraping)
+    """
+    with open(filepath, encoding='utf-8', newline='') as f:
+        if filepath.endswith('.jsonl'):
+            return sum(1 for line in f if line.strip())
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)  # Sans l'en-tête
+
+def load_records(filepath):
+    """
+    Charge le fichier de résultats (CSV ou JSON Lines)
+    """
+    if filepath.endswith('.jsonl'):
+        return pd.read_json(filepath, lines=True)
+    return pd.read_csv(filepath)
+
 def monitor_scraping():
     """
     Surveille l'avancement du scraping
@@ -24,7 +42,7 @@ def monitor_scraping():
         return
     
     files = os.listdir(data_dir)
-    scraping_files = [f for f in files if f.startswith("bde_scraping_all_pages_")]
+    scraping_files = [f for f in files if f.startswith("bde_scraping_all_pages_") and f.endswith((".csv", ".jsonl"))]
     
     if not scraping_files:
         print("❌ Aucun fichier de scraping en cours trouvé")
@@ -44,8 +62,7 @@ def monitor_scraping():
         try:
             # Lire le fichier CSV actuel
             if os.path.exists(filepath):
-                df = pd.read_csv(filepath)
-                current_count = len(df)
+                current_count = count_records(filepath)
                 
                 if current_count != previous_count:
                     elapsed = time.time() - monitoring_start
@@ -92,7 +109,7 @@ def monitor_scraping():
     # Résumé final
     try:
         if os.path.exists(filepath):
-            df = pd.read_csv(filepath)
+            df = load_records(filepath)
             total_elapsed = time.time() - monitoring_start
             
             print(f"\n🏁 RÉSUMÉ FINAL")
@@ -0,0 +1,318 @@
+"""
+Archive compressée des pages téléchargées (zstd)
+Chaque page récupérée (URL, statut, en-têtes, HTML) est ajoutée à un fichier
+segment en ajout seul, sous forme d'une trame zstd indépendante ; un index
+SQLite donne pour chaque URL le segment, la position et la taille de sa trame.
+Une page se relit donc sans décompresser le reste du segment.
+Une trame contient une ligne JSON (url, statut, en-têtes, date) suivie du
+HTML brut, pour ne pas avoir à encoder le HTML en JSON.
+
+La première page d'un segment sert de dictionnaire aux suivantes : les pages
+HelloAsso partagent l'essentiel de leur HTML (styles, scripts Nuxt...) et ne
+coûtent plus que quelques Ko chacune.
+"""
+
+import os
+import json
+import mmap
+import sqlite3
+import threading
+from datetime import datetime
+from config import ARCHIVE_DIR, ARCHIVE_SEGMENT_BYTES, ARCHIVE_COMPRESSION_LEVEL
+
+try:
+    import zstandard as zstd
+except ImportError:  # Dépendance optionnelle (pip install zstandard)
+    zstd = None
+
+INDEX_FILENAME = "index.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_length INTEGER NOT NULL,
+    status INTEGER,
+    fetched_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_url ON pages (url);
+"""
+
+
+def segment_filename(segment):
+    return f"segment-{segment:05d}.zst"
+
+
+def reference_dict(reference):
+    """
+    Dictionnaire zstd construit à partir de la première page du segment
+    """
+    return zstd.ZstdCompressionDict(reference, dict_type=zstd.DICT_TYPE_RAWCONTENT)
+
+
+def encode_record(url, status, headers, page_html, fetched_at):
+    """
+    Enregistrement brut : une ligne JSON de métadonnées puis le HTML
+    """
+    meta = {'url': url, 'status': status, 'headers': dict(headers or {}), 'fetched_at': fetched_at}
+    return json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n' + (page_html or '').encode('utf-8')
+
+
+def parse_record(raw):
+    """
+    Enregistrement brut -> dict url/status/headers/fetched_at/html
+    """
+    meta, _, page_html = raw.partition(b'\n')
+    record = json.loads(meta)
+    record['html'] = page_html.decode('utf-8')
+    return record
+
+
+def decode_frame(frame, reference=None):
+    """
+    Décompresse une trame de segment et renvoie l'enregistrement
+    reference : contenu brut de la première trame du segment (None pour celle-ci)
+    """
+    if reference is None:
+        raw = zstd.ZstdDecompressor().decompress(frame)
+    else:
+        raw = zstd.ZstdDecompressor(dict_data=reference_dict(reference)).decompress(frame)
+    return parse_record(raw)
+
+
+def read_index(directory):
+    """
+    Lit l'index d'une archive sans l'ouvrir en écriture
+    Renvoie (entries, reference_lengths) :
+    - entries : dernière version exploitable de chaque URL (statut 200, pas un 304
+      vide ni une erreur), (url, segment, offset, length, status) dans l'ordre du crawl
+    - reference_lengths : taille de la première trame de chaque segment
+    """
+    conn = sqlite3.connect(f"file:{os.path.join(directory, INDEX_FILENAME)}?mode=ro", uri=True)
+    try:
+        entries = conn.execute(
+            "SELECT url, segment, offset, length, status FROM pages WHERE id IN "
+            "(SELECT MAX(id) FROM pages WHERE status IS NULL OR status = 200 GROUP BY url) ORDER BY id"
+        ).fetchall()
+        reference_lengths = dict(conn.execute("SELECT segment, length FROM pages WHERE offset = 0").fetchall())
+    finally:
+        conn.close()
+    return entries, reference_lengths
+
+
+class SegmentReader:
+    """
+    Lecture d'un segment en mémoire partagée (mmap), sans copie du fichier
+    Le dictionnaire du segment n'est décompressé qu'une fois
+    """
+
+    def __init__(self, path, reference_length):
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        reference = zstd.ZstdDecompressor().decompress(self._mm[:reference_length])
+        self._plain = zstd.ZstdDecompressor()
+        self._with_reference = zstd.ZstdDecompressor(dict_data=reference_dict(reference))
+
+    def read(self, offset, length):
+        """
+        Enregistrement (dict url/status/headers/fetched_at/html) à cette position
+        """
+        decompressor = self._plain if offset == 0 else self._with_reference
+        return parse_record(decompressor.decompress(self._mm[offset:offset + length]))
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def archive_dirs(base_dir=ARCHIVE_DIR):
+    """
+    Dossiers d'archive des runs, du plus récent au plus ancien
+    """
+    if not os.path.isdir(base_dir):
+        return []
+    runs = [name for name in os.listdir(base_dir)
+            if os.path.exists(os.path.join(base_dir, name, INDEX_FILENAME))]
+    return [os.path.join(base_dir, name) for name in sorted(runs, reverse=True)]
+
+
+def latest_archive_dir(base_dir=ARCHIVE_DIR):
+    """
+    Dossier d'archive du run le plus récent, ou None
+    """
+    runs = archive_dirs(base_dir)
+    return runs[0] if runs else None
+
+
+def read_indexes(directories):
+    """
+    Index de plusieurs archives, de la plus récente à la plus ancienne : pour
+    chaque URL, la version exploitable la plus récente (une page inchangée,
+    304 non archivé, est reprise d'un run précédent)
+    Renvoie (entries, reference_lengths) :
+    - entries : (dossier, url, segment, offset, length, status)
+    - reference_lengths : {(dossier, segment): taille de la première trame}
+    """
+    seen = set()
+    entries = []
+    reference_lengths = {}
+    for directory in directories:
+        run_entries, run_references = read_index(directory)
+        for url, segment, offset, length, status in run_entries:
+            if url not in seen:
+                seen.add(url)
+                entries.append((directory, url, segment, offset, length, status))
+        reference_lengths.update({(directory, segment): length for segment, length in run_references.items()})
+    return entries, reference_lengths
+
+
+class PageArchive:
+    """
+    Archive des pages d'un run, partagée par les threads du scraper
+    Les segments et l'index sont dans un dossier par run (data/archive/<date>/)
+    """
+
+    def __init__(self, directory, segment_max_bytes=ARCHIVE_SEGMENT_BYTES, level=ARCHIVE_COMPRESSION_LEVEL):
+        if zstd is None:
+            raise RuntimeError("le module zstandard est requis pour l'archive (pip install zstandard)")
+
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, INDEX_FILENAME), check_same_thread=False)
+        # Une ligne d'index par page : WAL sans fsync à chaque ajout
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        # Premières pages des segments déjà lus (dictionnaires)
+        self._references = {}
+
+        # Segment en cours d'écriture : on reprend le dernier s'il existe
+        last = self._conn.execute("SELECT MAX(segment) FROM pages").fetchone()[0]
+        self._segment = last if last is not None else 0
+        self._file = None
+        self._compressor = None
+        self._open_segment(self._segment)
+
+    @classmethod
+    def for_new_run(cls, base_dir=ARCHIVE_DIR):
+        """
+        Nouvelle archive dans data/archive/<date et heure>/
+        """
+        return cls(os.path.join(base_dir, datetime.now().strftime("%Y%m%d_%H%M%S")))
+
+    def _open_segment(self, segment):
+        if self._file:
+            self._file.close()
+        self._segment = segment
+        self._file = open(os.path.join(self.directory, segment_filename(segment)), 'ab')
+        reference = self._reference(segment) if self._file.tell() else None
+        self._compressor = self._make_compressor(reference)
+
+    def _make_compressor(self, reference):
+        if reference is None:
+            return zstd.ZstdCompressor(level=self.level)
+        return zstd.ZstdCompressor(level=self.level, dict_data=reference_dict(reference))
+
+    def _reference(self, segment):
+        """
+        Contenu brut de la première page du segment (mis en cache)
+        """
+        if segment not in self._references:
+            row = self._conn.execute(
+                "SELECT length FROM pages WHERE segment = ? AND offset = 0", (segment,)
+            ).fetchone()
+            if not row:
+                return None
+            with open(os.path.join(self.directory, segment_filename(segment)), 'rb') as f:
+                frame = f.read(row[0])
+            self._references[segment] = zstd.ZstdDecompressor().decompress(frame)
+        return self._references[segment]
+
+    def add(self, url, status, headers, page_html):
+        """
+        Ajoute une page téléchargée à l'archive
+        """
+        fetched_at = datetime.now().isoformat(timespec='seconds')
+        raw = encode_record(url, status, headers, page_html, fetched_at)
+
+        try:
+            with self._lock:
+                if self._file.tell() >= self.segment_max_bytes:
+                    self._open_segment(self._segment + 1)
+
+                offset = self._file.tell()
+                if offset == 0:
+                    # Première page du segment : elle servira de dictionnaire aux suivantes
+                    frame = zstd.ZstdCompressor(level=self.level).compress(raw)
+                    self._references[self._segment] = raw
+                    self._compressor = self._make_compressor(raw)
+                else:
+                    frame = self._compressor.compress(raw)
+
+                self._file.write(frame)
+                self._file.flush()
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO pages (url, segment, offset, length, raw_length, status, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (url, self._segment, offset, len(frame), len(raw), status, fetched_at)
+                    )
+        except Exception as e:
+            print(f"   ⚠️ Archivage impossible pour {url} : {str(e)}")
+
+    def entries(self):
+        """
+        Dernière version archivée de chaque URL : liste de (url, segment, offset, length)
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, segment, offset, length FROM pages WHERE id IN "
+                "(SELECT MAX(id) FROM pages GROUP BY url) ORDER BY id"
+            ).fetchall()
+
+    def get(self, url):
+        """
+        Dernière version archivée d'une URL (dict url/status/headers/html/fetched_at), ou None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM pages WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            segment, offset, length = row
+            reference = self._reference(segment) if offset else None
+
+        with open(os.path.join(self.directory, segment_filename(segment)), 'rb') as f:
+            f.seek(offset)
+            frame = f.read(length)
+        return decode_frame(frame, reference)
+
+    def summary(self):
+        """
+        Texte court pour les logs
+        """
+        with self._lock:
+            pages, compressed, raw = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_length), 0) FROM pages"
+            ).fetchone()
+        if not pages:
+            return "aucune page archivée"
+        return (f"{pages} pages, {compressed / 1024 / 1024:.1f} Mo "
+                f"({compressed / pages / 1024:.1f} Ko par page, {raw / max(compressed, 1):.0f}x) dans {self.directory}")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self._conn.close()
@@ -0,0 +1,145 @@
+"""
+Découverte automatique du nombre de pages de résultats
+Au lieu de lire le widget de pagination, on teste "la page contient des
+liens d'associations" : recherche exponentielle (pages 1, 2, 4, 8...)
+jusqu'à la première page vide, puis recherche dichotomique entre la
+dernière page pleine et cette page vide. Il suffit de O(log n) pages de liste.
+"""
+
+import time
+import threading
+from config import BASE_URL, SEARCH_PARAMS, MAX_DISCOVERY_PAGE
+from http_fetcher import extract_bde_links_from_html
+from page_readiness import wait_for_listing
+from rate_limiter import throttled_get
+from browser_extractor import harvest_listing_links
+
+# Associations par page de liste, utilisé pour l'estimation avant la première page
+DEFAULT_RESULTS_PER_PAGE = 30
+
+
+def listing_page_url(page_number):
+    """
+    URL d'une page de liste (même format que BDEScraperAllPages)
+    """
+    return f"{BASE_URL}?page={page_number}&category_tags={SEARCH_PARAMS['category_tags']}"
+
+
+def http_listing_probe(http_fetcher):
+    """
+    Sonde HTTP : renvoie une fonction page -> liste des liens d'associations de la page
+    """
+    def probe(page_number):
+        url = listing_page_url(page_number)
+        page_html = http_fetcher.fetch(url)
+        return extract_bde_links_from_html(page_html, url) if page_html else []
+    return probe
+
+
+def selenium_listing_probe(driver, rate_limiter=None):
+    """
+    Sonde Selenium (repli quand le HTTP n'est pas utilisable)
+    """
+    def probe(page_number):
+        throttled_get(driver, listing_page_url(page_number), rate_limiter)
+        if not wait_for_listing(driver):
+            return []
+        links, _ = harvest_listing_links(driver)
+        return [link['url'] for link in links]
+    return probe
+
+
+def discover_last_page(page_links, start_page=0, max_page=MAX_DISCOVERY_PAGE):
+    """
+    Cherche la dernière page qui contient des liens d'associations
+
+    page_links : fonction page -> liste des liens de la page (vide si la page est vide)
+    Renvoie (dernière page, liens par page sondée), dernière page = None si
+    start_page est déjà vide
+    """
+    probed = {}
+
+    def has_links(page_number):
+        if page_number not in probed:
+            links = page_links(page_number)
+            probed[page_number] = links
+            print(f"   🔎 Page {page_number} : {len(links)} associations")
+        return bool(probed[page_number])
+
+    if not has_links(start_page):
+        return None, probed
+
+    # Recherche exponentielle : low a des résultats, high est vide (ou hors limite)
+    low, step = start_page, 1
+    high = start_page + step
+    while high <= max_page and has_links(high):
+        low = high
+        step *= 2
+        high = start_page + step
+
+    if high > max_page:
+        if has_links(max_page):
+            print(f"⚠️ Encore des résultats à la page {max_page} (limite MAX_DISCOVERY_PAGE)")
+            return max_page, probed
+        high = max_page
+
+    # Recherche dichotomique entre la dernière page pleine et la première page vide
+    while high - low > 1:
+        middle = (low + high) // 2
+        if has_links(middle):
+            low = middle
+        else:
+            high = middle
+
+    return low, probed
+
+
+class CrawlProgress:
+    """
+    Avancement et temps restant estimé d'un crawl dont on connaît le nombre de pages
+    Le nombre total de BDE est estimé à partir des pages de liste déjà lues
+    known_items : BDE déjà listés avant le début (reprise d'un run)
+    """
+
+    def __init__(self, total_pages, known_items=0, results_per_page=DEFAULT_RESULTS_PER_PAGE):
+        self.total_pages = total_pages
+        self.known_items = known_items
+        self.results_per_page = results_per_page
+        self.pages_listed = 0
+        self.links_listed = 0
+        self.items_done = 0
+        self.start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def page_listed(self, nb_links):
+        with self._lock:
+            self.pages_listed += 1
+            self.links_listed += nb_links
+
+    def item_done(self, count=1):
+        with self._lock:
+            self.items_done += count
+
+    def estimated_total(self):
+        """
+        BDE connus + pages restantes × moyenne des pages lues
+        """
+        per_page = self.links_listed / self.pages_listed if self.pages_listed else self.results_per_page
+        remaining_pages = max(0, self.total_pages - self.pages_listed)
+        return self.known_items + self.links_listed + round(remaining_pages * per_page)
+
+    def eta_seconds(self):
+        elapsed = time.monotonic() - self.start
+        if not self.items_done or not elapsed:
+            return None
+        remaining = max(0, self.estimated_total() - self.items_done)
+        return remaining / (self.items_done / elapsed)
+
+    def summary(self):
+        """
+        Texte court pour les logs : "page 12/30, 340/~900 BDE, ~14 min restantes"
+        """
+        eta = self.eta_seconds()
+        eta_text = f"~{eta / 60:.0f} min restantes" if eta is not None else "temps restant inconnu"
+        return (f"page {self.pages_listed}/{self.total_pages}, "
+                f"{self.items_done}/~{self.estimated_total()} BDE, {eta_text}")
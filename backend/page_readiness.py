@@ -0,0 +1,79 @@
+"""
+Attente de chargement des pages basée sur le DOM
+Remplace les time.sleep() fixes : on attend un élément précis de la page,
+et on continue dès qu'il est là
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from config import READY_TIMEOUT
+
+# Une page de liste est prête quand les cartes d'associations sont affichées
+LISTING_READY_LOCATOR = (By.CSS_SELECTOR, "a[href*='/associations/']")
+
+# Une page d'association est prête quand son titre est affiché
+DETAIL_READY_LOCATOR = (By.CSS_SELECTOR, "h1")
+
+
+class element_has_text:
+    """
+    Condition d'attente : le premier élément trouvé contient du texte
+    (le titre peut exister avant d'être rempli par le JavaScript)
+    """
+
+    def __init__(self, locator):
+        self.locator = locator
+
+    def __call__(self, driver):
+        elements = driver.find_elements(*self.locator)
+        if elements and elements[0].text.strip():
+            return elements[0]
+        return False
+
+
+def wait_for_listing(driver, timeout=READY_TIMEOUT):
+    """
+    Attend que les liens d'associations d'une page de liste soient présents
+    Renvoie False si la page reste vide (fin de pagination, erreur...)
+    """
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located(LISTING_READY_LOCATOR))
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_association_page(driver, timeout=READY_TIMEOUT):
+    """
+    Attend que le titre de la page d'association soit affiché
+    """
+    try:
+        WebDriverWait(driver, timeout).until(element_has_text(DETAIL_READY_LOCATOR))
+        return True
+    except TimeoutException:
+        print("   ⚠️ Titre de l'association non affiché, extraction quand même")
+        return False
+
+
+def first_listing_card(driver):
+    """
+    Renvoie la première carte d'association affichée (ou None)
+    Sert de repère pour détecter le changement de page
+    """
+    elements = driver.find_elements(*LISTING_READY_LOCATOR)
+    return elements[0] if elements else None
+
+
+def wait_for_listing_change(driver, old_card, timeout=READY_TIMEOUT):
+    """
+    Après un clic sur "Suivant" : attend que l'ancienne carte disparaisse
+    du DOM, puis que les nouvelles cartes soient présentes
+    """
+    if old_card is not None:
+        try:
+            WebDriverWait(driver, timeout).until(EC.staleness_of(old_card))
+        except TimeoutException:
+            return False
+    return wait_for_listing(driver, timeout)
@@ -0,0 +1,144 @@
+"""
+Limiteur de débit partagé pour respecter le site scrapé (politesse)
+Seau à jetons adaptatif : toutes les requêtes (HTTP, Selenium, asyncio)
+passent par le même limiteur, qui ralentit quand le serveur souffre
+(429, 503, réponses lentes) et accélère quand tout va bien (AIMD)
+"""
+
+import time
+import asyncio
+import threading
+from config import (
+    REQUESTS_PER_SECOND, RATE_LIMIT_BURST, MIN_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND,
+    RATE_INCREASE_STEP, RATE_DECREASE_FACTOR, SLOW_RESPONSE_SECONDS, SLOW_PAGE_LOAD_SECONDS
+)
+
+# Codes HTTP qui signifient "tu vas trop vite"
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class TokenBucketRateLimiter:
+    """
+    Seau à jetons thread-safe avec ajustement AIMD du débit
+
+    - rate : jetons ajoutés par seconde (requêtes par seconde autorisées)
+    - burst : nombre maximum de jetons accumulés (rafale autorisée)
+    - Augmentation additive (+increase_step) après chaque réponse saine
+    - Diminution multiplicative (×decrease_factor) après un 429/503 ou une réponse lente
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=RATE_LIMIT_BURST,
+                 min_rate=MIN_REQUESTS_PER_SECOND, max_rate=MAX_REQUESTS_PER_SECOND,
+                 increase_step=RATE_INCREASE_STEP, decrease_factor=RATE_DECREASE_FACTOR,
+                 slow_threshold=SLOW_RESPONSE_SECONDS):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.slow_threshold = slow_threshold
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+        # Part du débit configuré (set_share) et rafale correspondant au débit complet
+        self.share = 1.0
+        self._full_burst = burst
+
+    def _reserve(self):
+        """
+        Réserve un jeton et renvoie le temps d'attente nécessaire (en secondes)
+        Le solde peut devenir négatif : les requêtes suivantes attendent leur tour
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Bloque jusqu'à ce que la prochaine requête soit autorisée
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Version asyncio de acquire()
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_response(self, status_code=None, elapsed=None, slow_threshold=None):
+        """
+        Ajuste le débit selon la réponse du serveur
+        status_code : code HTTP (None si inconnu, ex. Selenium)
+        elapsed : durée de la requête en secondes
+        """
+        threshold = slow_threshold or self.slow_threshold
+        throttled = status_code in THROTTLE_STATUS_CODES
+        slow = elapsed is not None and elapsed > threshold
+
+        with self._lock:
+            if throttled or slow:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                # On vide la rafale : pas de nouvelle salve juste après un ralentissement
+                self._tokens = min(self._tokens, 0.0)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+        if throttled or slow:
+            reason = f"HTTP {status_code}" if throttled else f"réponse lente ({elapsed:.1f}s)"
+            print(f"   🐢 {reason} : débit réduit à {self.rate:.2f} requêtes/s")
+
+    def set_share(self, share):
+        """
+        Ne garde que cette part du débit configuré (1/n quand n processus
+        se partagent le site) : débit courant, bornes, pas d'augmentation et
+        rafale sont mis à l'échelle, l'état AIMD est conservé
+        """
+        with self._lock:
+            ratio = share / self.share
+            self.rate *= ratio
+            self.min_rate *= ratio
+            self.max_rate *= ratio
+            self.increase_step *= ratio
+            self.burst = max(1, self._full_burst * share)
+            self._tokens = min(self._tokens, self.burst)
+            self.share = share
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Renvoie le limiteur partagé par tous les scrapers du processus
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucketRateLimiter()
+        return _shared_limiter
+
+
+def throttled_get(driver, url, rate_limiter=None):
+    """
+    driver.get() en passant par le limiteur, avec mesure du temps de chargement
+    """
+    rate_limiter = rate_limiter or get_rate_limiter()
+    rate_limiter.acquire()
+
+    start = time.monotonic()
+    driver.get(url)
+    rate_limiter.record_response(elapsed=time.monotonic() - start, slow_threshold=SLOW_PAGE_LOAD_SECONDS)
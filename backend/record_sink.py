@@ -0,0 +1,106 @@
+"""
+Écriture des résultats au fil de l'eau (CSV ou JSON Lines)
+Chaque bde_info est ajouté au fichier dès qu'il est extrait : les écritures
+sont regroupées par lots puis forcées sur le disque (fsync), la mémoire
+reste constante quel que soit le nombre d'associations
+"""
+
+import os
+import csv
+import json
+import time
+import threading
+from config import COLUMNS, SINK_BATCH_SIZE, SINK_FLUSH_SECONDS
+
+FORMATS = ('csv', 'jsonl')
+
+# Colonnes d'un bde_info, dans l'ordre des anciens exports pandas
+BDE_COLUMNS = COLUMNS + ['url_source']
+
+
+class RecordSink:
+    """
+    Fichier de résultats ouvert en ajout, partagé par les threads du scraper
+    Le format est déduit de l'extension (.csv ou .jsonl) si fmt n'est pas donné
+    """
+
+    def __init__(self, path, fmt=None, columns=BDE_COLUMNS, batch_size=SINK_BATCH_SIZE,
+                 flush_seconds=SINK_FLUSH_SECONDS):
+        self.path = path
+        self.fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Format de sortie inconnu : {self.fmt} (formats : {', '.join(FORMATS)})")
+
+        self.columns = columns
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.count = 0
+
+        self._buffer = []
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.created = not os.path.exists(path)  # Fichier créé par ce sink (et non repris)
+        new_file = self.created or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+        if self.fmt == 'csv':
+            self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+            if new_file:
+                self._writer.writeheader()
+                self._sync()
+
+    def write(self, record):
+        """
+        Ajoute un enregistrement (écrit sur le disque par lots)
+        """
+        with self._lock:
+            self._buffer.append(record)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size or time.time() - self._last_flush >= self.flush_seconds:
+                self._flush_buffer()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """
+        Écrit le lot en cours sur le disque
+        """
+        with self._lock:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        if self._buffer:
+            if self.fmt == 'csv':
+                self._writer.writerows(self._buffer)
+            else:
+                self._file.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in self._buffer)
+            self._buffer = []
+            self._sync()
+        self._last_flush = time.time()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, discard_if_empty=True):
+        """
+        Écrit le dernier lot et ferme le fichier
+        discard_if_empty : supprime le fichier si aucun enregistrement n'a été écrit
+        et s'il a été créé par ce sink (un fichier repris est toujours conservé)
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_buffer()
+            self._file.close()
+        if discard_if_empty and not self.count and self.created:
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
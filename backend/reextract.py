@@ -0,0 +1,145 @@
+"""
+🔁 RÉ-EXTRACTION HORS LIGNE DEPUIS L'ARCHIVE DES PAGES
+Relance l'extraction des champs (nom, email, téléphone, adresse, site...)
+sur les pages archivées par un crawl (ARCHIVE_PAGES), sans navigateur ni
+réseau, et écrit un nouveau fichier de résultats.
+Permet d'améliorer les regex d'extraction sans refaire un crawl de plusieurs heures.
+
+Sans dossier, toutes les archives sont lues, de la plus récente à la plus
+ancienne : chaque page est prise dans le dernier run qui l'a téléchargée
+(un recrawl n'archive pas les pages inchangées, 304).
+
+Usage :
+    python3 reextract.py                       # toutes les archives, version la plus récente de chaque page
+    python3 reextract.py data/archive/20250609_151849 --workers 8 --format jsonl
+"""
+
+import os
+import time
+import argparse
+from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+from config import SINK_FORMAT
+from http_fetcher import extract_bde_info_from_html, has_expected_markers
+from page_archive import read_indexes, archive_dirs, segment_filename, SegmentReader
+from record_sink import RecordSink
+
+OUTPUT_FILENAME = "bde_reextract"
+CHUNK_SIZE = 200  # Pages par tâche envoyée à un processus
+
+# Segments ouverts par le processus courant (un mmap par segment)
+_readers = {}
+
+
+def is_association_page(url):
+    """
+    Garde les pages d'associations (pas les pages de liste)
+    """
+    return urlparse(url).path.startswith('/associations/')
+
+
+def extract_chunk(task):
+    """
+    Exécuté dans un processus du pool : ré-extrait un lot de pages d'un même segment
+    Renvoie (bde_infos, nb_pages_ignorées)
+    """
+    directory, segment, reference_length, entries = task
+
+    reader = _readers.get((directory, segment))
+    if reader is None:
+        reader = SegmentReader(os.path.join(directory, segment_filename(segment)), reference_length)
+        _readers[(directory, segment)] = reader
+
+    results = []
+    skipped = 0
+    for url, offset, length in entries:
+        try:
+            record = reader.read(offset, length)
+            page_html = record['html']
+            if record['status'] not in (200, None) or not has_expected_markers(page_html):
+                skipped += 1
+                continue
+            results.append(extract_bde_info_from_html(page_html, url))
+        except Exception as e:
+            print(f"   ⚠️ Erreur pour {url} : {str(e)}")
+            skipped += 1
+    return results, skipped
+
+
+def build_tasks(entries, reference_lengths):
+    """
+    Découpe les pages d'associations en lots, segment par segment, dans l'ordre du crawl
+    """
+    tasks = []
+    current_segment, current = None, []
+    for directory, url, segment, offset, length, status in entries:
+        if not is_association_page(url):
+            continue
+        if (directory, segment) != current_segment or len(current) >= CHUNK_SIZE:
+            if current:
+                tasks.append((*current_segment, reference_lengths[current_segment], current))
+            current_segment, current = (directory, segment), []
+        current.append((url, offset, length))
+    if current:
+        tasks.append((*current_segment, reference_lengths[current_segment], current))
+    return tasks
+
+
+def reextract(directories, workers=None, output_format=SINK_FORMAT, output=None):
+    """
+    Ré-extrait toutes les pages d'associations des archives (la plus récente d'abord)
+    Renvoie le nom du fichier de résultats
+    """
+    entries, reference_lengths = read_indexes(directories)
+    tasks = build_tasks(entries, reference_lengths)
+    total_pages = sum(len(task[3]) for task in tasks)
+    print(f"📦 Archives : {', '.join(directories)}")
+    print(f"📄 {total_pages} pages d'associations à ré-extraire ({len(tasks)} lots)")
+
+    if not output:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = f"data/{OUTPUT_FILENAME}_{timestamp}.{output_format}"
+
+    start = time.monotonic()
+    skipped = 0
+    with RecordSink(output) as sink, ProcessPoolExecutor(max_workers=workers) as executor:
+        progress = tqdm(total=total_pages, desc="Ré-extraction")
+        # map conserve l'ordre des lots : le fichier suit l'ordre du crawl
+        for task, (bde_infos, task_skipped) in zip(tasks, executor.map(extract_chunk, tasks)):
+            sink.write_many(bde_infos)
+            skipped += task_skipped
+            progress.update(len(task[3]))
+        progress.close()
+
+    elapsed = time.monotonic() - start
+    print(f"\n✅ {sink.count} BDE ré-extraits, {skipped} pages ignorées (incomplètes ou en erreur)")
+    print(f"⚡ {total_pages / elapsed if elapsed else 0:.0f} pages/s en {elapsed:.1f}s")
+    if sink.count:
+        print(f"💾 Résultats : {output}")
+        return output
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ré-extraction hors ligne des pages archivées")
+    parser.add_argument("archive_dir", nargs="?", help="dossier d'archive (par défaut : tous les runs)")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=SINK_FORMAT, help="format du fichier de sortie")
+    parser.add_argument("--output", help="fichier de sortie (par défaut : data/bde_reextract_<date>.<format>)")
+    args = parser.parse_args()
+
+    print("🔁 RÉ-EXTRACTION HORS LIGNE")
+    print("=" * 50)
+
+    directories = [args.archive_dir] if args.archive_dir else archive_dirs()
+    if not directories or not all(os.path.isdir(directory) for directory in directories):
+        print("❌ Aucune archive trouvée (activer ARCHIVE_PAGES dans config.py puis lancer un crawl)")
+        return
+
+    reextract(directories, workers=args.workers, output_format=args.format, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,62 +3,58 @@ Script principal de scraping des BDE sur HelloAsso
 Scraper complet pour débutant avec Selenium
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+import argparse
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-import time
-import re
 from datetime import datetime
 from tqdm import tqdm
-from config import BASE_URL, SEARCH_PARAMS, DELAY_BETWEEN_REQUESTS, COLUMNS, OUTPUT_FILENAME
+from config import BASE_URL, SEARCH_PARAMS, OUTPUT_FILENAME, USE_HTTP_BACKEND, LEAN_BROWSING, SINK_FORMAT, CONDITIONAL_RECRAWL
+from http_fetcher import HttpFetcher
+from page_readiness import wait_for_listing, wait_for_association_page, first_listing_card, wait_for_listing_change
+from rate_limiter import get_rate_limiter, throttled_get
+from lean_browsing import enable_request_blocking, format_page_weight, PageWeightStats
+from browser_extractor import extract_bde_info_in_browser, harvest_listing_links
+from record_sink import RecordSink
+from validator_store import ValidatorStore
+from url_store import SeenUrlStore
+from browser_service import attach_driver, release_driver
 
 class BDEScraper:
     """
     Classe principale pour scraper les BDE sur HelloAsso
     """
     
-    def __init__(self):
+    def __init__(self, skip_seen=False):
         """
         Initialisation du scraper
+        skip_seen : ignore aussi les associations déjà scrapées lors des runs précédents
         """
         self.driver = None
-        self.bde_data = []  # Liste pour stocker toutes les données
-        self.processed_urls = set()  # Pour éviter les doublons
+        self.sink = None  # Fichier de résultats écrit au fil de l'eau
+        # Associations déjà scrapées pendant ce run : pas de doublons
+        # (skip_seen : ni celles des runs précédents)
+        self.seen_urls = SeenUrlStore() if skip_seen else SeenUrlStore(max_age_days=0)
+        # Validateurs du dernier crawl : les pages inchangées ne sont pas ré-extraites
+        self.validator_store = ValidatorStore() if CONDITIONAL_RECRAWL else None
+        self.http_fetcher = HttpFetcher(validator_store=self.validator_store) if USE_HTTP_BACKEND else None
+        self.rate_limiter = get_rate_limiter()  # Limiteur de débit partagé (politesse)
+        self.page_weights = PageWeightStats()  # Poids des pages chargées avec Selenium
         
     def setup_driver(self):
         """
-        Configure et lance le navigateur Chrome
+        Attache le scraper au navigateur Chrome partagé (browser_service.py)
         """
         print("🚀 Configuration du navigateur Chrome...")
         
-        chrome_options = Options()
-        
-        # Options pour être plus discret
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # User agent réaliste
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        # Désactive certaines fonctionnalités
-        chrome_options.add_argument("--disable-notifications")
-        chrome_options.add_argument("--disable-popup-blocking")
-        chrome_options.add_argument("--ignore-certificate-errors")
-        
-        # Installation automatique du driver
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Chrome est déjà lancé (options discrètes, user agent réaliste) : on s'y attache
+        # Navigation légère : driver.get() rend la main dès que le DOM est prêt
+        self.driver = attach_driver(page_load_strategy='eager' if LEAN_BROWSING else None)
         
         # Supprime les signes d'automation
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
+        if LEAN_BROWSING:
+            enable_request_blocking(self.driver)
+        
         print("✅ Navigateur configuré avec succès !")
         
     def get_bde_links_from_page(self):
@@ -67,29 +63,22 @@ class BDEScraper:
         """
         print("🔍 Extraction des liens BDE de la page courante...")
         
-        # Attendre que la page se charge
-        time.sleep(3)
+        # Attendre que les cartes d'associations soient affichées
+        if not wait_for_listing(self.driver):
+            print("   ⚠️ Aucune carte d'association affichée")
+            return []
         
         # Recherche de tous les liens d'associations
         try:
-            # Sélecteur pour les liens d'associations BDE
-            association_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/associations/']")
+            # Tous les liens et leur texte en un seul appel (2 appels par lien avant : href + texte)
+            links, saved_calls = harvest_listing_links(
+                self.driver, selectors=["a[href*='/associations/']"], calls_per_element=2
+            )
             
-            bde_links = []
-            for link in association_links:
-                href = link.get_attribute('href')
-                if href and '/associations/' in href and href not in self.processed_urls:
-                    # Récupérer le nom et la description depuis le lien
-                    try:
-                        link_text = link.text.strip()
-                        # Éviter les liens vides ou de navigation
-                        if link_text and len(link_text) > 10:
-                            bde_links.append(href)
-                            self.processed_urls.add(href)
-                    except:
-                        continue
+            # Éviter les liens vides ou de navigation
+            bde_links = [link['url'] for link in links if len(link['text']) > 10]
             
-            print(f"   📄 {len(bde_links)} nouveaux liens BDE trouvés")
+            print(f"   📄 {len(bde_links)} liens BDE trouvés ({saved_calls} appels WebDriver évités)")
             return bde_links
             
         except Exception as e:
@@ -102,138 +91,36 @@ class BDEScraper:
         """
         print(f"📄 Extraction des détails pour : {bde_url}")
         
+        # Extraction rapide par HTTP, Selenium seulement en repli
+        if self.http_fetcher:
+            bde_info = self.http_fetcher.fetch_bde_details(bde_url)
+            if bde_info:
+                print(f"   ⚡ {bde_info.get('nom_ecole') or 'Nom non trouvé'} (HTTP)")
+                return bde_info
+            print("   ↩️ Page incomplète en HTTP, repli sur Selenium")
+        
         try:
-            # Navigation vers la page du BDE
-            self.driver.get(bde_url)
-            time.sleep(DELAY_BETWEEN_REQUESTS)  # Respecter les délais
-            
-            # Initialisation des données
-            bde_info = {
-                'nom_ecole': '',
-                'nom_personne': '',
-                'prenom_personne': '',
-                'adresse': '',
-                'site_internet': '',
-                'telephone': '',
-                'email': '',
-                'url_source': bde_url
-            }
+            # Navigation vers la page du BDE (en respectant les délais)
+            throttled_get(self.driver, bde_url, self.rate_limiter)
+            wait_for_association_page(self.driver)
             
-            # Extraction du nom de l'école/BDE
-            try:
-                # Différents sélecteurs possibles pour le nom
-                name_selectors = [
-                    "h1",
-                    ".association-name",
-                    "[data-testid*='name']",
-                    ".title"
-                ]
-                
-                for selector in name_selectors:
-                    try:
-                        name_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if name_element and name_element.text.strip():
-                            bde_info['nom_ecole'] = name_element.text.strip()
-                            break
-                    except:
-                        continue
-                        
-            except Exception as e:
-                print(f"   ⚠️ Nom non trouvé : {str(e)}")
-            
-            # Extraction de l'adresse
-            try:
-                # Recherche d'éléments contenant une adresse
-                address_patterns = [
-                    r'\d+.*(?:rue|avenue|boulevard|place|impasse).*\d{5}.*',
-                    r'\d{5}\s+[A-Za-z\s\-]+',
-                    r'[A-Za-z\s\-]+\s+\(\d{5}\)'
-                ]
-                
-                page_text = self.driver.page_source
-                for pattern in address_patterns:
-                    matches = re.findall(pattern, page_text, re.IGNORECASE)
-                    if matches:
-                        bde_info['adresse'] = matches[0].strip()
-                        break
-                        
-            except Exception as e:
-                print(f"   ⚠️ Adresse non trouvée : {str(e)}")
-            
-            # Extraction de l'email
-            try:
-                # Pattern pour email
-                email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-                page_text = self.driver.page_source
-                email_matches = re.findall(email_pattern, page_text)
-                
-                if email_matches:
-                    # Filtrer les emails valides (éviter les emails génériques)
-                    valid_emails = [email for email in email_matches if not any(generic in email.lower() for generic in ['noreply', 'admin', 'webmaster', 'contact@helloasso'])]
-                    if valid_emails:
-                        bde_info['email'] = valid_emails[0]
-                    elif email_matches:
-                        bde_info['email'] = email_matches[0]
-                        
-            except Exception as e:
-                print(f"   ⚠️ Email non trouvé : {str(e)}")
+            # Tous les champs (et le hash de la page) en un seul aller-retour avec le navigateur
+            extraction = extract_bde_info_in_browser(self.driver, bde_url)
             
-            # Extraction du téléphone
-            try:
-                # Patterns pour téléphone français
-                phone_patterns = [
-                    r'(?:(?:\+33|0)[1-9](?:[0-9]{8}))',
-                    r'(?:0[1-9](?:\s?\d{2}){4})',
-                    r'(?:\+33\s?[1-9](?:\s?\d{2}){4})'
-                ]
-                
-                page_text = self.driver.page_source
-                for pattern in phone_patterns:
-                    phone_matches = re.findall(pattern, page_text)
-                    if phone_matches:
-                        bde_info['telephone'] = phone_matches[0].strip()
-                        break
-                        
-            except Exception as e:
-                print(f"   ⚠️ Téléphone non trouvé : {str(e)}")
+            # Page inchangée depuis le dernier crawl : on reprend le bde_info précédent
+            digest = extraction['content_hash']
+            previous = self.validator_store.unchanged_record(bde_url, digest) if self.validator_store else None
+            if previous:
+                print(f"   ♻️ {previous.get('nom_ecole') or 'Nom non trouvé'} (inchangé)")
+                return previous
             
-            # Extraction du site internet
-            try:
-                # Recherche de liens externes (sites web)
-                external_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href^='http']")
-                for link in external_links:
-                    href = link.get_attribute('href')
-                    if href and 'helloasso.com' not in href:
-                        # Filtrer les réseaux sociaux courants
-                        social_domains = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com']
-                        if not any(domain in href for domain in social_domains):
-                            bde_info['site_internet'] = href
-                            break
-                            
-            except Exception as e:
-                print(f"   ⚠️ Site internet non trouvé : {str(e)}")
+            bde_info = extraction['bde_info']
+            if self.validator_store:
+                self.validator_store.save(bde_url, bde_info, digest)
             
-            # Extraction des noms de personnes (si disponibles)
-            try:
-                # Recherche de patterns de noms dans le texte
-                name_patterns = [
-                    r'(?:Président|Présidente|Contact|Responsable)[\s:]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-                    r'([A-Z][a-z]+\s+[A-Z][a-z]+)(?:\s*[-–]\s*(?:Président|Présidente|Contact))'
-                ]
-                
-                page_text = self.driver.page_source
-                for pattern in name_patterns:
-                    name_matches = re.findall(pattern, page_text)
-                    if name_matches:
-                        full_name = name_matches[0].strip()
-                        name_parts = full_name.split()
-                        if len(name_parts) >= 2:
-                            bde_info['prenom_personne'] = name_parts[0]
-                            bde_info['nom_personne'] = ' '.join(name_parts[1:])
-                        break
-                        
-            except Exception as e:
-                print(f"   ⚠️ Noms de personnes non trouvés : {str(e)}")
+            # Poids et temps de chargement de la page
+            self.page_weights.add(extraction['weight'])
+            print(f"   {format_page_weight(extraction['weight'])}")
             
             # Affichage des informations extraites
             print(f"   ✅ Données extraites :")
@@ -255,40 +142,40 @@ class BDEScraper:
             # Recherche du bouton "Suivant"
             next_button = self.driver.find_element(By.CSS_SELECTOR, "button[class*='next']:not([disabled])")
             if next_button:
+                old_card = first_listing_card(self.driver)
+                self.rate_limiter.acquire()
                 next_button.click()
-                time.sleep(3)  # Attendre le chargement
-                return True
+                # Attendre que les cartes de la nouvelle page remplacent les anciennes
+                return wait_for_listing_change(self.driver, old_card)
         except:
             pass
         
         return False
     
-    def save_to_csv(self):
+    def open_sink(self):
         """
-        Sauvegarde les données en format CSV
+        Ouvre le fichier de résultats : chaque BDE y est ajouté dès son extraction
         """
-        if not self.bde_data:
-            print("❌ Aucune donnée à sauvegarder")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"data/{OUTPUT_FILENAME}_{timestamp}.{SINK_FORMAT}"
+        self.sink = RecordSink(filename)
+        print(f"💾 Enregistrement au fil de l'eau dans : {filename}")
+    
+    def close_sink(self):
+        """
+        Écrit les derniers BDE et ferme le fichier de résultats
+        """
+        if not self.sink:
             return False
-            
-        try:
-            # Création du DataFrame pandas
-            df = pd.DataFrame(self.bde_data)
-            
-            # Nom du fichier avec timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"data/{OUTPUT_FILENAME}_{timestamp}.csv"
-            
-            # Sauvegarde
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"💾 Données sauvegardées dans : {filename}")
-            print(f"📊 Total : {len(self.bde_data)} BDE scrapés")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erreur lors de la sauvegarde : {str(e)}")
+        
+        self.sink.close()
+        if not self.sink.count:
+            print("❌ Aucune donnée à sauvegarder")
             return False
+        
+        print(f"💾 Données sauvegardées dans : {self.sink.path}")
+        print(f"📊 Total : {self.sink.count} BDE scrapés")
+        return True
     
     def run_scraping(self, max_pages=None):
         """
@@ -301,14 +188,14 @@ class BDEScraper:
             print(f"📄 Scraping de TOUTES les pages disponibles")
         
         try:
-            # Configuration du navigateur
+            # Fichier de résultats et configuration du navigateur
+            self.open_sink()
             self.setup_driver()
             
             # Navigation vers la page de recherche
             url = f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}"
             print(f"\n📌 Accès à : {url}")
-            self.driver.get(url)
-            time.sleep(3)
+            throttled_get(self.driver, url, self.rate_limiter)
             
             page_count = 0
             
@@ -317,14 +204,17 @@ class BDEScraper:
                 print(f"\n📄 === PAGE {page_count} ===")
                 
                 # Extraction des liens de la page courante
-                bde_links = self.get_bde_links_from_page()
+                page_links = self.get_bde_links_from_page()
                 
-                if not bde_links:
+                if not page_links:
                     print("❌ Aucun lien trouvé sur cette page")
                     break
                 
+                # Sans les BDE déjà vus sur une autre page ou scrapés lors d'un run récent
+                bde_links = self.seen_urls.filter_new(page_links)
+                
                 # Traitement de chaque BDE
-                print(f"🔄 Traitement de {len(bde_links)} BDE...")
+                print(f"🔄 Traitement de {len(bde_links)} nouveaux BDE ({len(page_links) - len(bde_links)} déjà scrapés)...")
                 
                 for i, bde_url in enumerate(tqdm(bde_links, desc=f"Page {page_count}")):
                     print(f"\n   📄 BDE {i+1}/{len(bde_links)}")
@@ -332,10 +222,8 @@ class BDEScraper:
                     # Extraction des détails
                     bde_info = self.extract_bde_details(bde_url)
                     if bde_info:
-                        self.bde_data.append(bde_info)
-                    
-                    # Délai entre les requêtes
-                    time.sleep(DELAY_BETWEEN_REQUESTS)
+                        self.sink.write(bde_info)
+                        self.seen_urls.mark_seen(bde_url)
                 
                 # Tentative de navigation vers la page suivante
                 print(f"\n🔄 Tentative de passage à la page suivante...")
@@ -345,30 +233,42 @@ class BDEScraper:
             
             # Sauvegarde des données
             print(f"\n💾 SAUVEGARDE DES DONNÉES")
-            self.save_to_csv()
+            self.close_sink()
             
             print(f"\n✅ SCRAPING TERMINÉ AVEC SUCCÈS !")
-            print(f"📊 {len(self.bde_data)} BDE traités au total")
+            print(f"📊 {self.sink.count} BDE traités au total")
+            print(f"📦 Pages Selenium : {self.page_weights.summary()}")
+            if self.validator_store:
+                print(f"♻️ Recrawl conditionnel : {self.validator_store.summary()}")
+            print(f"🔗 Dédoublonnage : {self.seen_urls.summary()}")
             
         except Exception as e:
             print(f"❌ ERREUR CRITIQUE : {str(e)}")
             
         finally:
+            # Les BDE déjà extraits restent dans le fichier en cas d'erreur
+            if self.sink:
+                self.sink.close()
             # Fermeture du navigateur
             if self.driver:
                 print("\n🔒 Fermeture du navigateur...")
-                self.driver.quit()
+                release_driver(self.driver)
 
 def main():
     """
     Fonction principale
     """
+    parser = argparse.ArgumentParser(description="Scraper BDE HelloAsso")
+    parser.add_argument("--skip-seen", action="store_true",
+                        help="ignore les BDE déjà scrapés lors des runs précédents (absents du fichier de résultats)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🎓 SCRAPER BDE HELLOASSO")
     print("=" * 60)
     
     # Création et lancement du scraper
-    scraper = BDEScraper()
+    scraper = BDEScraper(skip_seen=args.skip_seen)
     
     # Lancement du scraping complet (toutes les pages)
     scraper.run_scraping(max_pages=None)
@@ -5,6 +5,7 @@ URL: https://www.helloasso.com/e/recherche/associations?page={i}&category_tags=b
 """
 
 import os
+import argparse
 import time
 import csv
 import re
@@ -15,30 +16,81 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import pandas as pd
 from tqdm import tqdm
+from config import DRIVER_POOL_SIZE, USE_HTTP_BACKEND, LEAN_BROWSING, SINK_FORMAT, CONDITIONAL_RECRAWL, ARCHIVE_PAGES
+from http_fetcher import HttpFetcher
+from async_crawler import AsyncCrawler
+from crawl_pipeline import ListingDetailPipeline
+from crawl_frontier import CrawlFrontier
+from url_store import SeenUrlStore
+from record_sink import RecordSink
+from validator_store import ValidatorStore
+from page_archive import PageArchive
+from page_discovery import discover_last_page, http_listing_probe, CrawlProgress
+from page_readiness import wait_for_listing, wait_for_association_page
+from rate_limiter import get_rate_limiter, throttled_get
+from lean_browsing import apply_lean_options, enable_request_blocking, format_page_weight, PageWeightStats
+from browser_extractor import extract_bde_info_in_browser, harvest_listing_links
+from driver_pool import DriverPool
 
 # Configuration
 BASE_URL = "https://www.helloasso.com/e/recherche/associations"
 SEARCH_PARAMS = "category_tags=bde"
 OUTPUT_FILENAME = "bde_scraping_all_pages"
-DELAY_BETWEEN_REQUESTS = 2
-TOTAL_PAGES = 30  # Pages 0 à 29 = 30 pages
+TOTAL_PAGES = 30  # Pages 0 à 29 = 30 pages (repli si la découverte automatique échoue)
+
+
+def page_range_text(start_page, end_page):
+    """
+    Description des pages à scraper pour les logs
+    """
+    if end_page is None:
+        return f"pages à partir de {start_page} (nombre de pages découvert automatiquement)"
+    return f"pages {start_page} à {end_page} ({end_page - start_page + 1} pages)"
 
 class BDEScraperAllPages:
-    def __init__(self):
+    def __init__(self, pool_size=DRIVER_POOL_SIZE, skip_seen=False):
         self.driver = None
-        self.bde_data = []
+        self.driver_pool = None
+        self.pool_size = pool_size
+        self.sink = None  # Fichier de résultats écrit au fil de l'eau
+        self.progress = None  # Avancement et temps restant du run
         
         # Création du dossier data
         os.makedirs('data', exist_ok=True)
+        
+        # Validateurs du dernier crawl : les pages inchangées ne sont pas ré-extraites
+        self.validator_store = ValidatorStore() if CONDITIONAL_RECRAWL else None
+        # Archive compressée des pages téléchargées (optionnelle)
+        self.archive = self.open_archive()
+        self.http_fetcher = HttpFetcher(validator_store=self.validator_store, archive=self.archive) if USE_HTTP_BACKEND else None
+        self.rate_limiter = get_rate_limiter()  # Limiteur de débit partagé (politesse)
+        self.page_weights = PageWeightStats()  # Poids des pages chargées avec Selenium
+        
+        # Journal persistant des pages et BDE traités (reprise après interruption)
+        self.frontier = CrawlFrontier()
+        # Associations déjà scrapées : une seule fois par run (skip_seen : et pas
+        # de nouveau avant SEEN_URL_MAX_AGE_DAYS, elles sont alors absentes des résultats)
+        self.seen_urls = SeenUrlStore() if skip_seen else SeenUrlStore(max_age_days=0)
     
-    def setup_driver(self):
+    def open_archive(self):
         """
-        Configure le navigateur Chrome en mode headless
+        Ouvre l'archive des pages du run si ARCHIVE_PAGES est activé
+        """
+        if not ARCHIVE_PAGES:
+            return None
+        try:
+            archive = PageArchive.for_new_run()
+            print(f"🗜️ Archivage des pages dans : {archive.directory}")
+            return archive
+        except Exception as e:
+            print(f"⚠️ Archive des pages désactivée : {str(e)}")
+            return None
+    
+    def create_driver(self):
+        """
+        Crée un navigateur Chrome en mode headless
         """
-        print("🔧 Configuration du navigateur...")
-        
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
@@ -46,10 +98,28 @@ class BDEScraperAllPages:
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
+        # Navigation légère (pas d'images, polices, médias ni scripts tiers)
+        if LEAN_BROWSING:
+            apply_lean_options(chrome_options)
+        
+        # Pas d'attente implicite : les attentes sont explicites (page_readiness)
+        driver = webdriver.Chrome(options=chrome_options)
+        if LEAN_BROWSING:
+            enable_request_blocking(driver)
+        return driver
+    
+    def setup_driver(self):
+        """
+        Configure le navigateur principal (pages de liste) et le pool de navigateurs (pages de détail)
+        """
+        print("🔧 Configuration du navigateur...")
+        
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.implicitly_wait(10)
+            self.driver = self.create_driver()
             print("✅ Navigateur configuré avec succès")
+            
+            self.driver_pool = DriverPool(self.create_driver, size=self.pool_size)
+            self.driver_pool.start()
         except Exception as e:
             print(f"❌ Erreur lors de la configuration : {str(e)}")
             raise
@@ -68,136 +138,73 @@ class BDEScraperAllPages:
             url = self.get_page_url(page_number)
             print(f"🔗 Accès à la page {page_number} : {url}")
             
-            self.driver.get(url)
-            time.sleep(3)
-            
-            # Différents sélecteurs possibles pour les liens des BDE
-            selectors = [
-                "a[href*='/associations/']",
-                ".association-card a",
-                ".card a[href*='associations']",
-                "a[href*='bde']",
-                ".result-item a",
-                ".search-result a"
-            ]
-            
-            all_links = []
-            
-            for selector in selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        href = element.get_attribute('href')
-                        if href and '/associations/' in href and href not in all_links:
-                            all_links.append(href)
-                except:
-                    continue
+            throttled_get(self.driver, url, self.rate_limiter)
+            if not wait_for_listing(self.driver):
+                return []
             
-            # Supprimer les doublons et filtrer
-            unique_links = list(set(all_links))
+            # Tous les liens de la page en un seul appel (dédoublonnés, dans l'ordre de la page),
+            # avec le HTML pour l'archive
+            if self.archive:
+                links, saved_calls, page_source = harvest_listing_links(self.driver, include_source=True)
+                self.archive.add(url, None, {}, page_source)
+            else:
+                links, saved_calls = harvest_listing_links(self.driver)
+            unique_links = [link['url'] for link in links]
             
-            print(f"🔗 {len(unique_links)} liens BDE uniques trouvés sur la page {page_number}")
+            print(f"🔗 {len(unique_links)} liens BDE uniques trouvés sur la page {page_number} ({saved_calls} appels WebDriver évités)")
             return unique_links
             
         except Exception as e:
             print(f"❌ Erreur lors de l'extraction des liens page {page_number} : {str(e)}")
             return []
     
-    def extract_bde_details(self, bde_url):
+    def extract_bde_details(self, bde_url, driver=None):
         """
         Extrait les détails d'un BDE spécifique
+        driver : navigateur à utiliser (par défaut le navigateur principal)
+        """
+        driver = driver or self.driver
+        print(f"📄 Extraction : {bde_url}")
+        
+        # Extraction rapide par HTTP, Selenium seulement en repli
+        if self.http_fetcher:
+            bde_info = self.http_fetcher.fetch_bde_details(bde_url)
+            if bde_info:
+                print(f"   ⚡ {bde_info.get('nom_ecole') or 'Nom non trouvé'} (HTTP)")
+                return bde_info
+            print("   ↩️ Page incomplète en HTTP, repli sur Selenium")
+        return self.extract_bde_details_browser(bde_url, driver)
+    
+    def extract_bde_details_browser(self, bde_url, driver=None):
+        """
+        Extrait les détails d'un BDE avec Selenium, sans tenter le HTTP
+        (repli des pages déjà jugées incomplètes en HTTP)
         """
+        driver = driver or self.driver
         try:
-            print(f"📄 Extraction : {bde_url}")
-            self.driver.get(bde_url)
-            time.sleep(2)
-            
-            # Structure de base des informations BDE
-            bde_info = {
-                'nom_ecole': '',
-                'nom_personne': '',
-                'prenom_personne': '',
-                'adresse': '',
-                'site_internet': '',
-                'telephone': '',
-                'email': '',
-                'url_source': bde_url
-            }
-            
-            # Extraction du nom de l'école/BDE
-            try:
-                selectors = ["h1", ".title", ".name", ".association-name", "title"]
-                for selector in selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        name = elements[0].text.strip()
-                        if name and name != "HelloAsso":
-                            bde_info['nom_ecole'] = name
-                            break
-            except:
-                pass
-            
-            # Extraction de l'email
-            try:
-                page_source = self.driver.page_source
-                email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-                emails = re.findall(email_pattern, page_source)
-                if emails:
-                    # Filtrer les emails valides
-                    valid_emails = []
-                    for email in emails:
-                        if not any(x in email.lower() for x in ['noreply', 'no-reply', 'support', 'admin', 'info@helloasso', 'contact@helloasso']):
-                            valid_emails.append(email)
-                    if valid_emails:
-                        bde_info['email'] = valid_emails[0]
-            except:
-                pass
-            
-            # Extraction du téléphone
-            try:
-                page_text = self.driver.page_source
-                phone_patterns = [
-                    r'(?:(?:\+33|0)[1-9](?:[0-9]{8}))',
-                    r'(?:0[1-9](?:\s?\d{2}){4})',
-                    r'(?:\+33\s?[1-9](?:\s?\d{2}){4})'
-                ]
-                
-                for pattern in phone_patterns:
-                    phone_matches = re.findall(pattern, page_text)
-                    if phone_matches:
-                        bde_info['telephone'] = phone_matches[0].strip()
-                        break
-            except:
-                pass
-            
-            # Extraction du site internet
-            try:
-                external_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href^='http']")
-                for link in external_links:
-                    href = link.get_attribute('href')
-                    if href and 'helloasso.com' not in href:
-                        social_domains = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com']
-                        if not any(domain in href for domain in social_domains):
-                            bde_info['site_internet'] = href
-                            break
-            except:
-                pass
-            
-            # Extraction de l'adresse
-            try:
-                page_text = self.driver.page_source
-                address_patterns = [
-                    r'\d+[,\s]+(?:rue|avenue|boulevard|place|impasse|allée)[^,\n]+(?:\d{5})[^,\n]*',
-                    r'(?:rue|avenue|boulevard|place|impasse|allée)[^,\n]+(?:\d{5})[^,\n]*'
-                ]
-                
-                for pattern in address_patterns:
-                    addresses = re.findall(pattern, page_text, re.IGNORECASE)
-                    if addresses:
-                        bde_info['adresse'] = addresses[0].strip()
-                        break
-            except:
-                pass
+            throttled_get(driver, bde_url, self.rate_limiter)
+            wait_for_association_page(driver)
+            
+            # Tous les champs en un seul aller-retour avec le navigateur (avec le hash
+            # de la page, et le HTML pour l'archive)
+            extraction = extract_bde_info_in_browser(driver, bde_url, include_source=bool(self.archive))
+            
+            # Page inchangée depuis le dernier crawl : on reprend le bde_info précédent
+            digest = extraction['content_hash']
+            previous = self.validator_store.unchanged_record(bde_url, digest) if self.validator_store else None
+            if previous:
+                print(f"   ♻️ {previous.get('nom_ecole') or 'Nom non trouvé'} (inchangé)")
+                return previous
+            
+            bde_info = extraction['bde_info']
+            if self.archive:
+                self.archive.add(bde_url, None, {}, extraction['page_source'])
+            if self.validator_store:
+                self.validator_store.save(bde_url, bde_info, digest)
+            
+            # Poids et temps de chargement de la page
+            self.page_weights.add(extraction['weight'])
+            print(f"   {format_page_weight(extraction['weight'])}")
             
             # Affichage des informations extraites
             print(f"   ✅ {bde_info.get('nom_ecole', 'Nom non trouvé')}")
@@ -210,85 +217,322 @@ class BDEScraperAllPages:
             print(f"   ❌ Erreur lors de l'extraction : {str(e)}")
             return None
     
-    def save_to_csv(self):
+    def extract_and_record(self, bde_url, driver=None):
         """
-        Sauvegarde les données en format CSV
+        Extrait un BDE et enregistre aussitôt le résultat dans le journal
         """
-        if not self.bde_data:
-            print("❌ Aucune donnée à sauvegarder")
-            return False
-            
+        bde_info = self.extract_bde_details(bde_url, driver)
+        self.frontier.record_association(bde_url, bde_info)
+        if bde_info:
+            self.seen_urls.mark_seen(bde_url)
+        if self.progress:
+            self.progress.item_done()
+        return bde_info
+    
+    def list_and_record(self, page_number):
+        """
+        Extrait les liens d'une page de liste, les enregistre dans le journal
+        et renvoie ceux qui restent à traiter
+        """
+        page_links = self.get_bde_links_from_page(page_number)
+        # Sans les BDE déjà donnés par une autre page ou scrapés lors d'un run récent
+        new_links = self.seen_urls.filter_new(page_links)
+        if page_links and not new_links:
+            print(f"♻️ Les {len(page_links)} BDE de la page {page_number} sont déjà scrapés")
+            self.frontier.mark_page_done(page_number)
+            bde_links = []
+        else:
+            bde_links = self.frontier.record_listing(page_number, new_links)
+        if self.progress:
+            self.progress.page_listed(len(bde_links))
+            print(f"⏱️ {self.progress.summary()}")
+        return bde_links
+    
+    def discover_end_page(self, start_page):
+        """
+        Dernière page de liste contenant des BDE, trouvée en O(log n) pages
+        (recherche exponentielle puis dichotomique, en HTTP si possible)
+        Repli sur TOTAL_PAGES si la découverte échoue (au moins la page de départ)
+        """
+        print("🔎 Découverte du nombre de pages de liste...")
         try:
-            df = pd.DataFrame(self.bde_data)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"data/{OUTPUT_FILENAME}_{timestamp}.csv"
-            
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"💾 Données sauvegardées dans : {filename}")
-            print(f"📊 Total : {len(self.bde_data)} BDE scrapés")
-            
-            return filename
-            
+            page_links = http_listing_probe(self.http_fetcher) if self.http_fetcher else self.get_bde_links_from_page
+            last_page, probed = discover_last_page(page_links, start_page)
         except Exception as e:
-            print(f"❌ Erreur lors de la sauvegarde : {str(e)}")
+            print(f"⚠️ Erreur lors de la découverte : {str(e)}")
+            last_page, probed = None, {}
+        
+        if last_page is None:
+            fallback_page = max(start_page, TOTAL_PAGES - 1)
+            print(f"⚠️ Nombre de pages inconnu, repli sur les pages {start_page} à {fallback_page}")
+            return fallback_page
+        
+        print(f"✅ {last_page - start_page + 1} pages de liste (pages {start_page} à {last_page}, {len(probed)} pages sondées)")
+        return last_page
+    
+    def prepare_frontier(self, start_page, end_page, resume):
+        """
+        Nouveau run : réinitialise le journal avec les pages demandées
+        (end_page=None : dernière page découverte automatiquement)
+        Reprise : renvoie seulement les pages de liste pas encore terminées
+        """
+        if resume and self.frontier.stats()['pages']:
+            print(f"♻️ Reprise du run précédent : {self.frontier.summary()}")
+            pages = self.frontier.pending_pages()
+            self.progress = CrawlProgress(len(pages), known_items=len(self.frontier.pending_associations()))
+            return pages
+        
+        if resume:
+            print("⚠️ Aucun run précédent à reprendre, démarrage d'un nouveau run")
+        if end_page is None:
+            end_page = self.discover_end_page(start_page)
+        pages = list(range(start_page, end_page + 1))
+        self.frontier.reset(pages)
+        self.progress = CrawlProgress(len(pages))
+        return pages
+    
+    def open_sink(self):
+        """
+        Ouvre le fichier de résultats : chaque BDE y est ajouté dès son extraction
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"data/{OUTPUT_FILENAME}_{timestamp}.{SINK_FORMAT}"
+        self.sink = RecordSink(filename)
+        print(f"💾 Enregistrement au fil de l'eau dans : {filename}")
+    
+    def write_result(self, bde_url, bde_info):
+        """
+        Ajoute un BDE extrait au fichier de résultats
+        """
+        if bde_info:
+            self.sink.write(bde_info)
+    
+    def close_sink(self):
+        """
+        Écrit les derniers BDE et ferme le fichier de résultats
+        """
+        if not self.sink:
+            return False
+        
+        self.sink.close()
+        if not self.sink.count:
+            print("❌ Aucune donnée à sauvegarder")
             return False
+        
+        print(f"💾 Données sauvegardées dans : {self.sink.path}")
+        print(f"📊 Total : {self.sink.count} BDE scrapés")
+        return self.sink.path
     
-    def run_scraping_all_pages(self, start_page=0, end_page=29):
+    def run_scraping_all_pages(self, start_page=0, end_page=None, resume=False):
         """
         Lance le scraping de toutes les pages
+        resume : reprend le run interrompu sans refaire les pages et BDE terminés
+        end_page=None : nombre de pages découvert automatiquement
         """
         print("🚀 DÉBUT DU SCRAPING COMPLET DES BDE")
-        print(f"📄 Scraping des pages {start_page} à {end_page} ({end_page - start_page + 1} pages)")
+        print(f"📄 Scraping des {page_range_text(start_page, end_page)}")
         print(f"🔗 URL de base : {BASE_URL}?page={{i}}&{SEARCH_PARAMS}")
         
         try:
+            # Navigateur lancé d'abord : il sert à la découverte des pages si le HTTP est désactivé
             self.setup_driver()
+            pages = self.prepare_frontier(start_page, end_page, resume)
+            self.open_sink()
+            # BDE déjà terminés d'un run repris (rien pour un nouveau run)
+            self.sink.write_many(self.frontier.iter_results())
             
             total_scraped = 0
             
-            for page_num in range(start_page, end_page + 1):
+            # Reprise : BDE déjà listés mais pas encore extraits
+            pending_links = [bde_url for _, _, bde_url in self.frontier.pending_associations()]
+            if pending_links:
+                print(f"\n♻️ {len(pending_links)} BDE en attente du run précédent")
+                results = self.driver_pool.map(self.extract_and_record, pending_links)
+                for bde_url, bde_info in zip(pending_links, tqdm(results, total=len(pending_links), desc="Reprise")):
+                    if bde_info:
+                        self.write_result(bde_url, bde_info)
+                        total_scraped += 1
+            
+            for page_num in pages:
                 print(f"\n📄 === PAGE {page_num} ===")
                 
-                # Extraction des liens de la page courante
-                bde_links = self.get_bde_links_from_page(page_num)
+                # Extraction des liens de la page courante (enregistrés dans le journal)
+                bde_links = self.list_and_record(page_num)
                 
                 if not bde_links:
                     print(f"❌ Aucun BDE trouvé sur la page {page_num}")
                     continue
                 
-                # Traitement de chaque BDE
-                print(f"🔄 Traitement de {len(bde_links)} BDE...")
+                # Traitement des BDE en parallèle (résultats dans l'ordre de la page)
+                print(f"🔄 Traitement de {len(bde_links)} BDE sur {len(self.driver_pool.drivers)} navigateurs...")
                 
-                for i, bde_url in enumerate(tqdm(bde_links, desc=f"Page {page_num}")):
-                    print(f"\n   📄 BDE {i+1}/{len(bde_links)}")
-                    
-                    # Extraction des détails
-                    bde_info = self.extract_bde_details(bde_url)
+                results = self.driver_pool.map(self.extract_and_record, bde_links)
+                for bde_url, bde_info in zip(bde_links, tqdm(results, total=len(bde_links), desc=f"Page {page_num}")):
                     if bde_info:
-                        self.bde_data.append(bde_info)
+                        self.write_result(bde_url, bde_info)
                         total_scraped += 1
-                    
-                    # Délai entre les requêtes
-                    time.sleep(DELAY_BETWEEN_REQUESTS)
                 
                 print(f"✅ Page {page_num} terminée - {len(bde_links)} BDE traités")
                 print(f"📊 Total cumulé : {total_scraped} BDE")
+                print(f"⏱️ {self.progress.summary()}")
             
-            # Sauvegarde des données
+            # Fin de l'écriture des données (y compris celles d'un run repris)
             print(f"\n💾 SAUVEGARDE DES DONNÉES")
-            filename = self.save_to_csv()
+            print(f"📒 Journal : {self.frontier.summary()}")
+            filename = self.close_sink()
             
             print(f"\n✅ SCRAPING COMPLET TERMINÉ !")
-            print(f"📊 {len(self.bde_data)} BDE traités au total")
+            print(f"📊 {self.sink.count} BDE traités au total")
+            print(f"📦 Pages Selenium : {self.page_weights.summary()}")
+            if self.validator_store:
+                print(f"♻️ Recrawl conditionnel : {self.validator_store.summary()}")
+            print(f"🔗 Dédoublonnage : {self.seen_urls.summary()}")
+            if self.archive:
+                print(f"🗜️ Archive : {self.archive.summary()}")
             print(f"📁 Fichier généré : {filename}")
             
             return filename
             
         except Exception as e:
             print(f"❌ ERREUR CRITIQUE : {str(e)}")
+            print("💡 Les pages et BDE terminés sont dans le journal : relancez avec --resume")
+            
+        finally:
+            # Les BDE déjà extraits restent dans le fichier en cas d'erreur
+            if self.sink:
+                self.sink.close()
+            # Fermeture des navigateurs
+            if self.driver_pool:
+                self.driver_pool.close()
+            if self.driver:
+                print("\n🔒 Fermeture du navigateur...")
+                self.driver.quit()
+
+    def run_scraping_pipelined(self, start_page=0, end_page=None, resume=False):
+        """
+        Variante pipeline de run_scraping_all_pages : le navigateur principal
+        parcourt les pages de liste pendant que le pool extrait les BDE déjà
+        trouvés. Même résultat, dans le même ordre.
+        resume : reprend le run interrompu sans refaire les pages et BDE terminés
+        end_page=None : nombre de pages découvert automatiquement
+        """
+        print("🚀 DÉBUT DU SCRAPING PIPELINE DES BDE")
+        print(f"📄 Scraping des {page_range_text(start_page, end_page)}")
+        
+        try:
+            # Navigateur lancé d'abord : il sert à la découverte des pages si le HTTP est désactivé
+            self.setup_driver()
+            pages = self.prepare_frontier(start_page, end_page, resume)
+            self.open_sink()
+            # BDE déjà terminés d'un run repris (rien pour un nouveau run)
+            self.sink.write_many(self.frontier.iter_results())
+            
+            pipeline = ListingDetailPipeline(
+                fetch_listing=self.list_and_record,
+                process_detail=lambda bde_url: self.driver_pool.run(self.extract_and_record, bde_url),
+                num_consumers=len(self.driver_pool.drivers),
+                on_listing_error=self.frontier.mark_page_failed
+            )
+            # Reprise : les BDE déjà listés mais pas encore extraits passent en premier
+            pipeline.run(pages, seed_items=self.frontier.pending_associations(), on_result=self.write_result)
+            
+            print(f"\n📄 {pipeline.listed_pages} pages de liste, {pipeline.listed_links} liens traités")
+            if pipeline.failed_pages:
+                print(f"⚠️ {pipeline.failed_pages} pages de liste en échec : relancez avec --resume pour les reprendre")
+            
+            print(f"\n💾 SAUVEGARDE DES DONNÉES")
+            print(f"📒 Journal : {self.frontier.summary()}")
+            filename = self.close_sink()
+            
+            print(f"\n✅ SCRAPING PIPELINE TERMINÉ !")
+            print(f"📊 {self.sink.count} BDE traités au total")
+            print(f"📦 Pages Selenium : {self.page_weights.summary()}")
+            if self.validator_store:
+                print(f"♻️ Recrawl conditionnel : {self.validator_store.summary()}")
+            print(f"🔗 Dédoublonnage : {self.seen_urls.summary()}")
+            if self.archive:
+                print(f"🗜️ Archive : {self.archive.summary()}")
+            
+            return filename
+            
+        except Exception as e:
+            print(f"❌ ERREUR CRITIQUE : {str(e)}")
+            print("💡 Les pages et BDE terminés sont dans le journal : relancez avec --resume")
             
         finally:
-            # Fermeture du navigateur
+            # Les BDE déjà extraits restent dans le fichier en cas d'erreur
+            if self.sink:
+                self.sink.close()
+            if self.driver_pool:
+                self.driver_pool.close()
+            if self.driver:
+                print("\n🔒 Fermeture du navigateur...")
+                self.driver.quit()
+    
+    def run_scraping_async(self, start_page=0, end_page=None):
+        """
+        Variante asynchrone de run_scraping_all_pages : les pages de liste et
+        les associations sont récupérées en parallèle par HTTP, Selenium
+        n'est lancé que pour les pages qui ne sont pas exploitables sans navigateur
+        end_page=None : nombre de pages découvert automatiquement
+        """
+        print("🚀 DÉBUT DU SCRAPING ASYNCHRONE DES BDE")
+        print(f"📄 Scraping des {page_range_text(start_page, end_page)}")
+        
+        try:
+            if end_page is None:
+                end_page = self.discover_end_page(start_page)
+            self.open_sink()
+            crawler = AsyncCrawler(listing_url=BASE_URL, listing_params=SEARCH_PARAMS, archive=self.archive,
+                                   seen_urls=self.seen_urls)
+            links_by_page, results = crawler.run(start_page, end_page)
+            
+            for page_num, bde_links in links_by_page.items():
+                if not bde_links:
+                    print(f"❌ Aucun BDE trouvé sur la page {page_num}")
+            
+            print(f"⚡ {crawler.pages_fetched} pages récupérées en {crawler.elapsed:.1f}s ({crawler.pages_per_second():.1f} pages/s)")
+            
+            # Repli Selenium pour les pages incomplètes en HTTP
+            fallback_urls = [bde_url for bde_url, bde_info in results if bde_info is None]
+            fallback_results = {}
+            if fallback_urls:
+                print(f"↩️ {len(fallback_urls)} BDE à extraire avec Selenium")
+                self.setup_driver()
+                # Ces pages ont déjà été tentées en HTTP par le crawler : Selenium directement
+                fallback_infos = self.driver_pool.map(self.extract_bde_details_browser, fallback_urls)
+                fallback_results = dict(zip(fallback_urls, fallback_infos))
+            
+            # Écriture dans l'ordre des pages
+            for bde_url, bde_info in results:
+                bde_info = bde_info or fallback_results.get(bde_url)
+                self.write_result(bde_url, bde_info)
+                if bde_info:
+                    self.seen_urls.mark_seen(bde_url)
+            
+            print(f"\n💾 SAUVEGARDE DES DONNÉES")
+            filename = self.close_sink()
+            
+            print(f"\n✅ SCRAPING ASYNCHRONE TERMINÉ !")
+            print(f"📊 {self.sink.count} BDE traités au total")
+            print(f"📦 Pages Selenium : {self.page_weights.summary()}")
+            if self.validator_store:
+                print(f"♻️ Recrawl conditionnel : {self.validator_store.summary()}")
+            print(f"🔗 Dédoublonnage : {self.seen_urls.summary()}")
+            if self.archive:
+                print(f"🗜️ Archive : {self.archive.summary()}")
+            
+            return filename
+            
+        except Exception as e:
+            print(f"❌ ERREUR CRITIQUE : {str(e)}")
+            
+        finally:
+            # Les BDE déjà extraits restent dans le fichier en cas d'erreur
+            if self.sink:
+                self.sink.close()
+            if self.driver_pool:
+                self.driver_pool.close()
             if self.driver:
                 print("\n🔒 Fermeture du navigateur...")
                 self.driver.quit()
@@ -297,15 +541,25 @@ def main():
     """
     Fonction principale
     """
+    parser = argparse.ArgumentParser(description="Scraper BDE HelloAsso - toutes les pages")
+    parser.add_argument("--resume", action="store_true",
+                        help="reprend le run interrompu sans refaire les pages et BDE déjà terminés")
+    parser.add_argument("--start-page", type=int, default=0, help="première page de liste (défaut : 0)")
+    parser.add_argument("--end-page", type=int, default=None,
+                        help="dernière page de liste (défaut : découverte automatique)")
+    parser.add_argument("--skip-seen", action="store_true",
+                        help="ignore les BDE déjà scrapés lors des runs précédents (absents du fichier de résultats)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🎓 SCRAPER BDE HELLOASSO - TOUTES LES PAGES")
     print("=" * 60)
     
     # Création et lancement du scraper
-    scraper = BDEScraperAllPages()
+    scraper = BDEScraperAllPages(skip_seen=args.skip_seen)
     
-    # Lancement du scraping complet (pages 0 à 29)
-    scraper.run_scraping_all_pages(start_page=0, end_page=29)
+    # Lancement du scraping complet (jusqu'à la dernière page découverte), pages de liste et de détail en parallèle
+    scraper.run_scraping_pipelined(start_page=args.start_page, end_page=args.end_page, resume=args.resume)
     
     print("\n" + "=" * 60)
     print("✅ FIN DU PROGRAMME")
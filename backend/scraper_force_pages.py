@@ -5,18 +5,29 @@ Description: Script pour scraper les BDE sur HelloAsso en forçant l'accès à t
 """
 
 import os
+import json
+import argparse
 import time
 import csv
 import re
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import pandas as pd
 from tqdm import tqdm
+from config import USE_HTTP_BACKEND, LEAN_BROWSING, SINK_FORMAT, CONDITIONAL_RECRAWL
+from http_fetcher import HttpFetcher, extract_bde_links_from_html
+from page_readiness import wait_for_listing, wait_for_association_page
+from rate_limiter import get_rate_limiter, throttled_get
+from lean_browsing import apply_lean_options, enable_request_blocking, format_page_weight, PageWeightStats
+from browser_extractor import extract_bde_info_in_browser, harvest_listing_links, LISTING_LINK_SELECTORS
+from record_sink import RecordSink
+from validator_store import ValidatorStore
+from url_store import SeenUrlStore
 
 # Configuration
 BASE_URL = "https://www.helloasso.com/associations"
@@ -24,14 +35,43 @@ SEARCH_PARAMS = {
     'category_tags': 'bde'
 }
 OUTPUT_FILENAME = "bde_scraping_results_forced"
-DELAY_BETWEEN_REQUESTS = 2
 MAX_PAGES_TO_TRY = 20  # On va essayer jusqu'à 20 pages
 
+# Différentes variations d'URL possibles pour la pagination (par ordre de préférence)
+URL_PATTERNS = {
+    'page': "{base}?category_tags={tag}&page={page}",
+    'p': "{base}?category_tags={tag}&p={page}",
+    'offset': "{base}?category_tags={tag}&offset={offset}",
+    'search_page': "{base}/search?query=bde&page={page}",
+    'search_q': "{base}/search?q=bde&page={page}",
+}
+# Variation qui a fonctionné au dernier run (réutilisée directement)
+PATTERN_CACHE_FILE = "data/forced_url_pattern.json"
+BDE_KEYWORDS = ['bde', 'bureau', 'etudiant', 'eleve']
+
+
+def filter_bde_links(association_links):
+    """
+    Garde les liens qui ressemblent à des BDE (tous les liens si aucun ne ressemble à un BDE)
+    """
+    bde_links = [url for url in association_links if any(keyword in url.lower() for keyword in BDE_KEYWORDS)]
+    return bde_links or association_links
+
 class BDEScraperForced:
-    def __init__(self):
+    def __init__(self, skip_seen=False):
         self.driver = None
-        self.bde_data = []
+        self.sink = None  # Fichier de résultats écrit au fil de l'eau
         self.current_page = 1
+        self.url_pattern = self.load_url_pattern()  # Variation d'URL qui fonctionne
+        self.first_page_links = None  # Liens de la page 1 (une variation qui les renvoie ignore la page)
+        # Validateurs du dernier crawl : les pages inchangées ne sont pas ré-extraites
+        self.validator_store = ValidatorStore() if CONDITIONAL_RECRAWL else None
+        self.http_fetcher = HttpFetcher(validator_store=self.validator_store) if USE_HTTP_BACKEND else None
+        self.rate_limiter = get_rate_limiter()  # Limiteur de débit partagé (politesse)
+        self.page_weights = PageWeightStats()  # Poids des pages chargées avec Selenium
+        # Associations déjà scrapées pendant ce run : pas de doublons
+        # (skip_seen : ni celles des runs précédents)
+        self.seen_urls = SeenUrlStore() if skip_seen else SeenUrlStore(max_age_days=0)
         
         # Création du dossier data
         os.makedirs('data', exist_ok=True)
@@ -49,30 +89,54 @@ class BDEScraperForced:
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
+        # Navigation légère (pas d'images, polices, médias ni scripts tiers)
+        if LEAN_BROWSING:
+            apply_lean_options(chrome_options)
+        
         try:
+            # Pas d'attente implicite : les attentes sont explicites (page_readiness)
             self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.implicitly_wait(10)
+            if LEAN_BROWSING:
+                enable_request_blocking(self.driver)
             print("✅ Navigateur configuré avec succès")
         except Exception as e:
             print(f"❌ Erreur lors de la configuration : {str(e)}")
             raise
 
-    def get_page_url(self, page_number):
+    def get_page_url(self, page_number, pattern='page'):
         """
-        Génère l'URL pour une page spécifique
+        Génère l'URL pour une page spécifique avec une variation de URL_PATTERNS
         """
         if page_number == 1:
             return f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}"
-        else:
-            # Différentes variations d'URL possible pour la pagination
-            possible_urls = [
-                f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}&page={page_number}",
-                f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}&p={page_number}",
-                f"{BASE_URL}?category_tags={SEARCH_PARAMS['category_tags']}&offset={20*(page_number-1)}",
-                f"{BASE_URL}/search?query=bde&page={page_number}",
-                f"{BASE_URL}/search?q=bde&page={page_number}",
-            ]
-            return possible_urls
+        return URL_PATTERNS[pattern].format(
+            base=BASE_URL, tag=SEARCH_PARAMS['category_tags'],
+            page=page_number, offset=20 * (page_number - 1)
+        )
+    
+    def load_url_pattern(self):
+        """
+        Variation d'URL mémorisée au dernier run, ou None
+        """
+        try:
+            with open(PATTERN_CACHE_FILE, encoding='utf-8') as f:
+                pattern = json.load(f).get('pattern')
+            if pattern in URL_PATTERNS:
+                print(f"♻️ Variation d'URL mémorisée : {pattern}")
+                return pattern
+        except (OSError, ValueError):
+            pass
+        return None
+    
+    def save_url_pattern(self, pattern):
+        """
+        Mémorise la variation d'URL qui fonctionne pour les prochains runs
+        """
+        try:
+            with open(PATTERN_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'pattern': pattern, 'updated_at': datetime.now().isoformat(timespec='seconds')}, f)
+        except OSError as e:
+            print(f"⚠️ Impossible de mémoriser la variation d'URL : {str(e)}")
     
     def get_bde_links_from_page(self):
         """
@@ -81,45 +145,18 @@ class BDEScraperForced:
         try:
             print("🔍 Recherche des BDE sur la page...")
             
-            # Attendre que les éléments se chargent
-            time.sleep(3)
-            
-            # Différents sélecteurs possibles pour les liens des BDE
-            selectors = [
-                "a[href*='/associations/']",
-                ".association-card a",
-                ".card a[href*='associations']",
-                "a[href*='bde']",
-                ".result-item a"
-            ]
-            
-            all_links = []
+            # Attendre que les cartes d'associations soient affichées
+            wait_for_listing(self.driver)
             
-            for selector in selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        href = element.get_attribute('href')
-                        if href and '/associations/' in href and href not in all_links:
-                            # Filtrer pour ne garder que les vrais liens de BDE
-                            if any(keyword in href.lower() for keyword in ['bde', 'bureau', 'etudiant', 'eleve']):
-                                all_links.append(href)
-                except:
-                    continue
+            # Tous les liens d'associations en un seul appel (dédoublonnés, dans l'ordre de la page)
+            links, saved_calls = harvest_listing_links(self.driver, selectors=LISTING_LINK_SELECTORS[:5])
+            association_links = [link['url'] for link in links]
             
-            # Si on n'a pas trouvé avec les sélecteurs spécifiques, on prend tous les liens d'associations
-            if not all_links:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/associations/']")
-                    for element in elements:
-                        href = element.get_attribute('href')
-                        if href and href not in all_links:
-                            all_links.append(href)
-                except:
-                    pass
+            # Filtrer pour ne garder que les vrais liens de BDE
+            all_links = filter_bde_links(association_links)
             
-            print(f"🔗 {len(all_links)} liens trouvés sur cette page")
-            return list(set(all_links))  # Supprimer les doublons
+            print(f"🔗 {len(all_links)} liens trouvés sur cette page ({saved_calls} appels WebDriver évités)")
+            return all_links
             
         except Exception as e:
             print(f"❌ Erreur lors de l'extraction des liens : {str(e)}")
@@ -129,98 +166,37 @@ class BDEScraperForced:
         """
         Extrait les détails d'un BDE spécifique
         """
+        print(f"📄 Extraction des détails pour : {bde_url}")
+        
+        # Extraction rapide par HTTP, Selenium seulement en repli
+        if self.http_fetcher:
+            bde_info = self.http_fetcher.fetch_bde_details(bde_url)
+            if bde_info:
+                print(f"   ⚡ {bde_info.get('nom_ecole') or 'Nom non trouvé'} (HTTP)")
+                return bde_info
+            print("   ↩️ Page incomplète en HTTP, repli sur Selenium")
+        
         try:
-            print(f"📄 Extraction des détails pour : {bde_url}")
-            self.driver.get(bde_url)
-            time.sleep(2)
+            throttled_get(self.driver, bde_url, self.rate_limiter)
+            wait_for_association_page(self.driver)
             
-            # Structure de base des informations BDE
-            bde_info = {
-                'nom_ecole': '',
-                'nom_personne': '',
-                'prenom_personne': '',
-                'adresse': '',
-                'site_internet': '',
-                'telephone': '',
-                'email': '',
-                'url_source': bde_url
-            }
+            # Tous les champs (et le hash de la page) en un seul aller-retour avec le navigateur
+            extraction = extract_bde_info_in_browser(self.driver, bde_url)
             
-            # Extraction du nom de l'école/BDE
-            try:
-                selectors = ["h1", ".title", ".name", ".association-name", "title"]
-                for selector in selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        name = elements[0].text.strip()
-                        if name:
-                            bde_info['nom_ecole'] = name
-                            break
-            except:
-                pass
+            # Page inchangée depuis le dernier crawl : on reprend le bde_info précédent
+            digest = extraction['content_hash']
+            previous = self.validator_store.unchanged_record(bde_url, digest) if self.validator_store else None
+            if previous:
+                print(f"   ♻️ {previous.get('nom_ecole') or 'Nom non trouvé'} (inchangé)")
+                return previous
             
-            # Extraction de l'email
-            try:
-                page_source = self.driver.page_source
-                email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-                emails = re.findall(email_pattern, page_source)
-                if emails:
-                    # Filtrer les emails valides et éviter les emails techniques
-                    valid_emails = []
-                    for email in emails:
-                        if not any(x in email.lower() for x in ['noreply', 'no-reply', 'support', 'admin', 'info@helloasso']):
-                            valid_emails.append(email)
-                    if valid_emails:
-                        bde_info['email'] = valid_emails[0]
-            except:
-                pass
-            
-            # Extraction du téléphone
-            try:
-                page_text = self.driver.page_source
-                phone_patterns = [
-                    r'(?:(?:\+33|0)[1-9](?:[0-9]{8}))',
-                    r'(?:0[1-9](?:\s?\d{2}){4})',
-                    r'(?:\+33\s?[1-9](?:\s?\d{2}){4})'
-                ]
-                
-                for pattern in phone_patterns:
-                    phone_matches = re.findall(pattern, page_text)
-                    if phone_matches:
-                        bde_info['telephone'] = phone_matches[0].strip()
-                        break
-            except:
-                pass
+            bde_info = extraction['bde_info']
+            if self.validator_store:
+                self.validator_store.save(bde_url, bde_info, digest)
             
-            # Extraction du site internet
-            try:
-                external_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href^='http']")
-                for link in external_links:
-                    href = link.get_attribute('href')
-                    if href and 'helloasso.com' not in href:
-                        social_domains = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com']
-                        if not any(domain in href for domain in social_domains):
-                            bde_info['site_internet'] = href
-                            break
-            except:
-                pass
-            
-            # Extraction de l'adresse
-            try:
-                page_text = self.driver.page_source
-                # Patterns pour adresses françaises
-                address_patterns = [
-                    r'\d+[,\s]+(?:rue|avenue|boulevard|place|impasse|allée)[^,\n]+(?:\d{5})[^,\n]*',
-                    r'(?:rue|avenue|boulevard|place|impasse|allée)[^,\n]+(?:\d{5})[^,\n]*'
-                ]
-                
-                for pattern in address_patterns:
-                    addresses = re.findall(pattern, page_text, re.IGNORECASE)
-                    if addresses:
-                        bde_info['adresse'] = addresses[0].strip()
-                        break
-            except:
-                pass
+            # Poids et temps de chargement de la page
+            self.page_weights.add(extraction['weight'])
+            print(f"   {format_page_weight(extraction['weight'])}")
             
             # Affichage des informations extraites
             print(f"   ✅ Données extraites :")
@@ -239,39 +215,128 @@ class BDEScraperForced:
         Vérifie si une page existe et contient du contenu
         """
         try:
-            self.driver.get(page_url)
-            time.sleep(2)
+            throttled_get(self.driver, page_url, self.rate_limiter)
             
             # Vérifier si la page contient des associations
-            elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/associations/']")
-            return len(elements) > 0
+            return wait_for_listing(self.driver)
             
         except Exception as e:
             print(f"   ❌ Erreur lors de la vérification de la page : {str(e)}")
             return False
     
-    def save_to_csv(self):
+    def fetch_listing_links(self, page_url):
         """
-        Sauvegarde les données en format CSV
+        Liens BDE d'une page de liste par HTTP (liste vide si la page n'existe pas)
         """
-        if not self.bde_data:
-            print("❌ Aucune donnée à sauvegarder")
+        page_html = self.http_fetcher.fetch(page_url)
+        if not page_html:
+            return []
+        return filter_bde_links(extract_bde_links_from_html(page_html, page_url))
+    
+    def list_page(self, page_url):
+        """
+        Liens BDE d'une page de liste, par HTTP si possible, sinon avec le navigateur
+        """
+        print(f"🔗 Page de liste : {page_url}")
+        if self.http_fetcher:
+            links = self.fetch_listing_links(page_url)
+            if links or not self.driver:
+                return links
+            print("   ↩️ Aucun lien en HTTP, repli sur le navigateur")
+        if not self.check_page_exists(page_url):
+            return []
+        return self.get_bde_links_from_page()
+    
+    def get_first_page_links(self):
+        """
+        Liens de la page 1 (chargée une seule fois)
+        """
+        if self.first_page_links is None:
+            self.first_page_links = self.list_page(self.get_page_url(1))
+        return self.first_page_links
+    
+    def is_first_page(self, links):
+        """
+        Vrai si les liens sont ceux de la page 1 : au-delà de la dernière page, une
+        variation dont le paramètre est ignoré par le site renvoie la page 1
+        """
+        return bool(links) and set(links) == set(self.get_first_page_links())
+    
+    def probe_url_patterns(self, page_number, skip=None):
+        """
+        Teste toutes les variations d'URL pour une page, en parallèle par HTTP
+        (une par une avec le navigateur si le HTTP est désactivé)
+        Renvoie (variation, liens) de la première variation par ordre de
+        préférence qui renvoie des BDE, ou (None, [])
+        """
+        patterns = [pattern for pattern in URL_PATTERNS if pattern != skip]
+        urls = [self.get_page_url(page_number, pattern) for pattern in patterns]
+        print(f"🔍 Test de {len(patterns)} variations d'URL pour la page {page_number}...")
+        
+        if self.http_fetcher:
+            with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+                results = list(executor.map(self.fetch_listing_links, urls))
+        else:
+            results = []
+            for url in urls:
+                results.append(self.get_bde_links_from_page() if self.check_page_exists(url) else [])
+                if results[-1]:
+                    break
+        
+        # Une variation qui renvoie la page 1 ignore son paramètre : elle est écartée
+        results = [[] if self.is_first_page(links) else links for links in results]
+        for pattern, links in zip(patterns, results):
+            print(f"   {'✅' if links else '❌'} {pattern} : {len(links)} liens")
+        for pattern, links in zip(patterns, results):
+            if links:
+                return pattern, links
+        return None, []
+    
+    def get_page_links(self, page_number):
+        """
+        Liens BDE d'une page avec la variation d'URL mémorisée ; les variations
+        ne sont testées à nouveau que si elle ne renvoie plus de résultats
+        """
+        if page_number == 1:
+            return self.get_first_page_links()
+        
+        if self.url_pattern:
+            links = self.list_page(self.get_page_url(page_number, self.url_pattern))
+            if links and not self.is_first_page(links):
+                return links
+            print(f"⚠️ La variation '{self.url_pattern}' ne renvoie plus de nouveaux résultats")
+        
+        pattern, links = self.probe_url_patterns(page_number, skip=self.url_pattern)
+        if pattern:
+            print(f"✅ Variation d'URL retenue : {pattern}")
+            self.url_pattern = pattern
+            self.save_url_pattern(pattern)
+        return links
+    
+    def open_sink(self):
+        """
+        Ouvre le fichier de résultats : chaque BDE y est ajouté dès son extraction
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"data/{OUTPUT_FILENAME}_{timestamp}.{SINK_FORMAT}"
+        self.sink = RecordSink(filename)
+        print(f"💾 Enregistrement au fil de l'eau dans : {filename}")
+    
+    def close_sink(self):
+        """
+        Écrit les derniers BDE et ferme le fichier de résultats
+        """
+        if not self.sink:
             return False
-            
-        try:
-            df = pd.DataFrame(self.bde_data)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"data/{OUTPUT_FILENAME}_{timestamp}.csv"
-            
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"💾 Données sauvegardées dans : {filename}")
-            print(f"📊 Total : {len(self.bde_data)} BDE scrapés")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erreur lors de la sauvegarde : {str(e)}")
+        
+        self.sink.close()
+        if not self.sink.count:
+            print("❌ Aucune donnée à sauvegarder")
             return False
+        
+        print(f"💾 Données sauvegardées dans : {self.sink.path}")
+        print(f"📊 Total : {self.sink.count} BDE scrapés")
+        return True
     
     def run_forced_scraping(self, start_page=2, max_pages=MAX_PAGES_TO_TRY):
         """
@@ -281,60 +346,51 @@ class BDEScraperForced:
         print(f"📄 Pages {start_page} à {max_pages}")
         
         try:
+            self.open_sink()
             self.setup_driver()
             
             for page_num in range(start_page, max_pages + 1):
                 print(f"\n📄 === PAGE {page_num} ===")
                 
-                # Essayer différentes variations d'URL pour cette page
-                page_urls = self.get_page_url(page_num)
-                
-                # Si c'est la page 1, on a une seule URL
-                if isinstance(page_urls, str):
-                    page_urls = [page_urls]
-                
-                page_found = False
-                bde_links = []
-                
-                for url in page_urls:
-                    print(f"🔗 Tentative : {url}")
-                    
-                    if self.check_page_exists(url):
-                        print("✅ Page trouvée !")
-                        bde_links = self.get_bde_links_from_page()
-                        if bde_links:
-                            page_found = True
-                            break
-                    else:
-                        print("❌ Page non trouvée ou vide")
+                # Variation d'URL mémorisée, ou test des variations en parallèle
+                page_links = self.get_page_links(page_num)
                 
-                if not page_found or not bde_links:
+                if not page_links:
                     print(f"📄 Page {page_num} : Aucun contenu trouvé")
                     continue
                 
+                # Sans les BDE déjà vus sur une autre page ou scrapés lors d'un run récent
+                bde_links = self.seen_urls.filter_new(page_links)
+                
                 # Traitement des BDE trouvés
-                print(f"🔄 Traitement de {len(bde_links)} BDE...")
+                print(f"🔄 Traitement de {len(bde_links)} nouveaux BDE ({len(page_links) - len(bde_links)} déjà scrapés)...")
                 
                 for i, bde_url in enumerate(tqdm(bde_links, desc=f"Page {page_num}")):
                     print(f"\n   📄 BDE {i+1}/{len(bde_links)}")
                     
                     bde_info = self.extract_bde_details(bde_url)
                     if bde_info:
-                        self.bde_data.append(bde_info)
-                    
-                    time.sleep(DELAY_BETWEEN_REQUESTS)
+                        self.sink.write(bde_info)
+                        self.seen_urls.mark_seen(bde_url)
             
             # Sauvegarde finale
             print(f"\n💾 SAUVEGARDE DES DONNÉES")
-            self.save_to_csv()
+            self.close_sink()
             
             print(f"\n✅ SCRAPING FORCÉ TERMINÉ !")
-            print(f"📊 {len(self.bde_data)} BDE traités au total")
+            print(f"📊 {self.sink.count} BDE traités au total")
+            print(f"📦 Pages Selenium : {self.page_weights.summary()}")
+            if self.validator_store:
+                print(f"♻️ Recrawl conditionnel : {self.validator_store.summary()}")
+            print(f"🔗 Dédoublonnage : {self.seen_urls.summary()}")
             
         except Exception as e:
             print(f"❌ ERREUR CRITIQUE : {str(e)}")
             
         finally:
+            # Les BDE déjà extraits restent dans le fichier en cas d'erreur
+            if self.sink:
+                self.sink.close()
             if self.driver:
                 print("\n🔒 Fermeture du navigateur...")
                 self.driver.quit()
@@ -343,11 +399,16 @@ def main():
     """
     Fonction principale
     """
+    parser = argparse.ArgumentParser(description="Scraper BDE HelloAsso - forçage multi-pages")
+    parser.add_argument("--skip-seen", action="store_true",
+                        help="ignore les BDE déjà scrapés lors des runs précédents (absents du fichier de résultats)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🎓 SCRAPER BDE HELLOASSO - FORÇAGE MULTI-PAGES")
     print("=" * 60)
     
-    scraper = BDEScraperForced()
+    scraper = BDEScraperForced(skip_seen=args.skip_seen)
     
     # Lancement du scraping forcé à partir de la page 2
     scraper.run_forced_scraping(start_page=2, max_pages=10)
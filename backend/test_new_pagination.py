@@ -21,9 +21,9 @@ def test_pagination():
     if filename:
         print(f"\n🎯 RÉSULTAT DU TEST")
         print(f"📁 Fichier généré : {filename}")
-        print(f"📊 Total BDE récupérés : {len(scraper.bde_data)}")
+        print(f"📊 Total BDE récupérés : {scraper.sink.count}")
         
-        if len(scraper.bde_data) > 0:
+        if scraper.sink.count > 0:
             print("✅ LA NOUVELLE PAGINATION FONCTIONNE !")
             print("🚀 Prêt pour le scraping complet des 30 pages")
         else:
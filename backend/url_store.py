@@ -0,0 +1,147 @@
+"""
+URLs d'associations déjà scrapées, d'un run à l'autre (SQLite)
+Chaque lien est ramené à l'URL canonique de l'association
+(https://www.helloasso.com/associations/<slug>, sans paramètres, fragment,
+slash final ni sous-page /collectes/..., /evenements/...) : une association
+listée sur plusieurs pages, ou sous plusieurs formes, n'est scrapée qu'une fois.
+Les scrapers n'ignorent les associations des runs précédents que sur demande
+(--skip-seen) : elles seraient sinon absentes du fichier de résultats.
+Une association scrapée il y a plus de SEEN_URL_MAX_AGE_DAYS jours est
+alors considérée comme nouvelle (données rafraîchies).
+
+Table sans rowid indexée par l'URL : une recherche est une lecture de
+B-tree, quelques microsecondes même avec des millions d'URLs
+"""
+
+import re
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit, urljoin
+from config import SEEN_URLS_DB, SEEN_URL_MAX_AGE_DAYS
+
+ASSOCIATION_PATH_RE = re.compile(r'/associations/([^/?#]+)')
+QUERY_CHUNK = 500  # URLs par requête IN (limite de variables SQLite)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_urls (
+    url TEXT PRIMARY KEY,
+    scraped_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def canonical_association_url(url, base_url=None):
+    """
+    URL canonique de l'association d'un lien (None si ce n'est pas une association)
+    base_url : page du lien, pour les liens relatifs
+    """
+    parts = urlsplit(urljoin(base_url, url) if base_url else url)
+    match = ASSOCIATION_PATH_RE.search(parts.path)
+    if not match or not parts.netloc:
+        return None
+    return f"{parts.scheme.lower() or 'https'}://{parts.netloc.lower()}/associations/{match.group(1).lower()}"
+
+
+class SeenUrlStore:
+    """
+    Associations déjà scrapées, partagées par tous les scrapers et leurs threads
+    Pendant un run, les URLs déjà renvoyées par filter_new() ne le sont plus
+    (une association listée sur deux pages n'est traitée qu'une fois)
+    """
+
+    def __init__(self, db_path=SEEN_URLS_DB, max_age_days=SEEN_URL_MAX_AGE_DAYS):
+        self.db_path = db_path
+        self.max_age = max_age_days * 86400  # 0 : tout est re-scrapé (seul le dédoublonnage du run reste)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._run_urls = set()  # URLs déjà données à traiter pendant ce run
+        self.skipped = 0        # Associations ignorées car déjà scrapées récemment
+
+    def _fresh_urls(self, urls):
+        """
+        URLs de la liste scrapées depuis moins de max_age
+        """
+        if not self.max_age or not urls:
+            return set()
+        since = time.time() - self.max_age
+        fresh = set()
+        with self._lock:
+            for i in range(0, len(urls), QUERY_CHUNK):
+                chunk = urls[i:i + QUERY_CHUNK]
+                fresh.update(row[0] for row in self._conn.execute(
+                    f"SELECT url FROM seen_urls WHERE url IN ({','.join('?' * len(chunk))}) AND scraped_at >= ?",
+                    chunk + [since]
+                ))
+        return fresh
+
+    def is_seen(self, url):
+        """
+        True si l'association a été scrapée depuis moins de max_age
+        """
+        if not self.max_age:
+            return False
+        url = canonical_association_url(url) or url
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM seen_urls WHERE url = ? AND scraped_at >= ?", (url, time.time() - self.max_age)
+            ).fetchone() is not None
+
+    def filter_new(self, urls):
+        """
+        Associations à scraper parmi les liens : URLs canoniques, sans doublons,
+        sans celles déjà données pendant ce run ni celles scrapées récemment
+        """
+        candidates = []
+        with self._lock:
+            for url in urls:
+                url = canonical_association_url(url) or url
+                if url not in self._run_urls:
+                    self._run_urls.add(url)
+                    candidates.append(url)
+        fresh = self._fresh_urls(candidates)
+        self.skipped += len(fresh)
+        return [url for url in candidates if url not in fresh]
+
+    def mark_seen(self, url):
+        """
+        Enregistre une association scrapée avec succès
+        """
+        self.mark_seen_many([url])
+
+    def mark_seen_many(self, urls):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO seen_urls (url, scraped_at) VALUES (?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET scraped_at = excluded.scraped_at",
+                [(canonical_association_url(url) or url, now) for url in urls]
+            )
+
+    def purge_expired(self):
+        """
+        Supprime les associations scrapées il y a plus de max_age (base compacte)
+        """
+        if not self.max_age:
+            return 0
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM seen_urls WHERE scraped_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0]
+
+    def summary(self):
+        """
+        Texte court pour les logs
+        """
+        return f"{self.skipped} associations déjà scrapées ignorées, {self.count()} connues"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,161 @@
+"""
+Validateurs HTTP et empreintes de contenu par URL (SQLite)
+Garde pour chaque page d'association l'ETag, le Last-Modified, un hash de
+la zone utile de la page et le dernier bde_info extrait : lors d'un nouveau
+crawl, une page inchangée n'est ni re-téléchargée (304) ni ré-extraite.
+Un bde_info produit par une autre version de l'extraction (EXTRACTOR_VERSION)
+n'est pas réutilisé : la page est re-téléchargée et ré-extraite
+"""
+
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from config import VALIDATOR_DB, EXTRACTOR_VERSION
+from field_extraction import parse_page
+
+# Zone de la page prise en compte pour le hash (le reste : menus, pied de page...)
+# Le navigateur lit la même zone dans EXTRACT_BDE_INFO_JS (browser_extractor.py)
+CONTENT_REGION_XPATH = "//main"
+CONTENT_REGION_SELECTOR = "main"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    record TEXT NOT NULL,
+    updated_at TEXT,
+    extractor_version INTEGER
+);
+"""
+
+
+def hash_text(text):
+    """
+    Hash du texte, espaces normalisés
+    """
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+def content_text(tree):
+    """
+    Texte de la zone utile (arbre de parse_page, sans scripts ni styles) :
+    ses nœuds texte séparés par un espace, comme dans le navigateur
+    """
+    regions = tree.xpath(CONTENT_REGION_XPATH) or tree.xpath("//body") or [tree]
+    return ' '.join(text.strip() for text in regions[0].itertext() if text.strip())
+
+
+def content_hash(page_html):
+    """
+    Hash du texte de la zone utile d'une page (même hash pour le HTML reçu en
+    HTTP et pour le texte renvoyé par le navigateur)
+    """
+    return hash_text(content_text(parse_page(page_html)))
+
+
+class ValidatorStore:
+    """
+    Validateurs et dernier résultat de chaque URL, partagés par les threads du scraper
+    """
+
+    def __init__(self, db_path=VALIDATOR_DB, extractor_version=EXTRACTOR_VERSION):
+        self.db_path = db_path
+        self.extractor_version = extractor_version
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Base créée avant la colonne extractor_version : ses lignes (NULL) ne sont plus réutilisées
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(validators)")]
+        if 'extractor_version' not in columns:
+            self._conn.execute("ALTER TABLE validators ADD COLUMN extractor_version INTEGER")
+        self._conn.commit()
+
+        # Statistiques du run
+        self.unchanged = 0
+        self.changed = 0
+
+    def get(self, url):
+        """
+        Validateurs et dernier bde_info de l'URL, ou None si jamais vue
+        ou extraite par une autre version de l'extraction
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, record, extractor_version FROM validators WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if not row or row[4] != self.extractor_version:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content_hash': row[2],
+            'record': json.loads(row[3]),
+        }
+
+    def conditional_headers(self, previous):
+        """
+        En-têtes If-None-Match / If-Modified-Since pour une requête conditionnelle
+        """
+        headers = {}
+        if previous and previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous and previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+
+    def unchanged_record(self, url, digest, previous=None):
+        """
+        Renvoie le bde_info précédent si le hash de la page n'a pas changé, sinon None
+        """
+        previous = previous or self.get(url)
+        if digest and previous and previous['content_hash'] == digest:
+            self.mark_unchanged()
+            return previous['record']
+        return None
+
+    def save(self, url, record, digest, etag=None, last_modified=None):
+        """
+        Enregistre le résultat d'une page extraite et ses validateurs
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators "
+                "(url, etag, last_modified, content_hash, record, updated_at, extractor_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, digest, json.dumps(record, ensure_ascii=False),
+                 datetime.now().isoformat(timespec='seconds'), self.extractor_version)
+            )
+            self.changed += 1
+
+    def update_validators(self, url, etag=None, last_modified=None):
+        """
+        Met à jour l'ETag et le Last-Modified d'une page inchangée (le bde_info est conservé)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE validators SET etag = ?, last_modified = ?, updated_at = ? WHERE url = ?",
+                (etag, last_modified, datetime.now().isoformat(timespec='seconds'), url)
+            )
+
+    def mark_unchanged(self):
+        with self._lock:
+            self.unchanged += 1
+
+    def summary(self):
+        """
+        Texte court pour les logs
+        """
+        total = self.unchanged + self.changed
+        if not total:
+            return "aucune page vérifiée"
+        return f"{self.unchanged} pages inchangées sur {total} ({100 * self.unchanged / total:.0f}%)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()